@@ -6,6 +6,7 @@ from martor.widgets import AdminMartorWidget
 
 from app.models import (
     Bloc,
+    ClientDatabase,
     Country,
     Provider,
     ProviderContact,
@@ -14,6 +15,7 @@ from app.models import (
 from immigration.admin.bloc_choice_field import BlocChoiceFieldMixin  # type: ignore
 
 
+admin.site.register(ClientDatabase)
 admin.site.register(Provider)
 admin.site.register(ProviderContact)
 admin.site.register(StoredFile)
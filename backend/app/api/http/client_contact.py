@@ -1,4 +1,5 @@
 import json
+from typing import List
 from uuid import UUID
 
 from django.db.transaction import atomic
@@ -6,7 +7,7 @@ from django.http import (
     HttpRequest,
     HttpResponse,
 )
-from pydantic import ValidationError
+from pydantic import ValidationError, parse_obj_as
 
 from app.api.http.case_step_utils import (
     add_uploaded_files_to_case_step,
@@ -21,13 +22,17 @@ from app import models as app_orm_models
 from client import api as client_api
 from client import models as client_orm_models
 from owldock.api.http.base import BaseView
+from owldock.api.serialization import serialize
 from owldock.http import (
     HttpResponseBadRequest,
     HttpResponseForbidden,
     HttpResponseNotFound,
     OwldockJsonResponse,
 )
-from owldock.dev.db_utils import assert_max_queries
+from owldock.database_router import set_request_client_db
+from owldock.state_machine.role import get_principal_from_http_request
+
+MAX_BULK_CASES = 1000
 
 
 # TODO: Refactor to share implementation with _ProviderContactView
@@ -35,32 +40,27 @@ class _ClientContactView(BaseView):
     def setup(self, *args, **kwargs):
         self.client_contact: client_orm_models.ClientContact
         super().setup(*args, **kwargs)
-        try:
-            self.client_contact = client_orm_models.ClientContact.objects.get(
-                user_uuid=self.request.user.uuid  # type: ignore
-            )
-        except client_orm_models.ClientContact.DoesNotExist:
-            self.client_contact = None  # type: ignore
+        self.client_contact = get_principal_from_http_request(  # type: ignore
+            self.request
+        ).client_contact
 
     def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
         if not self.client_contact:
             return HttpResponseForbidden("User is not a client contact")
         else:
+            set_request_client_db(request, self.client_contact._state.db)
             return super().dispatch(request, *args, **kwargs)
 
 
 class ApplicantList(_ClientContactView):
     def get(self, request: HttpRequest) -> HttpResponse:
-        with assert_max_queries(5):
-            applicant_orm_models = client_api.read.applicant.get_orm_models(
-                self.client_contact
-            )
+        applicant_orm_models = client_api.read.applicant.get_orm_models(
+            self.client_contact
+        )
 
-        with assert_max_queries(25):
-            applicant_list_api_model = client_api.models.ApplicantList.from_orm(
-                applicant_orm_models
-            )
-            response = OwldockJsonResponse(applicant_list_api_model.dict()["__root__"])
+        response = OwldockJsonResponse(
+            serialize(client_api.models.ApplicantList, applicant_orm_models)
+        )
 
         return response
 
@@ -89,6 +89,25 @@ class CreateCase(_ClientContactView):
             return OwldockJsonResponse(None)
 
 
+class CreateCases(_ClientContactView):
+    @atomic
+    def post(self, request: HttpRequest) -> HttpResponse:
+        case_data = json.loads(request.body)
+        if isinstance(case_data, list) and len(case_data) > MAX_BULK_CASES:
+            return HttpResponseBadRequest(
+                f"At most {MAX_BULK_CASES} cases may be created in one request"
+            )
+        try:
+            api_objs = parse_obj_as(List[client_api.models.Case], case_data)
+        except ValidationError as e:
+            return OwldockJsonResponse({"validation-errors": e.json()})
+        else:
+            cases = client_api.write.case.create_many_for_client_contact(
+                api_objs, client_contact=self.client_contact
+            )
+            return OwldockJsonResponse([case.uuid for case in cases])
+
+
 class EarmarkCaseStep(_ClientContactView):
     @atomic
     def post(self, request: HttpRequest, uuid: UUID) -> HttpResponse:
@@ -161,7 +180,7 @@ class CaseStepUploadFiles(_ClientContactView):
 
 class ClientProviderRelationshipList(_ClientContactView):
     def get(self, request: HttpRequest) -> HttpResponse:
-        provider_relationships = self.client_contact.provider_relationships()
+        provider_relationships = list(self.client_contact.provider_relationships())
         api_obj = client_api.models.ClientProviderRelationshipList.from_orm(
             provider_relationships
         )
@@ -1,14 +1,24 @@
-from typing import Union
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple, Union
 from uuid import UUID
 
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, QueryDict
 
 from app import models as app_orm_models
 from client import api as client_api
 from client import models as client_orm_models
-from owldock.dev.db_utils import assert_max_queries
+from client.models.case_step import State as CaseStepState
+from owldock.api.serialization import serialize
 from owldock.state_machine.role import get_role_from_http_request
-from owldock.http import make_explanatory_http_response, OwldockJsonResponse
+from owldock.http import (
+    HttpResponseBadRequest,
+    make_explanatory_http_response,
+    OwldockJsonResponse,
+    OwldockStreamingJsonResponse,
+)
+
+MAX_CASE_LIST_PAGE_SIZE = 100
+STREAMED_CASE_LIST_PAGE_SIZE = 100
 
 
 class ClientOrProviderCaseViewMixin:
@@ -22,7 +32,6 @@ class ClientOrProviderCaseViewMixin:
     ) -> HttpResponse:
         kwargs = {"uuid": uuid}
         qs = client_or_provider_contact.cases().filter(**kwargs)
-        print("Pre-serialization queries")
         cases = client_api.read.case.prefetch_cases(qs, client_or_provider_contact)
         if not cases:
             return make_explanatory_http_response(
@@ -32,9 +41,7 @@ class ClientOrProviderCaseViewMixin:
 
         get_role_from_http_request(request)  # cache it
 
-        with assert_max_queries(45):  # TODO: should be <=2
-            api_obj = client_api.models.Case.from_orm(case)
-            response = OwldockJsonResponse(api_obj.dict())
+        response = OwldockJsonResponse(serialize(client_api.models.Case, case))
 
         return response
 
@@ -47,15 +54,111 @@ class ClientOrProviderCaseListMixin:
             client_orm_models.ClientContact, app_orm_models.ProviderContact
         ],
     ) -> HttpResponse:
+        """
+        Return the contact's cases, optionally filtered and paginated.
 
-        orm_models = client_api.read.case.get_cases_for_client_or_provider_contact(
-            client_or_provider_contact
-        )
+        Optional URL params:
+
+        - host_country: a country code
+        - step_state: a case step state name, e.g. IN_PROGRESS
+        - applicant: an applicant UUID
+        - created_from, created_to: ISO dates (inclusive)
+        - page_size: if supplied, the response data is {"cases": [...],
+          "next_cursor": ...} rather than a list of all cases. next_cursor is
+          null on the last page; otherwise it is passed as the cursor param to
+          fetch the next page.
+        - cursor
+
+        A list of all cases is fetched a page at a time, and its encoding is
+        streamed.
+        """
+        try:
+            page_size, cursor, filters = _get_case_list_params(request.GET)
+        except ValueError as exc:
+            return HttpResponseBadRequest(f"Invalid URL params: {exc}")
 
         get_role_from_http_request(request)  # cache it
 
-        # TODO: O(1) query assertion
-        api_obj = client_api.models.CaseList.from_orm(orm_models)
-        response = OwldockJsonResponse(api_obj.dict()["__root__"])
+        if page_size is None:
+            # The cases are fetched and serialized here; only their encoding is
+            # streamed, after the view has returned.
+            return OwldockStreamingJsonResponse(
+                iter(_serialize_all_cases(client_or_provider_contact, cursor, filters))
+            )
 
-        return response
+        (
+            orm_models,
+            next_cursor,
+        ) = client_api.read.case.get_case_page_for_client_or_provider_contact(
+            client_or_provider_contact, page_size=page_size, after=cursor, **filters
+        )
+
+        data = serialize(client_api.models.CaseList, orm_models)
+        return OwldockJsonResponse(
+            {
+                "cases": data,
+                "next_cursor": (
+                    client_api.read.case.encode_cursor(next_cursor)
+                    if next_cursor
+                    else None
+                ),
+            }
+        )
+
+
+def _serialize_all_cases(
+    client_or_provider_contact: Union[
+        client_orm_models.ClientContact, app_orm_models.ProviderContact
+    ],
+    cursor: Optional[client_api.read.case.Cursor],
+    filters: Dict[str, Any],
+) -> List[Any]:
+    """
+    Return the serialized cases, fetching and prefetching a page at a time.
+    """
+    data: List[Any] = []
+    while True:
+        (
+            orm_models,
+            cursor,
+        ) = client_api.read.case.get_case_page_for_client_or_provider_contact(
+            client_or_provider_contact,
+            page_size=STREAMED_CASE_LIST_PAGE_SIZE,
+            after=cursor,
+            **filters,
+        )
+        data.extend(serialize(client_api.models.CaseList, orm_models))
+        if not cursor:
+            return data
+
+
+def _get_case_list_params(
+    params: QueryDict,
+) -> Tuple[Optional[int], Optional[client_api.read.case.Cursor], Dict[str, Any]]:
+    """
+    Parse case list URL params, raising ValueError if any are invalid.
+    """
+    page_size: Optional[int] = None
+    if params.get("page_size"):
+        page_size = int(params["page_size"])
+        if not 1 <= page_size <= MAX_CASE_LIST_PAGE_SIZE:
+            raise ValueError(
+                f"page_size must be between 1 and {MAX_CASE_LIST_PAGE_SIZE}"
+            )
+    cursor = None
+    if params.get("cursor"):
+        cursor = client_api.read.case.decode_cursor(params["cursor"])
+
+    filters: Dict[str, Any] = {}
+    if params.get("host_country"):
+        filters["host_country_code"] = params["host_country"].strip()
+    if params.get("step_state"):
+        if params["step_state"] not in CaseStepState.names:
+            raise ValueError(f"Invalid step_state: {params['step_state']}")
+        filters["step_state_name"] = params["step_state"]
+    if params.get("applicant"):
+        filters["applicant_uuid"] = UUID(params["applicant"])
+    for key in ["created_from", "created_to"]:
+        if params.get(key):
+            filters[key] = date.fromisoformat(params[key])
+    return page_size, cursor, filters
@@ -1,36 +1,295 @@
+import json
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+from uuid import UUID
+
 from django.http import Http404, HttpRequest, HttpResponse
+from djmoney.money import Money
 
+from app.models import Country
+from client import models as client_orm_models
 from immigration import api as immigration_api
+from immigration import matching
+from immigration.models import Location, Move, Process
 from owldock.api.http.base import BaseView
-from owldock.http import OwldockJsonResponse
+from owldock.api.serialization import serialize
+from owldock.state_machine.role import get_principal_from_http_request
+from owldock.http import (
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    OwldockJsonResponse,
+    OwldockStreamingJsonResponse,
+)
+
+MAX_BULK_MOVES = 10000
 
 
 class ProcessList(BaseView):
     def get(self, request: HttpRequest) -> HttpResponse:
         """
-        Return ProcessRuleSets matching host country and applicant nationality.
+        Return ProcessRuleSets matching the Move described by the URL params.
+
+        host_country and nationalities are required. home_country,
+        contract_location, payroll_location, target_entry_date,
+        target_exit_date, salary and salary_currency are optional; rules
+        concerning an omitted param are not applied.
         """
-        nationality_codes = {
-            s.strip()
-            for s in request.GET.get("nationalities", "").strip().split(",")
-            if s.strip()
-        }
+        nationality_codes = _get_codes(request.GET, "nationalities")
         host_country_code = request.GET.get("host_country", "").strip()
         if not (nationality_codes and any(nationality_codes) and host_country_code):
             raise Http404(
                 "nationalities and host_country must be supplied in URL params"
             )
+        home_country_code = request.GET.get("home_country", "").strip()
+        code2country = {
+            c.code: c
+            for c in Country.objects.filter(
+                code__in=nationality_codes | {host_country_code, home_country_code}
+            )
+        }
+        if host_country_code not in code2country:
+            return OwldockJsonResponse([])
+        try:
+            move = _make_move(
+                request.GET,
+                code2country[host_country_code],
+                # A nationality not in the database matches no nationality rule.
+                [code2country.get(c, Country(code=c)) for c in nationality_codes],
+                code2country.get(home_country_code),
+            )
+        except ValueError as exc:
+            return HttpResponseBadRequest(f"Invalid URL params: {exc}")
+
         processes = immigration_api.models.ProcessRuleSetList.get_orm_models(
-            route__host_country__code=host_country_code,
+            host_country_code, ids=matching.match(move)
         )
-        # Remove ProcessRuleSets which specify non-matching nationalities
-        filtered_processes = []
-        for p in processes:
-            process_nationality_codes = {c.code for c in p.nationalities.all()}
-            if not process_nationality_codes:
-                filtered_processes.append(p)
-            elif process_nationality_codes & nationality_codes:
-                filtered_processes.append(p)
         # TODO: Process vs ProcessRuleSet
-        api_obj = immigration_api.models.ProcessRuleSetList.from_orm(filtered_processes)
-        return OwldockJsonResponse(api_obj.dict()["__root__"])
+        return OwldockJsonResponse(
+            serialize(immigration_api.models.ProcessRuleSetList, processes)
+        )
+
+
+class ProcessListBulk(BaseView):
+    def post(self, request: HttpRequest) -> HttpResponse:
+        """
+        Return the Processes available for each of a list of Moves.
+
+        The request body is {"moves": [...]}. Each move has the same keys as the
+        URL params of ProcessList, except that nationalities is a list. A client
+        contact may instead supply "applicant" (the UUID of one of their
+        applicants), in which case the applicant's nationalities and home
+        country are used.
+
+        The response data is {"process_rulesets": {id: ProcessRuleSet},
+        "moves": [{"processes": [{"process_ruleset": id, "steps": [id]}]}]}, with
+        one entry in "moves" for each move in the request, in order. Each
+        ProcessRuleSet is serialized once, however many moves it matches.
+        """
+        try:
+            body = json.loads(request.body)
+        except json.JSONDecodeError:
+            body = None
+        move_data = body.get("moves") if isinstance(body, dict) else None
+        if not isinstance(move_data, list) or not all(
+            isinstance(d, dict) for d in move_data
+        ):
+            return HttpResponseBadRequest(
+                'Request body must be JSON of the form {"moves": [...]}'
+            )
+        if len(move_data) > MAX_BULK_MOVES:
+            return HttpResponseBadRequest(
+                f"At most {MAX_BULK_MOVES} moves may be matched in one request"
+            )
+
+        # The applicant UUID of each move, if any, normalized.
+        move_applicant_uuids: List[Optional[str]] = []
+        try:
+            for d in move_data:
+                move_applicant_uuids.append(
+                    str(UUID(str(d["applicant"]))) if d.get("applicant") else None
+                )
+        except ValueError as exc:
+            return HttpResponseBadRequest(f"Invalid applicant UUID: {exc}")
+        applicant_uuids = {uuid for uuid in move_applicant_uuids if uuid}
+        if applicant_uuids:
+            client_contact = get_principal_from_http_request(request).client_contact
+            if not client_contact:
+                return HttpResponseForbidden("User is not a client contact")
+            uuid2applicant_countries = _get_applicant_countries(
+                client_contact, applicant_uuids
+            )
+            unknown = applicant_uuids - set(uuid2applicant_countries)
+            if unknown:
+                return HttpResponseBadRequest(
+                    f"Unknown applicants: {', '.join(sorted(unknown))}"
+                )
+        else:
+            uuid2applicant_countries = {}
+
+        codes: Set[str] = set()
+        for i, d in enumerate(move_data):
+            codes.add(_get_param(d, "host_country"))
+            codes.add(_get_param(d, "home_country"))
+            try:
+                codes.update(_get_codes(d, "nationalities"))
+            except ValueError as exc:
+                return HttpResponseBadRequest(f"Invalid move at index {i}: {exc}")
+        code2country = {c.code: c for c in Country.objects.filter(code__in=codes)}
+
+        moves: List[Optional[Move]] = []
+        for i, (d, applicant_uuid) in enumerate(zip(move_data, move_applicant_uuids)):
+            host_country = code2country.get(_get_param(d, "host_country"))
+            if not host_country:
+                moves.append(None)
+                continue
+            if applicant_uuid:
+                nationalities, home_country = uuid2applicant_countries[applicant_uuid]
+            else:
+                nationalities = [
+                    code2country.get(c, Country(code=c))
+                    for c in _get_codes(d, "nationalities")
+                ]
+                home_country = code2country.get(_get_param(d, "home_country"))
+            try:
+                moves.append(_make_move(d, host_country, nationalities, home_country))
+            except ValueError as exc:
+                return HttpResponseBadRequest(f"Invalid move at index {i}: {exc}")
+
+        matched = iter(matching.get_processes([m for m in moves if m]))
+        processes = [next(matched) if m else [] for m in moves]
+        return OwldockStreamingJsonResponse(
+            {
+                "process_rulesets": _serialize_process_rulesets(processes),
+                "moves": (
+                    {
+                        "processes": [
+                            {
+                                "process_ruleset": process.route.processruleset.id,
+                                "steps": [step.id for step in process.steps],
+                            }
+                            for process in move_processes
+                        ]
+                    }
+                    for move_processes in processes
+                ),
+            }
+        )
+
+
+def _get_applicant_countries(
+    client_contact: client_orm_models.ClientContact, applicant_uuids: Set[str]
+) -> Dict[str, Tuple[List[Country], Country]]:
+    """
+    Return nationalities and home country of the client contact's applicants.
+    """
+    applicants = list(
+        client_contact.applicants()
+        .filter(uuid__in=applicant_uuids)
+        .values_list("id", "uuid", "home_country_uuid")
+    )
+    applicant_id2country_uuids = defaultdict(list)
+    for (
+        applicant_id,
+        country_uuid,
+    ) in client_orm_models.ApplicantNationality.objects.filter(
+        applicant_id__in=[id for id, _, _ in applicants]
+    ).values_list(
+        "applicant_id", "country_uuid"
+    ):
+        applicant_id2country_uuids[applicant_id].append(country_uuid)
+    uuid2country = {
+        c.uuid: c
+        for c in Country.objects.filter(
+            uuid__in={home_country_uuid for _, _, home_country_uuid in applicants}
+            | {u for uuids in applicant_id2country_uuids.values() for u in uuids}
+        )
+    }
+    return {
+        str(uuid): (
+            [uuid2country[u] for u in applicant_id2country_uuids[id]],
+            uuid2country[home_country_uuid],
+        )
+        for id, uuid, home_country_uuid in applicants
+    }
+
+
+def _serialize_process_rulesets(processes: List[List[Process]]) -> Dict[int, Any]:
+    """
+    Serialize the ProcessRuleSets of the processes, keyed by id.
+
+    Each ProcessRuleSet is serialized once.
+    """
+    code2ids: Dict[str, Set[int]] = defaultdict(set)
+    for move_processes in processes:
+        for process in move_processes:
+            code2ids[process.route.host_country.code].add(
+                process.route.processruleset.id
+            )
+    process_rulesets: Dict[int, Any] = {}
+    for host_country_code, ids in code2ids.items():
+        orm_models = immigration_api.models.ProcessRuleSetList.get_orm_models(
+            host_country_code, ids=ids
+        )
+        data = serialize(immigration_api.models.ProcessRuleSetList, orm_models)
+        process_rulesets.update((prs["id"], prs) for prs in data)
+    return process_rulesets
+
+
+def _get_param(params: Mapping[str, Any], key: str) -> str:
+    value = params.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def _get_codes(params: Mapping[str, Any], key: str) -> Set[str]:
+    """
+    Return the country codes of a comma-separated string or list param, raising
+    ValueError if it is neither.
+    """
+    value = params.get(key) or ""
+    if isinstance(value, list):
+        codes = value
+    elif isinstance(value, str):
+        codes = value.strip().split(",")
+    else:
+        raise ValueError(f"{key} must be a string or a list")
+    return {str(s).strip() for s in codes if str(s).strip()}
+
+
+def _make_move(
+    params: Mapping[str, Any],
+    host_country: Country,
+    nationalities: List[Country],
+    home_country: Optional[Country],
+) -> Move:
+    """
+    Construct a Move from URL params, raising ValueError if any are invalid.
+    """
+    locations: Dict[str, Optional[Location]] = {}
+    for key in ["contract_location", "payroll_location"]:
+        value = _get_param(params, key)
+        locations[key] = Location(value) if value else None
+    dates: Dict[str, Optional[date]] = {}
+    for key in ["target_entry_date", "target_exit_date"]:
+        value = _get_param(params, key)
+        dates[key] = date.fromisoformat(value) if value else None
+    salary = _get_param(params, "salary")
+    amount: Optional[Decimal] = None
+    if salary:
+        try:
+            amount = Decimal(salary)
+        except InvalidOperation:
+            raise ValueError(f"salary is not a number: {salary}")
+    return Move(
+        host_country=host_country,
+        nationalities=nationalities,
+        home_country=home_country,
+        salary=(
+            Money(amount, _get_param(params, "salary_currency") or "EUR")
+            if amount is not None
+            else None
+        ),
+        **locations,
+        **dates,
+    )
@@ -1,4 +1,4 @@
-from typing import TypeVar
+from typing import Optional, Type, TypeVar
 from uuid import UUID
 
 from django.db.models import Model
@@ -20,7 +20,13 @@ from app.api.http.client_or_provider_contact import (
 from client import api as client_api
 from client import models as client_orm_models
 from owldock.api.http.base import BaseView
-from owldock.dev.db_utils import assert_max_queries
+from owldock.api.serialization import serialize
+from owldock.database_router import (
+    find_client_db,
+    get_client_db_names,
+    set_request_client_db,
+)
+from owldock.state_machine.role import get_principal_from_http_request
 from owldock.http import (
     HttpResponseForbidden,
     make_explanatory_http_response,
@@ -33,44 +39,61 @@ M = TypeVar("M", bound=Model)
 
 # TODO: Refactor to share implementation with _ClientContactView
 class _ProviderContactView(BaseView):
+    # The client model of the object identified by the `uuid` URL param, if any,
+    # and the lookup of its client's UUID. The request uses the client database
+    # holding the object.
+    uuid_model: Optional[Type[Model]] = None
+    uuid_model_client_uuid_lookup = ""
+
     def setup(self, *args, **kwargs):
         self.provider_contact: app_orm_models.ProviderContact
 
         super().setup(*args, **kwargs)
-        try:
-            self.provider_contact = app_orm_models.ProviderContact.objects.get(
-                user=self.request.user  # type: ignore
-            )
-        except app_orm_models.ProviderContact.DoesNotExist:
-            self.provider_contact = None  # type: ignore
+        self.provider_contact = get_principal_from_http_request(  # type: ignore
+            self.request
+        ).provider_contact
 
     def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
         if not self.provider_contact:
             return HttpResponseForbidden("User is not a provider contact")
         else:
+            if self.uuid_model is not None:
+                set_request_client_db(
+                    request,
+                    find_client_db(
+                        self.uuid_model,
+                        kwargs["uuid"],
+                        self.uuid_model_client_uuid_lookup,
+                    ),
+                )
             return super().dispatch(request, *args, **kwargs)
 
 
 class ApplicantList(_ProviderContactView):
     def get(self, request: HttpRequest) -> HttpResponse:
-        with assert_max_queries(5):
-            applicant_orm_models = self.provider_contact.applicants().all()
+        applicant_orm_models = client_api.read.applicant.prefetch_applicants(
+            self.provider_contact.applicants().using(db) for db in get_client_db_names()
+        )
 
-        with assert_max_queries(5):
-            applicant_list_api_model = client_api.models.ApplicantList.from_orm(
-                applicant_orm_models
-            )
-            response = OwldockJsonResponse(applicant_list_api_model.dict()["__root__"])
+        response = OwldockJsonResponse(
+            serialize(client_api.models.ApplicantList, applicant_orm_models)
+        )
 
         return response
 
 
 class CaseView(ClientOrProviderCaseViewMixin, _ProviderContactView):
+    uuid_model = client_orm_models.Case
+    uuid_model_client_uuid_lookup = "client_contact__client__uuid"
+
     def get(self, request: HttpRequest, uuid: UUID) -> HttpResponse:
         return self._get(request, uuid, self.provider_contact)
 
 
 class CaseStepView(_ProviderContactView):
+    uuid_model = client_orm_models.CaseStep
+    uuid_model_client_uuid_lookup = "case__client_contact__client__uuid"
+
     def get(self, request: HttpRequest, uuid: UUID) -> HttpResponse:
         qs = self.provider_contact.case_steps()
         kwargs = {"uuid": uuid}
@@ -90,12 +113,18 @@ class CaseList(ClientOrProviderCaseListMixin, _ProviderContactView):
 
 
 class CaseStepUploadFiles(_ProviderContactView):
+    uuid_model = client_orm_models.CaseStep
+    uuid_model_client_uuid_lookup = "case__client_contact__client__uuid"
+
     @atomic
     def post(self, request: HttpRequest, uuid: UUID) -> HttpResponse:
         return add_uploaded_files_to_case_step(self.provider_contact, request, uuid)
 
 
 class AcceptCaseStep(_ProviderContactView):
+    uuid_model = client_orm_models.CaseStep
+    uuid_model_client_uuid_lookup = "case__client_contact__client__uuid"
+
     def post(self, request: HttpRequest, uuid: UUID) -> HttpResponse:
         return perform_case_step_transition(
             "accept",
@@ -106,6 +135,9 @@ class AcceptCaseStep(_ProviderContactView):
 
 
 class RejectCaseStep(_ProviderContactView):
+    uuid_model = client_orm_models.CaseStep
+    uuid_model_client_uuid_lookup = "case__client_contact__client__uuid"
+
     def post(self, request: HttpRequest, uuid: UUID) -> HttpResponse:
         return perform_case_step_transition(
             "reject",
@@ -116,6 +148,9 @@ class RejectCaseStep(_ProviderContactView):
 
 
 class CompleteCaseStep(_ProviderContactView):
+    uuid_model = client_orm_models.CaseStep
+    uuid_model_client_uuid_lookup = "case__client_contact__client__uuid"
+
     def post(self, request: HttpRequest, uuid: UUID) -> HttpResponse:
         return perform_case_step_transition(
             "complete",
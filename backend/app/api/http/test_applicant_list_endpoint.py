@@ -0,0 +1,43 @@
+from django.test import Client as DjangoTestClient
+
+from app.models import Country, ProviderContact
+from client.models import ApplicantNationality, ClientContact
+from immigration.models import ProcessRuleSet
+
+# TODO: Move client tests and endpoints into the client module
+from client.tests.conftest import *  # noqa
+from client.tests.factories import ApplicantFactory
+from client.tests.fake_create_case import fake_create_case_and_earmark_steps
+from owldock.tests.constants import TEST_PASSWORD
+
+
+def test_provider_contact_applicant_list_is_within_query_budget(
+    brazil: Country,
+    france: Country,
+    client_contact_A: ClientContact,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    provider_contact_A: ProviderContact,
+    django_test_client: DjangoTestClient,
+):
+    # The query budget is enforced in tests.
+    n_applicants = 8
+    for i in range(n_applicants):
+        applicant = ApplicantFactory(employer=client_contact_A.client)
+        for country in [brazil, france][: i % 3]:
+            ApplicantNationality.objects.create(
+                applicant=applicant, country_uuid=country.uuid
+            )
+        fake_create_case_and_earmark_steps(
+            applicant,
+            client_contact_A,
+            greece_local_hire_article_17_rule_set,
+            provider_contact_A,
+        )
+
+    assert django_test_client.login(
+        username=provider_contact_A.user.username,
+        password=TEST_PASSWORD,
+    )
+    response = django_test_client.get("/api/provider-contact/list-applicants/")
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == n_applicants
@@ -1,13 +1,29 @@
+import gzip
 import json
+from contextlib import ExitStack
+from typing import Any, List, Tuple
+
+import brotli
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.http import HttpResponse
 from django.test import Client as DjangoTestClient
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
+from app.api.http import client_contact as client_contact_endpoints
 from app.models import ProviderContact
-from client.models import Applicant, ClientContact
+from client.models import Applicant, Case, ClientContact
 from immigration.models import ProcessRuleSet
 
 # TODO: Move client tests and endpoints into the client module
 from client.tests.conftest import *  # noqa
-from client.tests.fake_create_case import fake_create_case_and_earmark_steps
+from client.tests.factories import ApplicantFactory
+from client.tests.fake_create_case import (
+    fake_create_case_and_earmark_steps,
+    make_post_data_for_client_contact_case_create_endpoint,
+)
 from owldock.tests.constants import TEST_PASSWORD
 
 
@@ -67,3 +83,178 @@ def test_provider_contact_case_access(
     case_data = response.json()["data"]
     case_step_uuids = [step["uuid"] for step in case_data["steps"]]
     assert case_step_uuids == [str(case_step.uuid)]
+
+
+def test_client_contact_case_list_pagination_and_filters(
+    client_contact_A: ClientContact,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    greece_eu_eea_swiss_national_registration_rule_set: ProcessRuleSet,
+    provider_contact_A: ProviderContact,
+    django_test_client: DjangoTestClient,
+):
+    applicants = [ApplicantFactory(employer=client_contact_A.client) for _ in range(5)]
+    for i, applicant in enumerate(applicants):
+        fake_create_case_and_earmark_steps(
+            applicant,
+            client_contact_A,
+            [
+                greece_local_hire_article_17_rule_set,
+                greece_eu_eea_swiss_national_registration_rule_set,
+            ][i % 2],
+            provider_contact_A,
+        )
+    # Cases created at the same time are ordered by UUID.
+    client_contact_A.cases().update(created_at=timezone.now())
+    assert django_test_client.login(
+        username=client_contact_A.user.username,
+        password=TEST_PASSWORD,
+    )
+    url = "/api/client-contact/list-cases/"
+    all_cases = _get_json(django_test_client.get(url))["data"]
+    assert len(all_cases) == 5
+    assert [c["uuid"] for c in all_cases] == sorted(
+        (c["uuid"] for c in all_cases), reverse=True
+    )
+
+    paged_cases, cursor = [], ""
+    while True:
+        data = django_test_client.get(url, {"page_size": 2, "cursor": cursor}).json()[
+            "data"
+        ]
+        paged_cases.extend(data["cases"])
+        assert len(data["cases"]) == (2 if data["next_cursor"] else 1)
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+    assert paged_cases == all_cases
+
+    [case] = django_test_client.get(
+        url, {"page_size": 10, "applicant": str(applicants[0].uuid)}
+    ).json()["data"]["cases"]
+    assert case["applicant"]["uuid"] == str(applicants[0].uuid)
+
+    cases = _get_json(
+        django_test_client.get(url, {"step_state": "EARMARKED", "host_country": "GR"})
+    )["data"]
+    assert cases == all_cases
+    assert not _get_json(django_test_client.get(url, {"step_state": "COMPLETE"}))[
+        "data"
+    ]
+    assert not _get_json(django_test_client.get(url, {"host_country": "BR"}))["data"]
+    assert not _get_json(django_test_client.get(url, {"created_to": "2000-01-01"}))[
+        "data"
+    ]
+
+
+def _get_json(response: HttpResponse) -> Any:
+    assert response.status_code == 200
+    return json.loads(b"".join(response.streaming_content))
+
+
+def test_client_contact_case_list_compression(
+    applicant_A: Applicant,
+    client_contact_A: ClientContact,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    provider_contact_A: ProviderContact,
+    django_test_client: DjangoTestClient,
+):
+    fake_create_case_and_earmark_steps(
+        applicant_A,
+        client_contact_A,
+        greece_local_hire_article_17_rule_set,
+        provider_contact_A,
+    )
+    assert django_test_client.login(
+        username=client_contact_A.user.username,
+        password=TEST_PASSWORD,
+    )
+    url = "/api/client-contact/list-cases/"
+    data = _get_json(django_test_client.get(url))
+
+    response = django_test_client.get(url, HTTP_ACCEPT_ENCODING="br")
+    assert response["Content-Encoding"] == "br"
+    assert json.loads(brotli.decompress(b"".join(response.streaming_content))) == data
+
+    response = django_test_client.get(
+        url, {"page_size": 10}, HTTP_ACCEPT_ENCODING="gzip"
+    )
+    assert response["Content-Encoding"] == "gzip"
+    assert (
+        json.loads(gzip.decompress(response.content))["data"]["cases"] == data["data"]
+    )
+
+
+def test_client_contact_create_cases(
+    client_contact_A: ClientContact,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    greece_eu_eea_swiss_national_registration_rule_set: ProcessRuleSet,
+    provider_contact_A: ProviderContact,
+    django_test_client: DjangoTestClient,
+):
+    assert django_test_client.login(
+        username=client_contact_A.user.username,
+        password=TEST_PASSWORD,
+    )
+
+    def create_cases(n: int) -> Tuple[List[Case], int]:
+        post_data = [
+            make_post_data_for_client_contact_case_create_endpoint(
+                ApplicantFactory(employer=client_contact_A.client),
+                [
+                    greece_local_hire_article_17_rule_set,
+                    greece_eu_eea_swiss_national_registration_rule_set,
+                ][i % 2],
+                provider_contact_A,
+            )
+            for i in range(n)
+        ]
+        with ExitStack() as stack:
+            capturers = [
+                stack.enter_context(CaptureQueriesContext(cxn))
+                for cxn in connections.all()
+            ]
+            response = django_test_client.post(
+                "/api/client-contact/create-cases/",
+                json.dumps(post_data, cls=DjangoJSONEncoder),
+                content_type="application/json",
+            )
+        assert response.status_code == 200
+        cases = [Case.objects.get(uuid=uuid) for uuid in response.json()["data"]]
+        for case, data in zip(cases, post_data):
+            assert str(case.applicant.uuid) == str(data["applicant"]["uuid"])
+            assert str(case.process_uuid) == str(data["process"]["uuid"])
+            steps = list(case.steps.all())
+            assert len(steps) == len(data["steps"])
+            for step in steps:
+                assert step.state_name == "EARMARKED"
+                assert step.active_contract.case_step == step
+                assert step.active_contract.provider_contact_uuid == (
+                    provider_contact_A.uuid
+                )
+        return cases, sum(len(capturer) for capturer in capturers)
+
+    cases, n_queries = create_cases(1)
+    assert len(cases) == 1
+    cases, n_queries_for_many = create_cases(4)
+    assert len(cases) == 4
+    # Fewer, if objects were found to exist by the first request's validation
+    assert n_queries_for_many <= n_queries
+
+
+def test_client_contact_create_cases_limits_number_of_cases(
+    client_contact_A: ClientContact,
+    django_test_client: DjangoTestClient,
+    monkeypatch,
+):
+    monkeypatch.setattr(client_contact_endpoints, "MAX_BULK_CASES", 2)
+    assert django_test_client.login(
+        username=client_contact_A.user.username,
+        password=TEST_PASSWORD,
+    )
+    response = django_test_client.post(
+        "/api/client-contact/create-cases/",
+        json.dumps([{}] * 3),
+        content_type="application/json",
+    )
+    assert response.status_code == 400
+    assert not Case.objects.exists()
@@ -0,0 +1,74 @@
+import json
+from contextlib import ExitStack
+from typing import Dict
+
+from django.db import connections
+from django.test import Client as DjangoTestClient
+from django.test.utils import CaptureQueriesContext
+
+from app.models import Country, ProviderContact
+from client.models import ApplicantNationality, ClientContact
+from immigration.models import ProcessRuleSet
+
+# TODO: Move client tests and endpoints into the client module
+from client.tests.conftest import *  # noqa
+from client.tests.factories import ApplicantFactory
+from client.tests.fake_create_case import fake_create_case_and_earmark_steps
+from owldock.tests.constants import TEST_PASSWORD
+
+
+def test_case_list_query_count_is_independent_of_number_of_cases(
+    brazil: Country,
+    france: Country,
+    client_contact_A: ClientContact,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    greece_eu_eea_swiss_national_registration_rule_set: ProcessRuleSet,
+    provider_contact_A: ProviderContact,
+    django_test_client: DjangoTestClient,
+):
+    process_rulesets = [
+        greece_local_hire_article_17_rule_set,
+        greece_eu_eea_swiss_national_registration_rule_set,
+    ]
+
+    def create_cases(n: int) -> None:
+        for i in range(n):
+            applicant = ApplicantFactory(employer=client_contact_A.client)
+            for country in [brazil, france][: i % 3]:
+                ApplicantNationality.objects.create(
+                    applicant=applicant, country_uuid=country.uuid
+                )
+            fake_create_case_and_earmark_steps(
+                applicant,
+                client_contact_A,
+                process_rulesets[i % 2],
+                provider_contact_A,
+            )
+
+    assert django_test_client.login(
+        username=client_contact_A.user.username,
+        password=TEST_PASSWORD,
+    )
+    create_cases(1)
+    # Build immigration data snapshots
+    _get_query_counts(django_test_client)
+    query_counts = _get_query_counts(django_test_client)
+
+    create_cases(10)
+    assert _get_query_counts(django_test_client) == query_counts
+
+
+def _get_query_counts(django_test_client: DjangoTestClient) -> Dict[str, int]:
+    """
+    Return the number of queries made by the case list endpoint, per database.
+    """
+    with ExitStack() as stack:
+        capturers = {
+            cxn.alias: stack.enter_context(CaptureQueriesContext(cxn))
+            for cxn in connections.all()
+        }
+        response = django_test_client.get("/api/client-contact/list-cases/")
+        assert response.status_code == 200
+        # The content is generated as it is consumed.
+        assert not json.loads(b"".join(response.streaming_content))["errors"]
+    return {alias: len(c.captured_queries) for alias, c in capturers.items()}
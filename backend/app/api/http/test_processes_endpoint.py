@@ -0,0 +1,113 @@
+import json
+
+from django.test import Client as DjangoTestClient
+
+from app.models import Country
+from client.models import ApplicantNationality, ClientContact
+
+# TODO: Move client tests and endpoints into the client module
+from client.tests.conftest import *  # noqa
+from client.tests.factories import ApplicantFactory
+from immigration.models import ProcessRuleSet
+from owldock.tests.constants import TEST_PASSWORD
+
+
+def test_process_list(
+    admin_user_client,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    greece_technical_assignment_article_18_route_rule_set: ProcessRuleSet,
+):
+    def _get_ids(params: str):
+        response = admin_user_client.get(f"/api/processes/?{params}")
+        assert response.status_code == 200
+        return {prs["id"] for prs in response.json()["data"]}
+
+    article_17 = greece_local_hire_article_17_rule_set
+    article_18 = greece_technical_assignment_article_18_route_rule_set
+
+    assert _get_ids("host_country=GR&nationalities=BR") == {
+        article_17.id,
+        article_18.id,
+    }
+    assert _get_ids("host_country=GR&nationalities=FR") == set()
+    assert _get_ids(
+        "host_country=GR&nationalities=BR&payroll_location=HOST_COUNTRY"
+    ) == {article_17.id}
+    assert _get_ids(
+        "host_country=GR&nationalities=BR"
+        "&target_entry_date=2021-01-01&target_exit_date=2022-01-01"
+    ) == {article_17.id}
+
+
+def test_process_list_bulk(
+    django_test_client: DjangoTestClient,
+    client_contact_A: ClientContact,
+    brazil: Country,
+    greece: Country,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    greece_technical_assignment_article_18_route_rule_set: ProcessRuleSet,
+):
+    article_17 = greece_local_hire_article_17_rule_set
+    article_18 = greece_technical_assignment_article_18_route_rule_set
+    applicant = ApplicantFactory(employer=client_contact_A.client)
+    ApplicantNationality.objects.create(applicant=applicant, country_uuid=brazil.uuid)
+    assert django_test_client.login(
+        username=client_contact_A.user.username,
+        password=TEST_PASSWORD,
+    )
+
+    response = django_test_client.post(
+        "/api/processes-bulk/",
+        json.dumps(
+            {
+                "moves": [
+                    {"host_country": "GR", "nationalities": ["BR"]},
+                    {"host_country": "GR", "nationalities": ["FR"]},
+                    {"host_country": "GR", "applicant": str(applicant.uuid)},
+                    {
+                        "host_country": "GR",
+                        "applicant": str(applicant.uuid),
+                        "payroll_location": "HOME_COUNTRY",
+                    },
+                ]
+            }
+        ),
+        content_type="application/json",
+    )
+    assert response.status_code == 200
+    data = json.loads(b"".join(response.streaming_content))["data"]
+
+    assert set(data["process_rulesets"]) == {str(article_17.id), str(article_18.id)}
+    assert [
+        {p["process_ruleset"] for p in move["processes"]} for move in data["moves"]
+    ] == [
+        {article_17.id, article_18.id},
+        set(),
+        {article_17.id, article_18.id},
+        {article_18.id},
+    ]
+    [process] = data["moves"][3]["processes"]
+    assert process["steps"] == [step.id for step in article_18.steps]
+
+
+def test_process_list_bulk_rejects_invalid_requests(
+    django_test_client: DjangoTestClient,
+    client_contact_A: ClientContact,
+    greece: Country,
+):
+    assert django_test_client.login(
+        username=client_contact_A.user.username,
+        password=TEST_PASSWORD,
+    )
+    for body in [
+        "{",
+        json.dumps([]),
+        json.dumps({"moves": {}}),
+        json.dumps({"moves": [1]}),
+        json.dumps({"moves": [{"host_country": "GR", "nationalities": 5}]}),
+        json.dumps({"moves": [{"host_country": "GR", "applicant": "x"}]}),
+    ]:
+        response = django_test_client.post(
+            "/api/processes-bulk/", body, content_type="application/json"
+        )
+        assert response.status_code == 400, body
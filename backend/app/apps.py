@@ -1,6 +1,8 @@
 from django.apps import AppConfig as _AppConfig
 
 from app import signal_receivers  # noqa
+from owldock import database_connections  # noqa
+from owldock import instrumentation  # noqa
 
 
 class AppConfig(_AppConfig):
@@ -0,0 +1,293 @@
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, List
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from app import api as app_api
+from app.models import Bloc, Country, Provider, ProviderContact, User
+from client import api as client_api
+from client.models import (
+    Applicant,
+    ApplicantNationality,
+    CaseStep,
+    Client,
+    ClientContact,
+    ClientProviderRelationship,
+)
+from client.models.case_step import State as CaseStepState
+from immigration import api as immigration_api
+from immigration.models import (
+    ProcessRuleSet,
+    ProcessRuleSetStep,
+    ProcessStep,
+    ProcessStepApplicability,
+    ProcessStepType,
+)
+from owldock.database_router import get_client_db_names, using_client_db
+
+# The immigration data corpus, in dependency order
+RULESET_CORPUS_FIXTURES = [
+    "country.json",
+    "issueddocument.json",
+    "route.json",
+    "serviceitem.json",
+    "processstep.json",
+    "processruleset.json",
+    "processrulesetstep.json",
+]
+
+
+@dataclass
+class BenchmarkWorld:
+    """
+    The objects of a benchmark world that endpoints are requested for.
+    """
+
+    client_contact_user: User
+    provider_contact_user: User
+    case_uuid: uuid.UUID
+    case_step_uuid: uuid.UUID
+    process_ruleset: ProcessRuleSet
+    host_country_code: str
+    nationality_code: str
+
+
+def create_benchmark_world(
+    n_clients: int, n_applicants: int, n_cases: int, n_steps: int
+) -> BenchmarkWorld:
+    """
+    Create a world of `n_clients` clients (spread over the client databases),
+    each with `n_applicants` applicants, each with `n_cases` cases of (up to)
+    `n_steps` steps, using the process rulesets of the immigration data corpus
+    (db/*.json).
+
+    Every step is offered to one provider contact, so that the provider contact
+    endpoints return all cases.
+    """
+    load_ruleset_corpus()
+    with atomic():
+        _create_blocs()
+        provider_contact = _create_provider()
+    processes = _get_processes(n_steps)
+    process_data = _get_process_data(processes, n_steps, provider_contact)
+    client_contacts = []
+    for i in range(n_clients):
+        db = get_client_db_names()[i % len(get_client_db_names())]
+        with using_client_db(db), atomic(using=db):
+            client_contact = _create_client(i, provider_contact.provider)
+            applicants = _create_applicants(client_contact.client, n_applicants)
+            _create_cases(client_contact, applicants, n_cases, processes, process_data)
+            CaseStep.objects.update(state_name=CaseStepState.OFFERED.name)
+        client_contacts.append(client_contact)
+
+    client_contact = client_contacts[0]
+    with using_client_db(client_contact._state.db):
+        case = client_contact.cases().order_by("id").first()
+        case_step = case.steps.order_by("id").first()
+        applicant = case.applicant
+        nationality = applicant.applicantnationality_set.first()
+    return BenchmarkWorld(
+        client_contact_user=client_contact.user,
+        provider_contact_user=provider_contact.user,
+        case_uuid=case.uuid,
+        case_step_uuid=case_step.uuid,
+        process_ruleset=case.process,
+        host_country_code=case.process.route.host_country.code,
+        nationality_code=Country.objects.get(uuid=nationality.country_uuid).code,
+    )
+
+
+def load_ruleset_corpus() -> None:
+    call_command(
+        "loaddata",
+        *(settings.BASE_DIR / "db" / name for name in RULESET_CORPUS_FIXTURES),
+        # The corpus may predate fields that have since been removed.
+        ignorenonexistent=True,
+        verbosity=0,
+    )
+    # ...and fields that have since been added.
+    ProcessStep.objects.filter(type="").update(type=ProcessStepType.PRIMARY)
+    ProcessStep.objects.filter(applies_to="").update(
+        applies_to=ProcessStepApplicability.PRINCIPAL
+    )
+    # A few steps of the corpus belong to a process ruleset of another country.
+    ProcessRuleSetStep.objects.exclude(
+        process_step__host_country=F("process_ruleset__route__host_country")
+    ).delete()
+
+
+def _get_processes(n_steps: int) -> List[ProcessRuleSet]:
+    """
+    Return the process rulesets with at least `n_steps` steps, or with the most
+    steps if there are none.
+    """
+    qs = ProcessRuleSet.objects.annotate(n_steps=Count("process_steps")).select_related(
+        "route__host_country"
+    )
+    max_steps = qs.order_by("-n_steps").values_list("n_steps", flat=True).first()
+    if not max_steps:
+        raise ValueError("There are no process rulesets with steps")
+    return list(qs.filter(n_steps__gte=min(n_steps, max_steps)).order_by("id"))
+
+
+def _create_blocs() -> None:
+    """
+    Create a bloc for each distinct set of nationalities to which a process
+    ruleset is restricted, so that nationalities can be described in terms of
+    blocs.
+    """
+    country_id_sets = set()
+    for process in ProcessRuleSet.objects.prefetch_related("nationalities"):
+        country_ids = frozenset(c.id for c in process.nationalities.all())
+        if country_ids:
+            country_id_sets.add(country_ids)
+    for i, country_ids in enumerate(sorted(country_id_sets, key=sorted)):
+        bloc = Bloc.objects.create(name=f"Benchmark Bloc {i}")
+        bloc.countries.set(country_ids)
+
+
+def _create_provider() -> ProviderContact:
+    provider = Provider.objects.create(
+        name="Benchmark Provider",
+        url="https://provider.example.com",
+        logo_url="https://provider.example.com/logo.png",
+        # Invalid, but the constraint is deferred to the end of the transaction.
+        primary_contact_id=0,
+    )
+    provider_contact = ProviderContact.objects.create(
+        provider=provider, user=_create_user("provider-contact")
+    )
+    provider.primary_contact = provider_contact
+    provider.save()
+    return provider_contact
+
+
+def _create_client(i: int, provider: Provider) -> ClientContact:
+    client = Client.objects.create(
+        name=f"Benchmark Client {i}",
+        entity_domain_name=f"client-{i}.example.com",
+        logo_url=f"https://client-{i}.example.com/logo.png",
+    )
+    ClientProviderRelationship.objects.create(
+        client=client, provider_uuid=provider.uuid, preferred=True
+    )
+    client_contact = ClientContact.objects.create(
+        client=client, user_uuid=_create_user(f"client-contact-{i}").uuid
+    )
+    return client_contact
+
+
+def _create_applicants(client: Client, n: int) -> List[Applicant]:
+    countries = list(Country.objects.order_by("id"))
+    users = get_user_model().objects.bulk_create(
+        [
+            get_user_model()(
+                username=f"applicant-{j}@{client.entity_domain_name}",
+                email=f"applicant-{j}@{client.entity_domain_name}",
+                first_name=f"Applicant{j}",
+                last_name=client.name,
+            )
+            for j in range(n)
+        ]
+    )
+    Applicant.objects.bulk_create(
+        [
+            Applicant(
+                employer=client,
+                user_uuid=user.uuid,
+                home_country_uuid=countries[j % len(countries)].uuid,
+            )
+            for j, user in enumerate(users)
+        ]
+    )
+    # Databases that cannot return the primary keys of rows inserted in bulk
+    # (e.g. SQLite) return none.
+    applicants = list(Applicant.objects.filter(employer=client).order_by("id"))
+    ApplicantNationality.objects.bulk_create(
+        [
+            ApplicantNationality(
+                applicant=applicant, country_uuid=applicant.home_country_uuid
+            )
+            for applicant in applicants
+        ]
+    )
+    return applicants
+
+
+def _create_cases(
+    client_contact: ClientContact,
+    applicants: List[Applicant],
+    n_cases: int,
+    processes: List[ProcessRuleSet],
+    process_data: Dict[int, dict],
+) -> None:
+    now = timezone.now()
+    api_cases = []
+    for i, applicant in enumerate(applicants):
+        applicant_data = client_api.models.Applicant.from_orm(applicant).dict()
+        for j in range(n_cases):
+            process = processes[(i * n_cases + j) % len(processes)]
+            api_cases.append(
+                client_api.models.Case(
+                    applicant=applicant_data,
+                    move={
+                        "host_country": process.route.host_country,
+                        "target_entry_date": now.date(),
+                        "target_exit_date": (now + timedelta(days=500)).date(),
+                    },
+                    **process_data[process.id],
+                )
+            )
+    client_api.write.case.create_many_for_client_contact(api_cases, client_contact)
+
+
+def _get_process_data(
+    processes: List[ProcessRuleSet], n_steps: int, provider_contact: ProviderContact
+) -> Dict[int, dict]:
+    """
+    Return the case data for each process: its first `n_steps` steps, all
+    earmarked for the provider contact.
+    """
+    provider_contact_data = app_api.models.ProviderContact.from_orm(
+        provider_contact
+    ).dict()
+    data = {}
+    for process in processes:
+        process_steps = ProcessStep.objects.filter(
+            processrulesetstep__process_ruleset=process
+        ).order_by("processrulesetstep__id")[:n_steps]
+        data[process.id] = {
+            "process": immigration_api.models.ProcessRuleSet.from_orm(process).dict(),
+            "steps": [
+                {
+                    "actions": [],
+                    "active_contract": {"provider_contact": provider_contact_data},
+                    "process_step": immigration_api.models.ProcessStep.from_orm(
+                        process_step
+                    ).dict(),
+                    "state": {
+                        "value": CaseStepState.FREE.value,
+                        "name": CaseStepState.FREE.name,
+                    },
+                    "stored_files": [],
+                }
+                for process_step in process_steps
+            ],
+        }
+    return data
+
+
+def _create_user(name: str) -> User:
+    return get_user_model().objects.create_user(
+        username=f"{name}@example.com",
+        email=f"{name}@example.com",
+        first_name=name,
+        last_name="Benchmark",
+    )
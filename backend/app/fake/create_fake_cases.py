@@ -6,10 +6,17 @@ from app.models import Provider, ProviderContact
 from client.models import Applicant, ClientProviderRelationship
 from client.tests.fake_create_case import fake_create_case_and_earmark_steps
 from immigration.models import ProcessRuleSet
+from owldock.database_router import get_client_db_names, using_client_db
 
 
 @atomic
 def create_fake_cases(n: int):
+    for db in get_client_db_names():
+        with using_client_db(db):
+            _create_fake_cases(n)
+
+
+def _create_fake_cases(n: int):
     for applicant in Applicant.objects.all():
         client = applicant.employer
         valid_client_contacts = client.clientcontact_set.all()
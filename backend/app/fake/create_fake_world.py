@@ -1,7 +1,7 @@
 import json
 import os
 import random
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from urllib.parse import urlparse
 
 from django.conf import settings
@@ -24,6 +24,7 @@ from client.models import (
     ApplicantNationality,
 )
 from owldock.create_superusers import create_superusers
+from owldock.database_router import get_client_db_names, using_client_db
 from owldock.utils import strip_prefix
 
 
@@ -49,26 +50,27 @@ class _FakeWorldCreator:
             Country.objects.get(code="US"),
         ]
         all_countries = list(Country.objects.all())
-        for (i, client) in enumerate(Client.objects.all()):
+        for (i, (db, client)) in enumerate(_get_all_clients()):
             country = countries[i % len(countries)]
-            for _ in range(n):
-                user = self._create_fake_user(client.entity_domain_name)
-
-                applicant = Applicant.objects.create(
-                    employer=client,
-                    home_country_uuid=country.uuid,
-                    user_uuid=user.uuid,
-                )
-                ApplicantNationality.objects.create(
-                    applicant=applicant, country_uuid=country.uuid
-                )
-                is_dual_national = random.uniform(0, 1) < 1 / 3
-                if is_dual_national:
-                    other_countries = list(set(all_countries) - {country})
-                    second_country = random.choice(other_countries)
+            with using_client_db(db):
+                for _ in range(n):
+                    user = self._create_fake_user(client.entity_domain_name)
+
+                    applicant = Applicant.objects.create(
+                        employer=client,
+                        home_country_uuid=country.uuid,
+                        user_uuid=user.uuid,
+                    )
                     ApplicantNationality.objects.create(
-                        applicant=applicant, country_uuid=second_country.uuid
+                        applicant=applicant, country_uuid=country.uuid
                     )
+                    is_dual_national = random.uniform(0, 1) < 1 / 3
+                    if is_dual_national:
+                        other_countries = list(set(all_countries) - {country})
+                        second_country = random.choice(other_countries)
+                        ApplicantNationality.objects.create(
+                            applicant=applicant, country_uuid=second_country.uuid
+                        )
 
     def _create_providers(self) -> None:
         print("Creating provider contacts")
@@ -97,64 +99,69 @@ class _FakeWorldCreator:
 
     def _create_client_contacts(self) -> None:
         print("Creating client contacts")
-        for (
+        client_dbs = get_client_db_names()
+        for i, (
             first_name,
             last_name,
             client_name,
             client_entity_domain_name,
             logo_url,
             provider_predicate,
-        ) in [
-            (
-                "Christine",
-                "Cantor",
-                "Coca-Cola",
-                "cocacola.com",
-                "https://upload.wikimedia.org/wikipedia/commons/c/ce/Coca-Cola_logo.svg",
-                lambda provider: provider.name.lower() < "m",
-            ),
-            (
-                "Petra",
-                "Pythagoras",
-                "Pepsi",
-                "pepsi.com",
-                "https://upload.wikimedia.org/wikipedia/commons/0/0f/Pepsi_logo_2014.svg",
-                lambda provider: provider.name.lower() >= "m",
-            ),
-            (
-                "FakeFirstName",
-                "FakeLastName",
-                "FakeClientName",
-                "fake-owldock-client.com",
-                "https://previews.123rf.com/images/deniaz/deniaz2001/deniaz200100234/138923282-a-logo-design-about-fake-news-fake-news-logo-fake-news-tag-vector-illustration.jpg",  # noqa
-                lambda provider: False,
-            ),
-        ]:
-            email = _make_email(first_name, client_entity_domain_name)
-            user = self._create_user(first_name, last_name, email)
-            client, _ = Client.objects.get_or_create(
-                name=client_name,
-                entity_domain_name=client_entity_domain_name,
-                logo_url=logo_url,
-            )
-            ClientContact.objects.create(client=client, user_uuid=user.uuid)
-            if client_name == "FakeClientName":
-                continue
-            preferred_provider, *other_providers = [
-                p for p in Provider.objects.all() if provider_predicate(p)
+        ) in enumerate(
+            [
+                (
+                    "Christine",
+                    "Cantor",
+                    "Coca-Cola",
+                    "cocacola.com",
+                    "https://upload.wikimedia.org/wikipedia/commons/c/ce/Coca-Cola_logo.svg",
+                    lambda provider: provider.name.lower() < "m",
+                ),
+                (
+                    "Petra",
+                    "Pythagoras",
+                    "Pepsi",
+                    "pepsi.com",
+                    "https://upload.wikimedia.org/wikipedia/commons/0/0f/Pepsi_logo_2014.svg",
+                    lambda provider: provider.name.lower() >= "m",
+                ),
+                (
+                    "FakeFirstName",
+                    "FakeLastName",
+                    "FakeClientName",
+                    "fake-owldock-client.com",
+                    "https://previews.123rf.com/images/deniaz/deniaz2001/deniaz200100234/138923282-a-logo-design-about-fake-news-fake-news-logo-fake-news-tag-vector-illustration.jpg",  # noqa
+                    lambda provider: False,
+                ),
             ]
+        ):
+            db = client_dbs[i % len(client_dbs)]
+            with using_client_db(db):
+                email = _make_email(first_name, client_entity_domain_name)
+                user = self._create_user(first_name, last_name, email)
+                client, _ = Client.objects.get_or_create(
+                    name=client_name,
+                    entity_domain_name=client_entity_domain_name,
+                    logo_url=logo_url,
+                )
+                ClientContact.objects.create(client=client, user_uuid=user.uuid)
+                if client_name == "FakeClientName":
+                    continue
+                preferred_provider, *other_providers = [
+                    p for p in Provider.objects.all() if provider_predicate(p)
+                ]
 
-            ClientProviderRelationship.objects.create(
-                client=client,
-                provider_uuid=Provider.objects.get(name=preferred_provider).uuid,
-                preferred=True,
-            )
-            for provider in other_providers:
                 ClientProviderRelationship.objects.create(
                     client=client,
-                    provider_uuid=Provider.objects.get(name=provider).uuid,
-                    preferred=False,
+                    provider_uuid=Provider.objects.get(name=preferred_provider).uuid,
+                    preferred=True,
                 )
+                for provider in other_providers:
+                    ClientProviderRelationship.objects.create(
+                        client=client,
+                        provider_uuid=Provider.objects.get(name=provider).uuid,
+                        preferred=False,
+                    )
 
     def _create_user(
         self,
@@ -198,8 +205,19 @@ def _make_email(name: str, domain_name: str) -> str:
     return f"{name}-{company}@example.com".lower()
 
 
+def _get_all_clients() -> List[Tuple[str, Client]]:
+    """
+    Return all clients, with their client databases.
+    """
+    return [
+        (db, client)
+        for db in get_client_db_names()
+        for client in Client.objects.using(db)
+    ]
+
+
 def assert_this_is_the_fake_world():
-    assert {c.name for c in Client.objects.all()} == {
+    assert {c.name for _, c in _get_all_clients()} == {
         "Coca-Cola",
         "Pepsi",
         "FakeClientName",
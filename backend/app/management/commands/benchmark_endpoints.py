@@ -0,0 +1,473 @@
+import io
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import ExitStack, redirect_stdout
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.http import HttpResponse
+from django.test import Client as DjangoTestClient
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from django.urls import get_resolver
+
+from app.fake.create_benchmark_world import BenchmarkWorld, create_benchmark_world
+
+# Endpoints that are not benchmarked, because they mutate the world.
+MUTATING_ENDPOINTS = {
+    "api/client-contact/create-case/",
+    "api/client-contact/create-cases/",
+    "api/client-contact/earmark-case-step/<uuid:uuid>",
+    "api/client-contact/offer-case-step/<uuid:uuid>",
+    "api/client-contact/retract-case-step-contract/<uuid:uuid>",
+    "api/client-contact/case-step-upload-files/<uuid:uuid>/",
+    "api/provider-contact/accept-case-step/<uuid:uuid>",
+    "api/provider-contact/reject-case-step-contract/<uuid:uuid>",
+    "api/provider-contact/complete-case-step-contract/<uuid:uuid>",
+    "api/provider-contact/case-step-upload-files/<uuid:uuid>/",
+}
+
+# Latency differences smaller than this are noise, however fast the endpoint.
+LATENCY_NOISE_MS = 2.0
+
+
+@dataclass
+class Endpoint:
+    name: str
+    # The URL pattern (as in owldock/urls.py) that the endpoint is an instance of
+    route: str
+    path: str
+    # "client" or "provider": the contact making the request
+    contact: str
+    data: Optional[dict] = None
+
+
+@dataclass
+class EndpointResult:
+    latency_ms: float
+    min_latency_ms: float
+    peak_memory_kb: float
+    queries: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def n_queries(self) -> int:
+        return sum(self.queries.values())
+
+
+class Command(BaseCommand):
+    help = (
+        "Create a benchmark world in the test databases (N clients x M "
+        "applicants x K cases x S steps, with the db/*.json process ruleset "
+        "corpus), and record the latency, query count and peak memory of each "
+        "/api/ endpoint. The results are compared against a JSON baseline, if "
+        "one exists, and saved to it with --save."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=3)
+        parser.add_argument("--applicants", type=int, default=10)
+        parser.add_argument("--cases", type=int, default=3)
+        parser.add_argument("--steps", type=int, default=5)
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument(
+            "--baseline",
+            type=Path,
+            default=settings.BASE_DIR / "benchmark-endpoints-baseline.json",
+        )
+        parser.add_argument(
+            "--save",
+            action="store_true",
+            help="Save the results as the new baseline",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help=(
+                "The fraction by which latency and peak memory may exceed "
+                "the baseline before being reported as a regression"
+            ),
+        )
+        parser.add_argument(
+            "--no-migrations",
+            action="store_true",
+            help="Create the test database tables without running migrations",
+        )
+        parser.add_argument("--keepdb", action="store_true")
+
+    def handle(self, *args, **kwargs):
+        world_params = {
+            "clients": kwargs["clients"],
+            "applicants": kwargs["applicants"],
+            "cases": kwargs["cases"],
+            "steps": kwargs["steps"],
+        }
+        if kwargs["no_migrations"]:
+            settings.MIGRATION_MODULES = _DisableMigrations()
+        setup_test_environment()
+        old_config = setup_databases(
+            verbosity=0, interactive=False, keepdb=kwargs["keepdb"]
+        )
+        try:
+            world = create_benchmark_world(
+                n_clients=kwargs["clients"],
+                n_applicants=kwargs["applicants"],
+                n_cases=kwargs["cases"],
+                n_steps=kwargs["steps"],
+            )
+            results = self._benchmark(world, kwargs["repeat"])
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=kwargs["keepdb"])
+            teardown_test_environment()
+
+        baseline_path: Path = kwargs["baseline"]
+        regressions = []
+        if baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text())
+            if baseline["world"] != world_params:
+                raise CommandError(
+                    f"The baseline in {baseline_path} is for a different world: "
+                    f"{baseline['world']}"
+                )
+            regressions = get_regressions(
+                baseline["endpoints"], results, kwargs["tolerance"]
+            )
+        else:
+            baseline = None
+        self._print_results(results, baseline and baseline["endpoints"])
+
+        if kwargs["save"]:
+            baseline_path.write_text(
+                json.dumps(
+                    {
+                        "world": world_params,
+                        "endpoints": {
+                            name: result.__dict__ for name, result in results.items()
+                        },
+                    },
+                    indent=2,
+                    sort_keys=True,
+                )
+                + "\n"
+            )
+            print(f"Saved baseline to {baseline_path}")
+        elif regressions:
+            raise CommandError(
+                "Regressions against the baseline:\n" + "\n".join(regressions)
+            )
+
+    def _benchmark(
+        self, world: BenchmarkWorld, repeat: int
+    ) -> Dict[str, EndpointResult]:
+        django_test_clients = {
+            "client": DjangoTestClient(),
+            "provider": DjangoTestClient(),
+        }
+        django_test_clients["client"].force_login(world.client_contact_user)
+        django_test_clients["provider"].force_login(world.provider_contact_user)
+
+        endpoints = get_endpoints(world)
+        _check_coverage(endpoints)
+        results = {}
+        # Request logging (see owldock.instrumentation), and the output of views,
+        # would drown the results.
+        logging.disable(logging.INFO)
+        try:
+            with redirect_stdout(io.StringIO()):
+                for endpoint in endpoints:
+                    results[endpoint.name] = _benchmark_endpoint(
+                        endpoint, django_test_clients[endpoint.contact], repeat
+                    )
+        finally:
+            logging.disable(logging.NOTSET)
+        return results
+
+    @staticmethod
+    def _print_results(
+        results: Dict[str, EndpointResult],
+        baseline: Optional[Dict[str, Dict[str, Any]]],
+    ) -> None:
+        for name, result in results.items():
+            line = (
+                f"{name}: {result.latency_ms:.1f}ms "
+                f"(min {result.min_latency_ms:.1f}ms), "
+                f"{result.n_queries} queries, "
+                f"peak memory {result.peak_memory_kb:.0f}KB"
+            )
+            if baseline and name in baseline:
+                line += (
+                    f" [baseline {baseline[name]['latency_ms']:.1f}ms, "
+                    f"{sum(baseline[name]['queries'].values())} queries, "
+                    f"{baseline[name]['peak_memory_kb']:.0f}KB]"
+                )
+            print(line)
+
+
+def get_endpoints(world: BenchmarkWorld) -> List[Endpoint]:
+    process = world.process_ruleset
+    host_country = world.host_country_code
+    return [
+        Endpoint(
+            "client_contact_applicants",
+            "api/client-contact/applicants/",
+            "/api/client-contact/applicants/",
+            "client",
+        ),
+        Endpoint(
+            "client_contact_case",
+            "api/client-contact/case/<uuid:uuid>/",
+            f"/api/client-contact/case/{world.case_uuid}/",
+            "client",
+        ),
+        Endpoint(
+            "client_contact_list_applicants",
+            "api/client-contact/list-applicants/",
+            "/api/client-contact/list-applicants/",
+            "client",
+        ),
+        Endpoint(
+            "client_contact_list_cases",
+            "api/client-contact/list-cases/",
+            "/api/client-contact/list-cases/",
+            "client",
+        ),
+        Endpoint(
+            "client_contact_list_cases_page",
+            "api/client-contact/list-cases/",
+            "/api/client-contact/list-cases/?page_size=50",
+            "client",
+        ),
+        Endpoint(
+            "client_contact_list_provider_contacts",
+            "api/client-contact/list-provider-contacts/",
+            f"/api/client-contact/list-provider-contacts/?process_uuid={process.uuid}",
+            "client",
+        ),
+        Endpoint(
+            "client_contact_list_primary_provider_contacts",
+            "api/client-contact/list-primary-provider-contacts/",
+            "/api/client-contact/list-primary-provider-contacts/"
+            f"?process_uuid={process.uuid}",
+            "client",
+        ),
+        Endpoint(
+            "client_contact_list_provider_relationships",
+            "api/client-contact/list-provider-relationships/",
+            "/api/client-contact/list-provider-relationships/",
+            "client",
+        ),
+        Endpoint("countries", "api/countries/", "/api/countries/", "client"),
+        Endpoint("occupations", "api/occupations/", "/api/occupations/", "client"),
+        Endpoint(
+            "process",
+            "api/process/<int:id>/",
+            f"/api/process/{process.id}/",
+            "client",
+        ),
+        Endpoint(
+            "process_rulesets",
+            "api/processes/<str:country_code>/",
+            f"/api/processes/{host_country}/",
+            "client",
+        ),
+        Endpoint(
+            "process_steps",
+            "api/process-steps/<str:country_code>/",
+            f"/api/process-steps/{host_country}/",
+            "client",
+        ),
+        Endpoint(
+            "processes",
+            "api/processes/",
+            f"/api/processes/?host_country={host_country}"
+            f"&nationalities={world.nationality_code}",
+            "client",
+        ),
+        Endpoint(
+            "processes_bulk",
+            "api/processes-bulk/",
+            "/api/processes-bulk/",
+            "client",
+            data={
+                "moves": [
+                    {
+                        "host_country": host_country,
+                        "nationalities": [world.nationality_code],
+                    }
+                ]
+                * 100
+            },
+        ),
+        Endpoint(
+            "provider_contact_case",
+            "api/provider-contact/case/<uuid:uuid>/",
+            f"/api/provider-contact/case/{world.case_uuid}/",
+            "provider",
+        ),
+        Endpoint(
+            "provider_contact_case_step",
+            "api/provider-contact/case-step/<uuid:uuid>/",
+            f"/api/provider-contact/case-step/{world.case_step_uuid}/",
+            "provider",
+        ),
+        Endpoint(
+            "provider_contact_list_applicants",
+            "api/provider-contact/list-applicants/",
+            "/api/provider-contact/list-applicants/",
+            "provider",
+        ),
+        Endpoint(
+            "provider_contact_list_cases",
+            "api/provider-contact/list-cases/",
+            "/api/provider-contact/list-cases/",
+            "provider",
+        ),
+    ]
+
+
+def get_regressions(
+    baseline: Dict[str, Dict[str, Any]],
+    results: Dict[str, EndpointResult],
+    tolerance: float,
+) -> List[str]:
+    """
+    Return a description of each endpoint result that is worse than its
+    baseline: more queries, or (minimum) latency or peak memory exceeding the
+    baseline by more than `tolerance`.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = EndpointResult(**baseline[name])
+        if result.n_queries > base.n_queries:
+            regressions.append(
+                f"{name}: {result.n_queries} queries (baseline {base.n_queries})"
+            )
+        # The minimum is the least noisy measure of latency.
+        if (
+            result.min_latency_ms
+            > base.min_latency_ms * (1 + tolerance) + LATENCY_NOISE_MS
+        ):
+            regressions.append(
+                f"{name}: min latency {result.min_latency_ms:.1f}ms "
+                f"(baseline {base.min_latency_ms:.1f}ms)"
+            )
+        if result.peak_memory_kb > base.peak_memory_kb * (1 + tolerance):
+            regressions.append(
+                f"{name}: peak memory {result.peak_memory_kb:.0f}KB "
+                f"(baseline {base.peak_memory_kb:.0f}KB)"
+            )
+    return regressions
+
+
+def _benchmark_endpoint(
+    endpoint: Endpoint, django_test_client: DjangoTestClient, repeat: int
+) -> EndpointResult:
+    if endpoint.data is None:
+
+        def request() -> HttpResponse:
+            return django_test_client.get(endpoint.path)
+
+    else:
+
+        def request() -> HttpResponse:
+            return django_test_client.post(
+                endpoint.path,
+                json.dumps(endpoint.data),
+                content_type="application/json",
+            )
+
+    # Warm up, and check that the endpoint works in this world.
+    _get_content(request)
+
+    with ExitStack() as stack:
+        contexts = {
+            alias: stack.enter_context(CaptureQueriesContext(connections[alias]))
+            for alias in settings.DATABASES
+        }
+        _get_content(request)
+    queries = Counter(
+        {alias: len(context.captured_queries) for alias, context in contexts.items()}
+    )
+
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        _get_content(request)
+        times.append(time.perf_counter() - start_time)
+
+    tracemalloc.start()
+    try:
+        _get_content(request)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return EndpointResult(
+        latency_ms=statistics.median(times) * 1000,
+        min_latency_ms=min(times) * 1000,
+        peak_memory_kb=peak_memory / 1024,
+        queries={alias: n for alias, n in queries.items() if n},
+    )
+
+
+def _get_content(request: Callable[[], HttpResponse]) -> bytes:
+    """
+    Make the request and return the response content, consuming it if it is
+    streamed (in which case most of the work is done while streaming).
+    """
+    response = request()
+    if response.streaming:
+        content = b"".join(response.streaming_content)  # type: ignore
+    else:
+        content = response.content
+    if response.status_code != 200:
+        raise CommandError(
+            f"{response.status_code} response from {response.wsgi_request.path}: "
+            f"{content[:1000]!r}"
+        )
+    return content
+
+
+def _check_coverage(endpoints: List[Endpoint]) -> None:
+    """
+    Check that every /api/ endpoint that does not mutate the world is
+    benchmarked.
+    """
+    routes = {
+        str(pattern.pattern)
+        for pattern in get_resolver().url_patterns
+        if str(pattern.pattern).startswith("api/")
+    }
+    missing = routes - MUTATING_ENDPOINTS - {e.route for e in endpoints}
+    if missing:
+        raise CommandError(
+            "These endpoints are not benchmarked: " + ", ".join(sorted(missing))
+        )
+
+
+class _DisableMigrations:
+    """
+    A MIGRATION_MODULES setting under which tables are created from the models,
+    as with pytest --nomigrations.
+    """
+
+    def __contains__(self, item: str) -> bool:
+        return True
+
+    def __getitem__(self, item: str) -> None:
+        return None
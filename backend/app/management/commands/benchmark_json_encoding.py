@@ -0,0 +1,79 @@
+import timeit
+from typing import Any, List, Tuple
+
+from django.core.management.base import BaseCommand
+
+from client import api as client_api
+from client import models as client_orm_models
+from immigration import api as immigration_api
+from immigration.models import Route
+from owldock.api.serialization import serialize
+from owldock.http.encoders import get_encoder, orjson
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the time taken to encode case and process ruleset list "
+        "payloads as JSON using the stdlib and orjson encoders."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **kwargs):
+        encoder_names = ["stdlib"] + (["orjson"] if orjson else [])
+        if not orjson:
+            print("orjson is not installed")
+        for name, data in self._get_payloads():
+            times = {
+                encoder_name: self._time(
+                    lambda: get_encoder(encoder_name).dumps(data), kwargs["repeat"]
+                )
+                for encoder_name in encoder_names
+            }
+            size = len(get_encoder("stdlib").dumps(data))
+            print(
+                f"{name} ({len(data)} objects, {size / 1024:.0f}KiB): "
+                + ", ".join(f"{n} {t * 1000:.1f}ms" for n, t in times.items())
+                + (
+                    f", speedup {times['stdlib'] / times['orjson']:.1f}x"
+                    if "orjson" in times
+                    else ""
+                )
+            )
+
+    def _get_payloads(self) -> List[Tuple[str, Any]]:
+        payloads = []
+        for client_contact in client_orm_models.ClientContact.objects.all()[:5]:
+            cases = client_api.read.case.get_cases_for_client_or_provider_contact(
+                client_contact
+            )
+            payloads.append(
+                (
+                    f"CaseList[{client_contact}]",
+                    serialize(client_api.models.CaseList, cases),
+                )
+            )
+        host_country_codes = sorted(
+            set(Route.objects.values_list("host_country__code", flat=True))
+        )
+        for code in host_country_codes:
+            process_rulesets = immigration_api.models.ProcessRuleSetList.get_orm_models(
+                code
+            )
+            payloads.append(
+                (
+                    f"ProcessRuleSetList[{code}]",
+                    serialize(
+                        immigration_api.models.ProcessRuleSetList, process_rulesets
+                    ),
+                )
+            )
+        return payloads
+
+    @staticmethod
+    def _time(func, repeat: int) -> float:
+        """
+        Return the best time of `repeat` calls of `func`.
+        """
+        return min(timeit.repeat(func, number=1, repeat=repeat))
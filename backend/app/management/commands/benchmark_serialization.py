@@ -0,0 +1,70 @@
+import timeit
+from typing import Any, List, Tuple, Type
+
+import pydantic
+from django.core.management.base import BaseCommand
+
+from client import api as client_api
+from client import models as client_orm_models
+from immigration import api as immigration_api
+from immigration.models import Route
+from owldock.api.serialization import serialize
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the time taken to serialize case and process ruleset lists "
+        "using pydantic from_orm().dict(), and owldock.api.serialization."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **kwargs):
+        for name, api_model, orm_objs in self._get_payloads():
+            pydantic_time = self._time(
+                lambda: api_model.from_orm(orm_objs).dict(), kwargs["repeat"]
+            )
+            fast_time = self._time(
+                lambda: serialize(api_model, orm_objs), kwargs["repeat"]
+            )
+            print(
+                f"{name} ({len(orm_objs)} objects): "
+                f"pydantic {pydantic_time * 1000:.1f}ms, "
+                f"fast {fast_time * 1000:.1f}ms, "
+                f"speedup {pydantic_time / fast_time:.1f}x"
+            )
+
+    def _get_payloads(
+        self,
+    ) -> List[Tuple[str, Type[pydantic.BaseModel], List[Any]]]:
+        payloads = []
+        for client_contact in client_orm_models.ClientContact.objects.all()[:5]:
+            cases = client_api.read.case.get_cases_for_client_or_provider_contact(
+                client_contact
+            )
+            payloads.append(
+                (f"CaseList[{client_contact}]", client_api.models.CaseList, cases)
+            )
+        host_country_codes = sorted(
+            set(Route.objects.values_list("host_country__code", flat=True))
+        )
+        for code in host_country_codes:
+            process_rulesets = immigration_api.models.ProcessRuleSetList.get_orm_models(
+                code
+            )
+            payloads.append(
+                (
+                    f"ProcessRuleSetList[{code}]",
+                    immigration_api.models.ProcessRuleSetList,
+                    process_rulesets,
+                )
+            )
+        return payloads
+
+    @staticmethod
+    def _time(func, repeat: int) -> float:
+        """
+        Return the best time of `repeat` calls of `func`.
+        """
+        return min(timeit.repeat(func, number=1, repeat=repeat))
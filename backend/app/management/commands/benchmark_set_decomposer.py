@@ -0,0 +1,92 @@
+import random
+import timeit
+from typing import Callable, List
+
+from django.core.management.base import BaseCommand
+
+from owldock.utils.set_decomposer import SetDecomposer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the time taken to decompose sets of countries in terms of blocs "
+        "one at a time (SetDecomposer.decompose), and all at once "
+        "(SetDecomposer.decompose_many), for input sets that are all distinct and "
+        "for input sets that recur."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--inputs", type=int, default=10000)
+        parser.add_argument("--countries", type=int, default=250)
+        parser.add_argument("--blocs", type=int, default=30)
+        parser.add_argument(
+            "--distinct-inputs",
+            type=int,
+            default=200,
+            help="The number of distinct input sets, in the recurring case",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **kwargs):
+        rng = random.Random(0)
+        universe = [f"C{i}" for i in range(kwargs["countries"])]
+        basis = {
+            f"Bloc{i}": rng.sample(universe, rng.randint(2, len(universe) // 4))
+            for i in range(kwargs["blocs"])
+        }
+
+        def make_input() -> List[str]:
+            return rng.sample(universe, rng.randint(1, len(universe) // 4))
+
+        distinct = [make_input() for _ in range(kwargs["inputs"])]
+        recurring_sets = [make_input() for _ in range(kwargs["distinct_inputs"])]
+        recurring = [rng.choice(recurring_sets) for _ in range(kwargs["inputs"])]
+
+        for name, xs in [("distinct", distinct), ("recurring", recurring)]:
+            # A new decomposer for each run, so that no run benefits from the
+            # decompositions memoized by the previous one.
+            times = {
+                "per-row unmemoized": self._time(
+                    lambda: self._decompose_unmemoized(
+                        SetDecomposer(basis, universe), xs
+                    ),
+                    kwargs["repeat"],
+                ),
+                "per-row": self._time(
+                    lambda: [
+                        decomposer.decompose(x)
+                        for decomposer in [SetDecomposer(basis, universe)]
+                        for x in xs
+                    ],
+                    kwargs["repeat"],
+                ),
+                "bulk": self._time(
+                    lambda: SetDecomposer(basis, universe).decompose_many(xs),
+                    kwargs["repeat"],
+                ),
+            }
+            assert SetDecomposer(basis, universe).decompose_many(
+                xs
+            ) == self._decompose_unmemoized(SetDecomposer(basis, universe), xs)
+            print(
+                f"{len(xs)} {name} inputs: "
+                + ", ".join(f"{n} {t * 1000:.1f}ms" for n, t in times.items())
+                + f", speedup {times['per-row unmemoized'] / times['bulk']:.1f}x"
+            )
+
+    @staticmethod
+    def _decompose_unmemoized(
+        decomposer: SetDecomposer, xs: List[List[str]]
+    ) -> List[str]:
+        descriptions = []
+        for x in xs:
+            decomposer._descriptions.clear()
+            descriptions.append(decomposer.decompose(x))
+        return descriptions
+
+    @staticmethod
+    def _time(func: Callable, repeat: int) -> float:
+        """
+        Return the best time of `repeat` calls of `func`.
+        """
+        return min(timeit.repeat(func, number=1, repeat=repeat))
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from owldock.database_router import get_client_db_names
+
+
+class Command(BaseCommand):
+    help = "Apply migrations to the default database and to every client database."
+
+    def handle(self, *args, **kwargs):
+        for db in [settings.DEFAULT_DB_NAME, *get_client_db_names()]:
+            self.stdout.write(f"Migrating database `{db}`")
+            call_command("migrate", database=db, verbosity=kwargs["verbosity"])
@@ -0,0 +1,66 @@
+from typing import Callable
+
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from owldock.http.compression import (
+    MIN_SIZE,
+    compress,
+    compress_sequence,
+    get_accepted_encoding,
+)
+
+Middleware = Callable[[HttpRequest], HttpResponse]
+
+
+def compress_api_responses(get_response: Middleware) -> Middleware:
+    """
+    Compress API JSON responses using Brotli or gzip, as accepted by the client.
+
+    Responses that are already compressed (e.g. cached ones, see
+    owldock.http.cached_json_response) are left alone.
+    """
+
+    def middleware(request: HttpRequest) -> HttpResponse:
+        response = get_response(request)
+        if not (
+            request.path.startswith("/api/")
+            and response.status_code == 200
+            and response.get("Content-Type", "").startswith("application/json")
+        ):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.has_header("Content-Encoding"):
+            return response
+        encoding = get_accepted_encoding(request)
+        if not encoding:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                response.streaming_content, encoding
+            )
+            if response.has_header("Content-Length"):
+                del response["Content-Length"]
+        else:
+            if len(response.content) < MIN_SIZE:
+                return response
+            compressed_content = compress(response.content, encoding)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response["Content-Length"] = str(len(compressed_content))
+        response["Content-Encoding"] = encoding
+        _weaken_etag(response)
+        return response
+
+    return middleware
+
+
+def _weaken_etag(response: HttpResponse) -> None:
+    # The compressed content is not byte-identical to the content identified by
+    # a strong ETag.
+    etag = response.get("ETag")
+    if etag and etag.startswith('"'):
+        response["ETag"] = f"W/{etag}"
@@ -0,0 +1,43 @@
+from typing import Callable, Iterator
+
+from django.http import HttpRequest
+from django.http import HttpResponse
+
+from owldock.instrumentation import RequestMetrics, check_query_budget, start_request
+
+Middleware = Callable[[HttpRequest], HttpResponse]
+
+
+def instrument_requests(get_response: Middleware) -> Middleware:
+    """
+    Record the queries made, and the time spent, while handling each request,
+    and log them once the response has been sent (see owldock.instrumentation).
+    The queries of a sample of requests are checked against the query budget of
+    the endpoint (see owldock.query_budgets).
+
+    This is the first middleware, so that the queries of all others are recorded.
+    """
+
+    def middleware(request: HttpRequest) -> HttpResponse:
+        metrics = start_request()
+        metrics.fields.update(method=request.method, path=request.path)
+        response = get_response(request)
+        metrics.fields["status"] = response.status_code
+        if request.resolver_match and request.resolver_match.url_name:
+            metrics.fields["url_name"] = request.resolver_match.view_name
+        if response.streaming:
+            response.streaming_content = _check_query_budget_after_streaming(
+                response.streaming_content, metrics
+            )
+        else:
+            check_query_budget(metrics)
+        return response
+
+    return middleware
+
+
+def _check_query_budget_after_streaming(
+    chunks: Iterator[bytes], metrics: RequestMetrics
+) -> Iterator[bytes]:
+    yield from chunks
+    check_query_budget(metrics)
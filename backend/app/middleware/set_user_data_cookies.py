@@ -4,19 +4,47 @@ from typing import Callable
 from django.http import HttpRequest
 from django.http import HttpResponse
 
-from client.models import Client
-from app.models import Provider, User
+from app.models import User
+from owldock.state_machine.role import (
+    PRINCIPAL_SESSION_CACHE_SECONDS,
+    Role,
+    get_principal_from_http_request,
+)
 
 
 logger = logging.getLogger(__file__)
 
 Middleware = Callable[[HttpRequest], HttpResponse]
 
+_ROLE_COOKIE_VALUES = {
+    Role.ADMIN: "admin",
+    Role.CLIENT_CONTACT: "client-contact",
+    Role.PROVIDER_CONTACT: "provider-contact",
+}
+
+# A signed cookie recording the user, and the version of the cookies, for which
+# the user data cookies were last set. Increment the version when the cookies
+# change.
+_VERSION_COOKIE = "user_data_version"
+_VERSION = 1
+
 
 def set_user_data_cookies(get_response: Middleware) -> Middleware:
+    """
+    Set cookies holding the user's name, role and logo URL, for the frontend.
+
+    The cookies are set only when they are missing or stale: after login, when
+    the user changes, or when they are older than the role cached in the
+    session. API responses never set them.
+    """
+
     def middleware(request: HttpRequest) -> HttpResponse:
         response = get_response(request)
-        if request.user.is_authenticated:
+        if (
+            request.user.is_authenticated
+            and not request.path.startswith("/api/")
+            and not _cookies_are_current(request)
+        ):
             _set_user_attribute_cookie("first_name", request.user, response)
             _set_user_attribute_cookie("username", request.user, response)
             logger.info(
@@ -27,16 +55,20 @@ def set_user_data_cookies(get_response: Middleware) -> Middleware:
                     getattr(request.user, "id", "<no id>"),
                 ),
             )
-            if not (
-                _set_admin_cookies(request.user, response)
-                or _set_client_cookies(request.user, response)
-                or _set_provider_cookies(request.user, response)
-            ):
+            principal = get_principal_from_http_request(request)
+            role = principal.role
+            if role in _ROLE_COOKIE_VALUES:
+                response.set_cookie("logo_url", principal.logo_url)
+                response.set_cookie("role", _ROLE_COOKIE_VALUES[role])
+            else:
                 logger.error(
                     "request %s %s is neither client nor provider",
                     request,
                     request.user,
                 )
+            response.set_signed_cookie(
+                _VERSION_COOKIE, _get_version_stamp(request.user)
+            )
 
         return response
 
@@ -53,32 +85,12 @@ def _set_user_attribute_cookie(attr: str, user: User, response: HttpResponse) ->
             response.set_cookie(attr, value)
 
 
-def _set_admin_cookies(user: User, response: HttpResponse) -> bool:
-    if user.is_superuser:
-        response.set_cookie("logo_url", "")
-        response.set_cookie("role", "admin")
-        return True
-    else:
-        return False
-
-
-def _set_client_cookies(user: User, response: HttpResponse) -> bool:
-    try:
-        client = Client.objects.get(clientcontact__user_uuid=user.uuid)
-    except Client.DoesNotExist:
-        return False
-    else:
-        response.set_cookie("logo_url", client.logo_url)
-        response.set_cookie("role", "client-contact")
-        return True
+def _get_version_stamp(user: User) -> str:
+    return f"{user.id}:{_VERSION}"
 
 
-def _set_provider_cookies(user: User, response: HttpResponse) -> bool:
-    try:
-        provider = Provider.objects.get(providercontact__user=user)
-    except Provider.DoesNotExist:
-        return False
-    else:
-        response.set_cookie("logo_url", provider.logo_url)
-        response.set_cookie("role", "provider-contact")
-        return True
+def _cookies_are_current(request: HttpRequest) -> bool:
+    stamp = request.get_signed_cookie(
+        _VERSION_COOKIE, default=None, max_age=PRINCIPAL_SESSION_CACHE_SECONDS
+    )
+    return stamp == _get_version_stamp(request.user)  # type: ignore
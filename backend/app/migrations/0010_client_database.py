@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_auto_20210712_1708'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientDatabase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_uuid', models.UUIDField(unique=True)),
+                ('database', models.CharField(max_length=64)),
+            ],
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.db import connections, migrations, models
+
+import app.models.client_database
+import owldock.models.fields
+
+
+def create_client_databases(apps, schema_editor):
+    """
+    Record the database of each client created before there were
+    ClientDatabases.
+    """
+    ClientDatabase = apps.get_model("app", "ClientDatabase")
+    Client = apps.get_model("client", "Client")
+    for db in settings.CLIENT_DB_NAMES:
+        if Client._meta.db_table not in connections[db].introspection.table_names():
+            continue
+        for client_uuid in Client.objects.using(db).values_list("uuid", flat=True):
+            ClientDatabase.objects.using(schema_editor.connection.alias).get_or_create(
+                client_uuid=client_uuid, defaults={"database": db}
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0010_client_database"),
+        ("client", "0003_auto_20210602_1945"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="clientdatabase",
+            name="client_uuid",
+            field=owldock.models.fields.UUIDPseudoForeignKeyField(
+                "client.Client", db_index=True, to_field="uuid", unique=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="clientdatabase",
+            name="database",
+            field=models.CharField(
+                max_length=64,
+                validators=[app.models.client_database.validate_client_db],
+            ),
+        ),
+        migrations.RunPython(create_client_databases, migrations.RunPython.noop),
+    ]
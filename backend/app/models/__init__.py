@@ -25,6 +25,7 @@ class User(AbstractUser):
 
 
 from app.models.bloc import Bloc  # noqa
+from app.models.client_database import ClientDatabase  # noqa
 from app.models.country import *  # noqa
 from app.models.file import *  # noqa
 from app.models.provider import *  # noqa
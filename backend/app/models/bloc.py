@@ -1,5 +1,5 @@
 from collections import defaultdict
-from typing import Callable, Dict, Iterable, List
+from typing import Dict, List
 
 from django.db.models import CharField, Manager, ManyToManyField
 
@@ -12,21 +12,19 @@ MAX_ADDITIONAL_COUNTRIES = 10
 
 
 class BlocManager(Manager):
-    def make_get_description_from_countries(
-        self,
-    ) -> "Callable[[Iterable[Country]], str]":
+    def make_decomposer(self) -> SetDecomposer:
         """
-        Return a function taking as input an iterable of countries and returning
-        a string describing the set of countries in terms of blocs.
+        Return a SetDecomposer describing sets of country codes in terms of
+        blocs (see immigration.snapshot.get_bloc_decomposer, which caches it).
         """
         bloc_names2country_codes = {
             b.name: [c.code for c in b.countries.all()]
-            for b in Bloc.objects.prefetch_related("countries")
+            for b in self.prefetch_related("countries")
         }
-        all_country_codes = set(Country.objects.values_list("code", flat=True))
-        decomposer = SetDecomposer(bloc_names2country_codes, all_country_codes)
-
-        return lambda countries: decomposer.decompose([c.code for c in countries])
+        all_country_codes = set(
+            Country.objects.using(self.db).values_list("code", flat=True)
+        )
+        return SetDecomposer(bloc_names2country_codes, all_country_codes)
 
     def get_country_id2containing_blocs(self) -> "Dict[int, List[Bloc]]":
         """
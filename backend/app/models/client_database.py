@@ -0,0 +1,31 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+
+from owldock.database_router import is_client_db
+from owldock.models.fields import UUIDPseudoForeignKeyField
+
+
+def validate_client_db(db: str) -> None:
+    if not is_client_db(db):
+        raise ValidationError(f"{db} is not a client database")
+
+
+class ClientDatabase(models.Model):
+    """
+    The client database holding a client's data.
+
+    Client data is sharded across the databases in settings.CLIENT_DB_NAMES. A
+    ClientDatabase is created for each Client when it is created (see
+    client.signal_receivers), and is the authority on where its data is (see
+    owldock.database_router.get_client_db).
+    """
+
+    client_uuid = UUIDPseudoForeignKeyField("client.Client", unique=True)
+    database = models.CharField(max_length=64, validators=[validate_client_db])
+
+    def save(self, *args, **kwargs):
+        self.clean_fields(exclude=["client_uuid"])
+        super().save(*args, **kwargs)
+
+    def __str__(self) -> str:
+        return f"{self.client_uuid}: {self.database}"
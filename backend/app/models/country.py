@@ -6,7 +6,7 @@
 # going to try to create duplicates. But only if the unique_contraint is added
 # in the Django field definition.
 from collections import defaultdict
-from typing import Optional
+from typing import Dict, List, Optional
 
 import django_countries.fields
 import moneyed
@@ -50,7 +50,7 @@ class Country(BaseModel):
 
     objects = CountryManager()
 
-    _COUNTRY_ID_TO_CURRENCIES = None
+    _COUNTRY_NAME_TO_CURRENCIES: Optional[Dict[str, List[moneyed.Currency]]] = None
 
     @property
     def currency(self) -> Optional[moneyed.Currency]:
@@ -63,12 +63,8 @@ class Country(BaseModel):
             # A disadvantage of this method is that some countries have more
             # than one currency and we have no information about which we should
             # choose.
-            if self._COUNTRY_ID_TO_CURRENCIES is None:
-                self._compute_country_id_to_currencies()
-                assert self._COUNTRY_ID_TO_CURRENCIES
-            return sorted(self._COUNTRY_ID_TO_CURRENCIES.get(self.id, [None]), key=str)[
-                0
-            ]
+            name2currencies = self._get_country_name_to_currencies()
+            return sorted(name2currencies.get(self.name.lower(), [None]), key=str)[0]
 
     @property
     def currency_code(self) -> Optional[str]:
@@ -76,22 +72,19 @@ class Country(BaseModel):
         return currency.code if currency else None
 
     @classmethod
-    def _compute_country_id_to_currencies(cls):
+    def _get_country_name_to_currencies(cls) -> Dict[str, List[moneyed.Currency]]:
         # moneyed.CURRENCIES[_3_letter_currency_code].countries is a list of
         # upper-case country names, e.g. the list of countries using the Euro.
         # It seems unfortunate that the countries are not represented by one of
-        # their official codes.
-        name2id = {c.name.lower(): c.id for c in cls.objects.all()}
-        id2currencies = defaultdict(list)
-        for currency in moneyed.CURRENCIES.values():
-            for country_name in currency.countries:
-                try:
-                    id = name2id[country_name.lower()]
-                except KeyError:
-                    pass
-                else:
-                    id2currencies[id].append(currency)
-        cls._COUNTRY_ID_TO_CURRENCIES = dict(id2currencies)
+        # their official codes. This is computed without querying the database,
+        # so that serializing countries makes no queries.
+        if cls._COUNTRY_NAME_TO_CURRENCIES is None:
+            name2currencies = defaultdict(list)
+            for currency in moneyed.CURRENCIES.values():
+                for country_name in currency.countries:
+                    name2currencies[country_name.lower()].append(currency)
+            cls._COUNTRY_NAME_TO_CURRENCIES = dict(name2currencies)
+        return cls._COUNTRY_NAME_TO_CURRENCIES
 
     class Meta:
         constraints = [
@@ -0,0 +1,36 @@
+from app.management.commands.benchmark_endpoints import (
+    EndpointResult,
+    get_regressions,
+)
+
+
+def test_get_regressions():
+    baseline = {
+        "countries": {
+            "latency_ms": 10.0,
+            "min_latency_ms": 10.0,
+            "peak_memory_kb": 100.0,
+            "queries": {"default": 2},
+        },
+    }
+    same = EndpointResult(
+        latency_ms=12.0,
+        min_latency_ms=11.0,
+        peak_memory_kb=110.0,
+        queries={"default": 2},
+    )
+    assert get_regressions(baseline, {"countries": same}, tolerance=0.25) == []
+    # Endpoints without a baseline are not compared.
+    assert get_regressions({}, {"countries": same}, tolerance=0.25) == []
+
+    worse = EndpointResult(
+        latency_ms=20.0,
+        min_latency_ms=20.0,
+        peak_memory_kb=200.0,
+        queries={"default": 2, "client": 1},
+    )
+    assert get_regressions(baseline, {"countries": worse}, tolerance=0.25) == [
+        "countries: 3 queries (baseline 2)",
+        "countries: min latency 20.0ms (baseline 10.0ms)",
+        "countries: peak memory 200KB (baseline 100KB)",
+    ]
@@ -0,0 +1,31 @@
+from django.test import Client as DjangoTestClient
+
+from client.models import ClientContact
+
+from client.tests.conftest import *  # noqa
+from owldock.tests.constants import TEST_PASSWORD
+
+
+def test_user_data_cookies_are_set_only_when_stale(
+    client_contact_A: ClientContact,
+    django_test_client: DjangoTestClient,
+):
+    assert django_test_client.login(
+        username=client_contact_A.user.username,
+        password=TEST_PASSWORD,
+    )
+    response = django_test_client.get("/")
+    assert response.cookies["role"].value == "client-contact"
+    assert response.cookies["logo_url"].value == client_contact_A.client.logo_url
+    assert "user_data_version" in response.cookies
+
+    response = django_test_client.get("/")
+    assert not response.cookies
+
+    del django_test_client.cookies["user_data_version"]
+    response = django_test_client.get("/api/client-contact/list-applicants/")
+    assert response.status_code == 200
+    assert not response.cookies
+
+    response = django_test_client.get("/")
+    assert response.cookies["role"].value == "client-contact"
@@ -4,12 +4,12 @@ from subprocess import check_output, CalledProcessError
 
 from app import models as app_orm_models
 from client import models as client_orm_models
-from owldock.state_machine.role import get_role, Role
+from owldock.state_machine.role import get_role_from_http_request, Role
 
 
 class HomeView(RedirectView):
     def get_redirect_url(self, *args, **kwargs) -> str:
-        role = get_role(self.request.user)
+        role = get_role_from_http_request(self.request)
         if role in [Role.CLIENT_CONTACT, Role.PROVIDER_CONTACT]:
             return "/portal/"
         else:
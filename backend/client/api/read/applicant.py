@@ -1,9 +1,10 @@
-from collections import defaultdict
-from typing import List
+from typing import Iterable, List
+
+from django.db.models import QuerySet
 
-from app import models as app_orm_models
 from client import models as client_orm_models
 from immigration import models as immigration_orm_models
+from owldock.models.fields import prefetch_pseudo_related
 
 
 def get_orm_models(
@@ -15,39 +16,38 @@ def get_orm_models(
             "uuid", flat=True
         )
     )
-    applicants_qs = client_orm_models.Applicant.objects.filter(
-        applicantnationality__country_uuid__in=active_country_uuids
-    )
+    applicants_qs = client_orm_models.Applicant.objects.using(
+        client_contact._state.db
+    ).filter(applicantnationality__country_uuid__in=active_country_uuids)
     # END
-    applicants = list(applicants_qs.select_related("employer"))
-    applicant_ids, user_uuids, home_country_uuids = [], [], []
-    for a in applicants:
-        applicant_ids.append(a.id)
-        user_uuids.append(a.user_uuid)
-        home_country_uuids.append(a.home_country_uuid)
-    uuid2user = {
-        u.uuid: u for u in app_orm_models.User.objects.filter(uuid__in=user_uuids)
-    }
-    applicant_ids__nationality_uuids = (
-        client_orm_models.ApplicantNationality.objects.filter(
-            applicant_id__in=applicant_ids
-        ).values_list("applicant_id", "country_uuid")
-    )
-    uuid2country = {
-        c.uuid: c
-        for c in immigration_orm_models.Country.objects.filter(
-            uuid__in=set(
-                home_country_uuids
-                + [uuid for _, uuid in applicant_ids__nationality_uuids]
-            )
-        )
-    }
-    applicant_id2nationalities = defaultdict(list)
-    for applicant_id, country_uuid in applicant_ids__nationality_uuids:
-        applicant_id2nationalities[applicant_id].append(uuid2country[country_uuid])
+    return prefetch_applicants([applicants_qs])
 
+
+def prefetch_applicants(
+    querysets: Iterable["QuerySet[client_orm_models.Applicant]"],
+) -> List[client_orm_models.Applicant]:
+    """
+    Return the applicants of the querysets, which may be in different client
+    databases, with all related objects prefetched such that no queries are made
+    during subsequent serialization.
+
+    Objects in the default database are fetched once for all the querysets.
+    """
+    applicants = [
+        applicant
+        for applicants_qs in querysets
+        for applicant in applicants_qs.select_related("employer").prefetch_related(
+            "applicantnationality_set"
+        )
+    ]
+    prefetch_pseudo_related(
+        applicants,
+        "user",
+        "home_country",
+        "applicantnationality_set__country",
+    )
     for a in applicants:
-        a._prefetched_user = uuid2user[a.user_uuid]
-        a._prefetched_home_country = uuid2country[a.home_country_uuid]
-        a._prefetched_nationalities = applicant_id2nationalities[a.id]
+        a._prefetched_nationalities = [
+            an.country for an in a.applicantnationality_set.all()
+        ]
     return applicants
@@ -1,13 +1,24 @@
+import base64
+import json
 from collections import defaultdict
+from datetime import date, datetime
 from operator import attrgetter
-from typing import List, Union
+from typing import List, Optional, Tuple, Union
+from uuid import UUID
 
-from django.db.models import Prefetch, QuerySet
+from django.db.models import Prefetch, Q, QuerySet
 from django.contrib.contenttypes import models as contenttypes_orm_models
 
 from app import models as app_orm_models
 from client import models as client_orm_models
-from immigration import models as immigration_orm_models
+from immigration import snapshot
+from owldock.database_router import get_client_db_names, using_client_db
+from owldock.models.fields import prefetch_pseudo_related
+
+# The position of a case in the case list, which is ordered by descending
+# (created_at, uuid). The UUID breaks ties between cases created at the same
+# time: unlike the id, it is unique across client databases.
+Cursor = Tuple[datetime, UUID]
 
 
 def get_cases_for_client_or_provider_contact(
@@ -15,20 +26,149 @@ def get_cases_for_client_or_provider_contact(
         client_orm_models.ClientContact, app_orm_models.ProviderContact
     ],
 ) -> List[client_orm_models.Case]:
-    return prefetch_cases(
-        client_or_provider_contact.cases(), client_or_provider_contact
+    cases, _ = get_case_page_for_client_or_provider_contact(client_or_provider_contact)
+    return cases
+
+
+def get_case_page_for_client_or_provider_contact(
+    client_or_provider_contact: Union[
+        client_orm_models.ClientContact, app_orm_models.ProviderContact
+    ],
+    page_size: Optional[int] = None,
+    after: Optional[Cursor] = None,
+    host_country_code: Optional[str] = None,
+    step_state_name: Optional[str] = None,
+    applicant_uuid: Optional[UUID] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+) -> Tuple[List[client_orm_models.Case], Optional[Cursor]]:
+    """
+    Return one page of the contact's cases, and the cursor of the next page.
+
+    Cases are ordered by descending (created_at, uuid). The page holds the first
+    `page_size` cases after the cursor `after` satisfying the filters:
+
+    - host_country_code: the host country of the case's process
+    - step_state_name: the case has a step, visible to the contact, in this state
+    - applicant_uuid: the case's applicant
+    - created_from, created_to: the date on which the case was created
+      (inclusive)
+
+    If page_size is None, all cases after the cursor are returned. The cursor
+    of the next page is None if this is the last page. Only the cases in the
+    page are prefetched (see prefetch_cases()).
+
+    A client contact's cases are fetched from their client's database. A
+    provider contact's cases are fetched from every client database, a page from
+    each, and merged.
+    """
+    if isinstance(client_or_provider_contact, client_orm_models.ClientContact):
+        client_dbs = [client_or_provider_contact._state.db]
+    else:
+        client_dbs = get_client_db_names()
+    cases: List[client_orm_models.Case] = []
+    for db in client_dbs:
+        with using_client_db(db):
+            cases.extend(
+                prefetch_cases(
+                    _get_filtered_cases(
+                        client_or_provider_contact,
+                        after,
+                        host_country_code,
+                        step_state_name,
+                        applicant_uuid,
+                        created_from,
+                        created_to,
+                    ),
+                    client_or_provider_contact,
+                    # Fetch one more case than requested, to learn whether there is
+                    # a next page.
+                    limit=None if page_size is None else page_size + 1,
+                )
+            )
+    if len(client_dbs) > 1:
+        cases.sort(key=attrgetter("created_at", "uuid"), reverse=True)
+    if page_size is not None and len(cases) > page_size:
+        page = cases[:page_size]
+        return page, (page[-1].created_at, page[-1].uuid)
+    else:
+        return cases, None
+
+
+def _get_filtered_cases(
+    client_or_provider_contact: Union[
+        client_orm_models.ClientContact, app_orm_models.ProviderContact
+    ],
+    after: Optional[Cursor],
+    host_country_code: Optional[str],
+    step_state_name: Optional[str],
+    applicant_uuid: Optional[UUID],
+    created_from: Optional[date],
+    created_to: Optional[date],
+) -> QuerySet[client_orm_models.Case]:
+    cases = client_or_provider_contact.cases()
+    if host_country_code is not None:
+        cases = cases.filter(
+            process_uuid__in=snapshot.get_process_ruleset_uuids(host_country_code)
+        )
+    if step_state_name is not None:
+        cases = cases.filter(
+            id__in=client_or_provider_contact.case_steps()
+            .filter(state_name=step_state_name)
+            .values("case_id")
+        )
+    if applicant_uuid is not None:
+        cases = cases.filter(applicant__uuid=applicant_uuid)
+    if created_from is not None:
+        cases = cases.filter(created_at__date__gte=created_from)
+    if created_to is not None:
+        cases = cases.filter(created_at__date__lte=created_to)
+    if after is not None:
+        created_at, uuid = after
+        cases = cases.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, uuid__lt=uuid)
+        )
+    return cases
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    created_at, uuid = cursor
+    return (
+        base64.urlsafe_b64encode(
+            json.dumps([created_at.isoformat(), str(uuid)]).encode()
+        )
+        .decode()
+        .rstrip("=")
     )
 
 
+def decode_cursor(encoded: str) -> Cursor:
+    """
+    Decode a cursor produced by encode_cursor, raising ValueError if invalid.
+    """
+    try:
+        created_at, uuid = json.loads(
+            base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+        )
+        return datetime.fromisoformat(created_at), UUID(uuid)
+    except (AttributeError, TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid cursor: {encoded}") from exc
+
+
 def prefetch_cases(
     cases: QuerySet[client_orm_models.Case],
     client_or_provider_contact: Union[
         client_orm_models.ClientContact, app_orm_models.ProviderContact
     ],
+    limit: Optional[int] = None,
 ) -> List[client_orm_models.Case]:
-
+    """
+    Return the cases (at most `limit`), with all data that they serialize
+    prefetched: serializing them as client_api.models.Case or CaseList must not
+    query the database (see owldock.tests.test_serialization).
+    """
     # Cache along lineages rooted at Case, in the client DB.
-    _cases = list(
+    cases = (
         cases.prefetch_related(
             "applicant__applicantnationality_set",
             Prefetch(
@@ -43,24 +183,41 @@ def prefetch_cases(
         .select_related(
             "applicant__employer",
         )
-        .order_by("-created_at")
+        .order_by("-created_at", "-uuid")
     )
+    _cases = list(cases if limit is None else cases[:limit])
     _cache_prefetched_data_on_case_objects(_cases)
     return _cases
 
 
 def _cache_prefetched_data_on_case_objects(cases: List[client_orm_models.Case]) -> None:
-    # Fetch processes in default DB
-    process_uuids = {c.process_uuid for c in cases}
-    processes = (
-        immigration_orm_models.ProcessRuleSet.objects.filter(uuid__in=process_uuids)
-        .select_related(
-            "route__host_country",
-        )
-        .prefetch_related("processrulesetstep_set__process_step__serviceitem")
+    # Processes and their steps, with all related immigration data, are taken
+    # from the immigration data snapshots.
+    uuid2process = snapshot.get_process_rulesets_by_uuid(
+        {c.process_uuid for c in cases}
+    )
+    uuid2process_step = {
+        step.uuid: step for p in uuid2process.values() for step in p.steps
+    }
+    for c in cases:
+        if c.process_uuid in uuid2process:
+            c.process = uuid2process[c.process_uuid]
+        for s in c.steps.all():
+            if s.process_step_uuid in uuid2process_step:
+                s.process_step = uuid2process_step[s.process_step_uuid]
+
+    # Fetch other objects in the default DB related to the instances generated
+    # by the queries in the client DB.
+    prefetch_pseudo_related(
+        cases,
+        "process",
+        "steps__process_step",
+        "steps__active_contract__provider_contact__user",
+        "steps__active_contract__provider_contact__provider",
+        "applicant__user",
+        "applicant__home_country",
+        "applicant__applicantnationality_set__country",
     )
-    uuid2process = {p.uuid: p for p in processes}
-    uuid2process_step = {s.uuid: s for p in processes for s in p.get_process_steps()}
 
     # Fetch stored files in default DB
     case_step_uuids = {s.uuid for c in cases for s in c.steps.all()}
@@ -76,70 +233,19 @@ def _cache_prefetched_data_on_case_objects(cases: List[client_orm_models.Case])
     for f in stored_files:
         case_step_uuid2stored_files[f.associated_object_uuid].add(f)
 
-    # Fetch provider contacts in default DB
-    provider_contact_uuids = {
-        s.active_contract.provider_contact_uuid
-        for c in cases
-        for s in c.steps.all()
-        if s.active_contract
-    }
-    uuid2provider_contact = {
-        pc.uuid: pc
-        for pc in app_orm_models.ProviderContact.objects.filter(
-            uuid__in=provider_contact_uuids
-        ).select_related("user", "provider")
-    }
-
-    # Fetch countries in default DB
-    applicant_country_uuids = set()
-    applicant_user_uuids = set()
-    applicant_uuid2nationality_uuids = defaultdict(set)
     for c in cases:
-        a = c.applicant
-        applicant_country_uuids.add(a.home_country_uuid)
-        applicant_user_uuids.add(a.user_uuid)
-        for an in a.applicantnationality_set.all():
-            applicant_country_uuids.add(an.country_uuid)
-            applicant_uuid2nationality_uuids[a.uuid].add(an.country_uuid)
-    uuid2country = {
-        c.uuid: c
-        for c in immigration_orm_models.Country.objects.filter(
-            uuid__in=applicant_country_uuids
-        )
-    }
-    uuid2user = {
-        u.uuid: u
-        for u in app_orm_models.User.objects.filter(uuid__in=applicant_user_uuids)
-    }
-
-    # Attach objects from the default DB to the instances generated by the
-    # queries in the client DB.
-    for c in cases:
-        setattr(c, "process", uuid2process[c.process_uuid])
         for s in c.steps.all():
-            setattr(s, "process_step", uuid2process_step[s.process_step_uuid])
             setattr(
                 s,
                 "_prefetched_stored_files",
                 sorted(case_step_uuid2stored_files[s.uuid], key=attrgetter("name")),
             )
-            if s.active_contract:
-                setattr(
-                    s.active_contract,
-                    "provider_contact",
-                    uuid2provider_contact[s.active_contract.provider_contact_uuid],
-                )
         a = c.applicant
-        setattr(a, "home_country", uuid2country[a.home_country_uuid])
         setattr(
             a,
             "_prefetched_nationalities",
             sorted(
-                (
-                    uuid2country[uuid]
-                    for uuid in applicant_uuid2nationality_uuids[a.uuid]
-                ),
+                (an.country for an in a.applicantnationality_set.all()),
                 key=attrgetter("name"),
             ),
         )
-        setattr(a, "user", uuid2user[a.user_uuid])
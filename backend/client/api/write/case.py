@@ -1,38 +1,140 @@
+from typing import Dict, List, Sequence, Type, TypeVar
+from uuid import UUID
+
+from django.db import models, router
 from django.db.transaction import atomic
 
-from app import models as app_orm_models
 from client import api as client_api
 from client import models as client_orm_models
-from immigration import models as immigration_orm_models
+from client.models.case_step import State as CaseStepState
+from owldock.database_router import using_client_db
+from owldock.models.fields import validate_pseudo_foreign_keys
+
+ModelT = TypeVar("ModelT", bound=models.Model)
 
 
-@atomic
 def create_for_client_contact(
     api_case_instance: client_api.models.Case,
     client_contact: client_orm_models.ClientContact,
 ) -> client_orm_models.Case:
-    api_case_data = api_case_instance.dict()
-    applicant_data = api_case_data.pop("applicant")
-    move_data = api_case_data.pop("move")
-    process_data = api_case_data.pop("process")
-    case_steps_data = api_case_data.pop("steps")
-
-    case = client_orm_models.Case.objects.create(
-        client_contact=client_contact,
-        applicant=client_orm_models.Applicant.objects.get(uuid=applicant_data["uuid"]),
-        process_uuid=process_data["uuid"],
-        target_entry_date=move_data["target_entry_date"],
-        target_exit_date=move_data["target_exit_date"],
+    [case] = create_many_for_client_contact([api_case_instance], client_contact)
+    return case
+
+
+def create_many_for_client_contact(
+    api_case_instances: Sequence[client_api.models.Case],
+    client_contact: client_orm_models.ClientContact,
+) -> List[client_orm_models.Case]:
+    """
+    Create cases, with their steps earmarked for the requested provider contacts.
+
+    The number of queries does not depend on the number of cases or steps: the
+    applicants are fetched with one query, the cases, steps and contracts are
+    created with bulk inserts, and the objects they refer to in other databases
+    are validated to exist with one query per model.
+
+    The cases are created in the client contact's client database.
+    """
+    db = client_contact._state.db
+    with using_client_db(db), atomic(using=db):
+        return _create_many_for_client_contact(api_case_instances, client_contact)
+
+
+def _create_many_for_client_contact(
+    api_case_instances: Sequence[client_api.models.Case],
+    client_contact: client_orm_models.ClientContact,
+) -> List[client_orm_models.Case]:
+    api_cases_data = [api_case.dict() for api_case in api_case_instances]
+    applicants = _get_by_uuid(
+        client_orm_models.Applicant,
+        [data["applicant"]["uuid"] for data in api_cases_data],
     )
 
-    for case_step_data in case_steps_data:
-        case_step = case.steps.create(
-            process_step_uuid=case_step_data["process_step"]["uuid"],
-        )
-        provider_contact = app_orm_models.ProviderContact.objects.get(
-            uuid=case_step_data["active_contract"]["provider_contact"]["uuid"]
+    cases = _bulk_create(
+        client_orm_models.Case,
+        [
+            client_orm_models.Case(
+                client_contact=client_contact,
+                applicant=applicants[data["applicant"]["uuid"]],
+                process_uuid=data["process"]["uuid"],
+                target_entry_date=data["move"]["target_entry_date"],
+                target_exit_date=data["move"]["target_exit_date"],
+            )
+            for data in api_cases_data
+        ],
+    )
+
+    # This is equivalent to creating each step and calling step.earmark().
+    cases_and_steps_data = [
+        (case, step_data)
+        for case, data in zip(cases, api_cases_data)
+        for step_data in data["steps"]
+    ]
+    case_steps = _bulk_create(
+        client_orm_models.CaseStep,
+        [
+            client_orm_models.CaseStep(
+                case=case,
+                process_step_uuid=step_data["process_step"]["uuid"],
+                state_name=CaseStepState.EARMARKED.name,
+            )
+            for case, step_data in cases_and_steps_data
+        ],
+    )
+    contracts = _bulk_create(
+        client_orm_models.CaseStepContract,
+        [
+            client_orm_models.CaseStepContract(
+                case_step=case_step,
+                provider_contact_uuid=step_data["active_contract"]["provider_contact"][
+                    "uuid"
+                ],
+            )
+            for case_step, (_, step_data) in zip(case_steps, cases_and_steps_data)
+        ],
+    )
+    for case_step, contract in zip(case_steps, contracts):
+        case_step.active_contract = contract
+    client_orm_models.CaseStep.objects.bulk_update(case_steps, ["active_contract"])
+
+    return cases
+
+
+def _get_by_uuid(model: Type[ModelT], uuids: List[UUID]) -> Dict[UUID, ModelT]:
+    """
+    Fetch instances of `model` by UUID, raising DoesNotExist if any is missing.
+    """
+    instances = {obj.uuid: obj for obj in model.objects.filter(uuid__in=set(uuids))}
+    missing = set(uuids) - set(instances)
+    if missing:
+        raise model.DoesNotExist(  # type: ignore
+            f"{model.__name__} matching query does not exist: "
+            + ", ".join(sorted(map(str, missing)))
         )
-        case_step.earmark(provider_contact)
-        case_step.save()
+    return instances
 
-    return case
+
+def _bulk_create(model: Type[ModelT], instances: List[ModelT]) -> List[ModelT]:
+    """
+    Validate and bulk create `instances`, and return them in order with their
+    primary keys.
+
+    Databases that cannot return the primary keys of rows inserted in bulk
+    (e.g. SQLite) cost an extra query.
+    """
+    if not instances:
+        return []
+    validate_pseudo_foreign_keys(instances)
+    db = router.db_for_write(model)
+    model.objects.using(db).bulk_create(instances)
+    if any(instance.pk is None for instance in instances):
+        ids = dict(
+            model.objects.using(db)
+            .filter(uuid__in=[instance.uuid for instance in instances])  # type: ignore
+            .values_list("uuid", "id")
+        )
+        for instance in instances:
+            instance.pk = ids[instance.uuid]  # type: ignore
+            instance._state.adding = False
+            instance._state.db = db
+    return instances
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ClientConfig(AppConfig):
     name = "client"
+
+    def ready(self):
+        from client import signal_receivers  # noqa
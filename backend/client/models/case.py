@@ -20,8 +20,6 @@ class Applicant(BaseModel):
     home_country_uuid = UUIDPseudoForeignKeyField(Country)
     home_country: Country
 
-    _prefetched_user: "User"
-    _prefetched_home_country: Country
     _prefetched_nationalities: List[Country]
 
     class Meta:
@@ -31,36 +29,18 @@ class Applicant(BaseModel):
             )
         ]
 
-    def validate(self):
-        # TODO: Should UUIDPseudoForeignKeyField cause this to happen
-        # automatically?
-        assert (
-            self.user_uuid
-            and get_user_model().objects.filter(uuid=self.user_uuid).exists()
-        )
-        assert (
-            self.home_country_uuid
-            and Country.objects.filter(uuid=self.home_country_uuid).exists()
-        )
-
     @property
     def nationalities(self) -> Iterable[Country]:
         prefetched = getattr(self, "_prefetched_nationalities", None)
-        if prefetched:
+        if prefetched is not None:
             return prefetched
-        country_uuids = ApplicantNationality.objects.filter(applicant=self).values_list(
-            "country_uuid", flat=True
+        country_uuids = (
+            ApplicantNationality.objects.db_manager(hints={"instance": self})
+            .filter(applicant=self)
+            .values_list("country_uuid", flat=True)
         )
         return Country.objects.filter(uuid__in=list(country_uuids))
 
-    @property
-    def _home_country(self) -> Country:
-        return getattr(self, "_prefetched_home_country", None) or self.home_country
-
-    @property
-    def _user(self) -> "User":
-        return getattr(self, "_prefetched_user", None) or self.user
-
 
 class ApplicantNationality(BaseModel):
     applicant = models.ForeignKey(Applicant, on_delete=deletion.CASCADE)
@@ -76,12 +56,6 @@ class ApplicantNationality(BaseModel):
         ]
         verbose_name_plural = "ApplicantNationalities"
 
-    def validate(self):
-        assert (
-            self.country_uuid
-            and Country.objects.filter(uuid=self.country_uuid).exists()
-        )
-
 
 class Case(BaseModel):
     # TODO: created_by (ClientContact or User?)
@@ -114,11 +88,3 @@ class Case(BaseModel):
             contract_location=None,
             payroll_location=None,
         )
-
-    def validate(self):
-        # TODO: Should UUIDPseudoForeignKeyField cause this to happen
-        # automatically?
-        assert (
-            self.process_uuid
-            and ProcessRuleSet.objects.filter(uuid=self.process_uuid).exists()
-        )
@@ -16,6 +16,7 @@ from immigration.models import ProcessStep
 from owldock.state_machine.action import Action
 from owldock.state_machine.django_fsm_utils import FSMField, transition
 from owldock.state_machine.role import (
+    get_principal,
     get_role,
     get_role_from_http_request,
     Role,
@@ -76,14 +77,24 @@ def permission_checker(action: str) -> Callable[["CaseStep", User], bool]:
             for (role, _), actions in ACTIONS.items()
             if action in [a for (_, a) in actions]
         }
-        role = get_role(user)
+        principal = get_principal(user)
+        role = principal.role
         if role not in roles:
             return False
         if role == Role.CLIENT_CONTACT:
-            return instance.case.client_contact.user == user  # type: ignore
+            client_contact = principal.client_contact
+            return (
+                client_contact is not None
+                and instance.case.client_contact_id == client_contact.id
+            )
         elif role == Role.PROVIDER_CONTACT:
             contract = instance.active_contract
-            return bool(contract) and contract.provider_contact.user == user  # type: ignore
+            provider_contact = principal.provider_contact
+            return (
+                bool(contract)
+                and provider_contact is not None
+                and contract.provider_contact_uuid == provider_contact.uuid
+            )
         else:
             raise AssertionError(f"Invalid role: {role}")
 
@@ -107,14 +118,6 @@ class CaseStep(BaseModel):
     get_available_state_name_transitions: Callable
     get_available_user_state_name_transitions: Callable
 
-    def validate(self):
-        # TODO: Should UUIDPseudoForeignKeyField cause this to happen
-        # automatically?
-        assert (
-            self.process_step_uuid
-            and ProcessStep.objects.filter(uuid=self.process_step_uuid).exists()
-        )
-
     @property
     def state(self) -> State:
         return getattr(State, self.state_name)
@@ -142,7 +145,9 @@ class CaseStep(BaseModel):
         Associate this case with a provider without notifying the provider.
         """
         with atomic():
-            contract, created = CaseStepContract.objects.get_or_create(
+            contract, created = CaseStepContract.objects.db_manager(
+                hints={"instance": self}
+            ).get_or_create(
                 case_step=self,
                 provider_contact_uuid=provider_contact.uuid,
                 accepted_at__isnull=True,
@@ -269,7 +274,7 @@ class CaseStep(BaseModel):
     @property
     def stored_files(self) -> QuerySet[StoredFile]:
         prefetched = getattr(self, "_prefetched_stored_files", None)
-        if prefetched:
+        if prefetched is not None:
             return prefetched
 
         # GenericRelation is not working with our multiple database setup
@@ -286,14 +291,6 @@ class CaseStepContract(BaseModel):
     accepted_at = models.DateTimeField(null=True)
     rejected_at = models.DateTimeField(null=True)
 
-    def validate(self):
-        # TODO: Should UUIDPseudoForeignKeyField cause this to happen
-        # automatically?
-        assert (
-            self.provider_contact_uuid
-            and ProviderContact.objects.filter(uuid=self.provider_contact_uuid).exists()
-        )
-
     def is_blank(self) -> bool:
         return not self.accepted_at and not self.rejected_at
 
@@ -42,7 +42,9 @@ class Client(BaseModel):
         ]
 
     def provider_relationships(self) -> "QuerySet[ClientProviderRelationship]":
-        return ClientProviderRelationship.objects.filter(client=self)
+        return ClientProviderRelationship.objects.db_manager(
+            hints={"instance": self}
+        ).filter(client=self)
 
     def provider_contacts(self) -> QuerySet[ProviderContact]:
         provider_uuids = [r.provider_uuid for r in self.provider_relationships()]
@@ -59,14 +61,6 @@ class ClientProviderRelationship(BaseModel):
         unique_together = [["client", "provider_uuid"]]
         ordering = ["-preferred"]
 
-    def validate(self):
-        # TODO: Should UUIDPseudoForeignKeyField cause this to happen
-        # automatically?
-        assert (
-            self.provider_uuid
-            and Provider.objects.filter(uuid=self.provider_uuid).exists()
-        )
-
 
 class ClientContact(BaseModel):
     user_uuid = UUIDPseudoForeignKeyField(get_user_model())
@@ -84,21 +78,15 @@ class ClientContact(BaseModel):
             )
         ]
 
-    def validate(self):
-        # TODO: Should UUIDPseudoForeignKeyField cause this to happen
-        # automatically?
-        assert (
-            self.user_uuid
-            and get_user_model().objects.filter(uuid=self.user_uuid).exists()
-        )
-
     def cases(self) -> "QuerySet[Case]":
         return self.case_set.all()
 
     def case_steps(self) -> "QuerySet[CaseStep]":
         from client.models.case_step import CaseStep
 
-        return CaseStep.objects.filter(case__client_contact=self)
+        return CaseStep.objects.db_manager(hints={"instance": self}).filter(
+            case__client_contact=self
+        )
 
     def case_steps_with_write_permission(self) -> "QuerySet[CaseStep]":
         return self.case_steps()
@@ -106,7 +94,9 @@ class ClientContact(BaseModel):
     def applicants(self) -> "QuerySet[Applicant]":
         # TODO: these are applicants for which the client contact has what permissions?
         # TODO: ClientEntity
-        return Applicant.objects.filter(employer_id=self.client_id)
+        return Applicant.objects.db_manager(hints={"instance": self}).filter(
+            employer_id=self.client_id
+        )
 
     def provider_relationships(self) -> QuerySet[ClientProviderRelationship]:
         return self.client.provider_relationships()
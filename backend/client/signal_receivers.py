@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from app.models import ClientDatabase
+from client.models import Client
+
+
+@receiver(post_save, sender=Client)
+def create_client_database(
+    sender, instance: Client, created: bool, using: str, **kwargs
+):
+    # The shard map (see owldock.database_router.get_client_db) must record
+    # every client.
+    if created:
+        ClientDatabase.objects.update_or_create(
+            client_uuid=instance.uuid, defaults={"database": using}
+        )
@@ -6,6 +6,7 @@ from django.contrib.auth import get_user_model
 from app.fixtures import country as country_fixture
 from app.models import Bloc, Country
 from app.tests import factories
+from immigration.snapshot import bump_data_version
 from immigration.tests.conftest import *  # noqa
 from owldock.tests.constants import TEST_PASSWORD
 
@@ -32,6 +33,18 @@ def allow_database_use(db):
     pass
 
 
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    settings.OWLDOCK_QUERY_BUDGET_SAMPLE_RATE = 1.0
+    settings.OWLDOCK_QUERY_BUDGETS_ENFORCED = True
+
+
+@pytest.fixture(autouse=True)
+def invalidate_immigration_data_snapshots():
+    # Data is rolled back between tests without sending signals.
+    bump_data_version()
+
+
 @pytest.fixture()
 def load_country_fixture():
     country_fixture.load_country_fixture()
@@ -1,3 +1,5 @@
+from typing import Iterable
+
 from django.contrib import admin
 from django.db.models import QuerySet
 from django.forms import ModelForm, ValidationError
@@ -8,7 +10,8 @@ from nested_admin import (
     NestedModelAdmin,
 )
 
-from app.models import Bloc
+from app.models import Country
+from immigration import snapshot
 from immigration.admin.bloc_choice_field import BlocChoiceFieldMixin  # type: ignore
 from immigration.models import (
     IssuedDocument,
@@ -404,15 +407,6 @@ class ProcessRuleSetAdmin(HasInlinesNestedModelAdmin):
         ),
     ]
 
-    def get_sortable_by(self, request: HttpRequest):
-        # This is a pretty random choice of method to use for the purpose, but
-        # we need to recompute this on each request; __init__ is called once at
-        # server start time.
-        self.get_bloc_description_from_countries = (
-            Bloc.objects.make_get_description_from_countries()
-        )
-        return super().get_sortable_by(request)
-
     @admin.display(description="Steps summary")
     def steps_summary(self, obj: ProcessRuleSet) -> str:
         html = "<table><tbody>"
@@ -470,7 +464,7 @@ class ProcessRuleSetAdmin(HasInlinesNestedModelAdmin):
         if not nationalities:
             return "any"
         else:
-            return self.get_bloc_description_from_countries(nationalities)
+            return _get_bloc_description(nationalities)
 
     @admin.display(description="Available to home countries")
     def available_to_home_countries(self, obj: ProcessRuleSet) -> str:
@@ -478,7 +472,7 @@ class ProcessRuleSetAdmin(HasInlinesNestedModelAdmin):
         if not home_countries:
             return "any"
         else:
-            return self.get_bloc_description_from_countries(home_countries)
+            return _get_bloc_description(home_countries)
 
     def get_queryset(self, request: HttpRequest) -> QuerySet[ProcessRuleSet]:
         return (
@@ -494,3 +488,7 @@ class ProcessRuleSetAdmin(HasInlinesNestedModelAdmin):
                 "host_country__name", "name"
             )
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+def _get_bloc_description(countries: Iterable[Country]) -> str:
+    return snapshot.get_bloc_decomposer().decompose(c.code for c in countries)
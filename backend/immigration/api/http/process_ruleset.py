@@ -5,17 +5,16 @@ from typing import List, Set
 from django.db.transaction import atomic
 from django.http import HttpRequest, HttpResponse
 
-from app.models.bloc import Bloc
-from app.models.country import Country
 from immigration import models as orm_models
+from immigration import snapshot
 from immigration.api import models as api_models
-from owldock.dev.db_utils import print_query_counts
 from owldock.api.http.base import BaseView
+from owldock.api.serialization import serialize
 from owldock.http import (
     HttpResponseBadRequest,
     HttpResponseForbidden,
     HttpResponseNotFound,
-    OwldockJsonResponse,
+    cached_json_response,
 )
 
 logger = logging.getLogger(__name__)
@@ -26,17 +25,18 @@ class ProcessRuleSet(BaseView):
         return self._get(id)
 
     def _get(self, id: int) -> HttpResponse:
-        print("Data fetching queries:")
-        with print_query_counts():
+        def get_data() -> dict:
             orm_process_ruleset = api_models.ProcessRuleSet.get_orm_model(id=id)
+            return serialize(api_models.ProcessRuleSet, orm_process_ruleset)
 
-        print("Serialization queries:")
-        with print_query_counts():
-            api_process_ruleset = api_models.ProcessRuleSet.from_orm(
-                orm_process_ruleset
+        try:
+            return cached_json_response(
+                self.request,
+                f"immigration:process_ruleset:{id}:{snapshot.get_data_version()}",
+                get_data,
             )
-            data = api_process_ruleset.dict()
-        return OwldockJsonResponse(data)
+        except orm_models.ProcessRuleSet.DoesNotExist:
+            return HttpResponseNotFound(f"No ProcessRuleSet matching id={id} exists")
 
     @atomic
     def post(self, request: HttpRequest, id: int) -> HttpResponse:
@@ -99,28 +99,30 @@ class ProcessRuleSet(BaseView):
 # TODO: auth?
 class ProcessRuleSetList(BaseView):
     def get(self, request: HttpRequest, country_code: str) -> HttpResponse:
-        orm_process_rulesets = api_models.ProcessRuleSetList.get_orm_models(
-            route__host_country__code=country_code
-        )
+        def get_data() -> List[dict]:
+            orm_process_rulesets = api_models.ProcessRuleSetList.get_orm_models(
+                country_code
+            )
+
+            data = serialize(api_models.ProcessRuleSetList, orm_process_rulesets)
+            self._add_bloc_descriptions("nationalities", data)
+            return data
 
-        api_process_rulesets = api_models.ProcessRuleSetList.from_orm(
-            orm_process_rulesets
+        return cached_json_response(
+            request,
+            f"immigration:process_rulesets:{country_code}:"
+            f"{snapshot.get_data_version()}",
+            get_data,
         )
-        data = api_process_rulesets.dict()["__root__"]
-        self._add_bloc_descriptions("nationalities", data)
-        return OwldockJsonResponse(data)
 
     @staticmethod
     def _add_bloc_descriptions(key: str, data: List[dict]) -> None:
         # pydantic does not serialize computed properties
         # https://github.com/samuelcolvin/pydantic/issues/935
-        get_bloc_description_from_countries = (
-            Bloc.objects.make_get_description_from_countries()
+        descriptions = snapshot.get_bloc_decomposer().decompose_many(
+            [c["code"] for c in prs[key]] for prs in data
         )
-        country_code2country = {c.code: c for c in Country.objects.all()}
-        for prs in data:
-            countries = [country_code2country[c["code"]] for c in prs[key]]
-            description = get_bloc_description_from_countries(countries)
+        for prs, description in zip(data, descriptions):
             # The set of countries is being used to describe a rule here, and
             # empty set means a rule imposing no constraint.
             prs[f"{key}_description"] = "" if description == "0" else description
@@ -3,15 +3,15 @@ This module contains pydantic model definitions, defining the shape of JSON
 documents being sent to or received from the javascript app.
 """
 from __future__ import annotations
-from collections import defaultdict
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Collection, List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, PositiveInt, NonNegativeInt
 
 from owldock.api.models import DjangoOrmGetterDict
 from immigration import models as orm_models
+from immigration import snapshot
 
 
 class Country(BaseModel):
@@ -86,8 +86,7 @@ class ProcessStepList(BaseModel):
 
     @classmethod
     def get_orm_models(cls, host_country_code: str) -> List[orm_models.ProcessStep]:
-        id2step = _prefetch_process_steps_for_host_country_code(host_country_code)
-        return list(id2step.values())
+        return list(snapshot.get_snapshot(host_country_code).process_steps.values())
 
 
 class ProcessStepRuleSet(BaseModel):
@@ -131,8 +130,15 @@ class ProcessRuleSet(BaseModel):
         getter_dict = ProcessRuleSetGetterDict
 
     @classmethod
-    def get_orm_model(cls, **kwargs) -> orm_models.ProcessRuleSet:
-        [process_ruleset] = ProcessRuleSetList.get_orm_models(**kwargs)
+    def get_orm_model(cls, id: int) -> orm_models.ProcessRuleSet:
+        host_country_code = snapshot.get_host_country_code(id)
+        if host_country_code is None:
+            raise orm_models.ProcessRuleSet.DoesNotExist(
+                f"No ProcessRuleSet matching id={id} exists"
+            )
+        [process_ruleset] = ProcessRuleSetList.get_orm_models(
+            host_country_code, ids=[id]
+        )
         return process_ruleset
 
 
@@ -144,63 +150,12 @@ class ProcessRuleSetList(BaseModel):
         getter_dict = DjangoOrmGetterDict
 
     @classmethod
-    def get_orm_models(cls, **kwargs) -> List[orm_models.ProcessRuleSet]:
+    def get_orm_models(
+        cls, host_country_code: str, ids: Optional[Collection[int]] = None
+    ) -> List[orm_models.ProcessRuleSet]:
         """
-        Return ProcessRuleSet `id`, with all related objects prefetched such
-        that no queries are made during subsequent serialization.
+        Return ProcessRuleSets for the host country (optionally, only those with
+        the given ids), with all related objects prefetched such that no queries
+        are made during subsequent serialization.
         """
-        orm_process_rulesets = list(
-            orm_models.ProcessRuleSet.objects.select_related(
-                "route__host_country",
-            )
-            .prefetch_related(
-                "processrulesetstep_set__process_step",
-                "nationalities",
-                "home_countries",
-            )
-            .filter(**kwargs)
-        )
-        if orm_process_rulesets:
-            # We do not handle process_rulesets from a mixture of countries.
-            [country_code] = {pr.route.host_country.code for pr in orm_process_rulesets}
-            id2step = _prefetch_process_steps_for_host_country_code(country_code)
-            for pr in orm_process_rulesets:
-                for sr in pr.step_rulesets:
-                    sr.process_step = id2step[sr.process_step_id]
-
-        return orm_process_rulesets
-
-
-def _prefetch_process_steps_for_host_country_code(
-    country_code: str,
-) -> Dict[int, orm_models.ProcessStep]:
-    """
-    Return available ProcessSteps with related objects prefetched.
-    """
-    steps = (
-        orm_models.ProcessStep.objects.get_for_host_country_codes([country_code])
-        .select_related("host_country")
-        .prefetch_related(
-            "required_only_if_home_country",
-            "required_only_if_nationalities",
-        )
-    )
-    id2step = {s.id: s for s in steps}
-
-    # Get dependencies
-    id2depends_on_ids: Dict[int, List[int]] = defaultdict(list)
-    for from_id, to_id in orm_models.ProcessStep.depends_on.through.objects.filter(
-        from_processstep__in=id2step
-    ).values_list("from_processstep_id", "to_processstep_id"):
-        id2depends_on_ids[from_id].append(to_id)
-
-    # Attach prefetched dependency steps, but only those that are relevant to
-    # this country. For example, the Entry step is global and thus may depend on
-    # steps in many countries, but we restrict to its dependencies that are
-    # steps available in the current country.
-    for step in steps:
-        step._prefetched_depends_on = [
-            id2step[id] for id in id2depends_on_ids[step.id] if id in id2step
-        ]
-
-    return id2step
+        return snapshot.get_snapshot(host_country_code).get_process_rulesets(ids)
@@ -0,0 +1,58 @@
+import gzip
+
+import brotli
+from django.test import Client as DjangoTestClient
+
+from immigration.models import ProcessRuleSet
+
+
+def test_process_ruleset_etag(
+    admin_user_client: DjangoTestClient,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+):
+    process_ruleset = greece_local_hire_article_17_rule_set
+    for url in [
+        f"/api/process/{process_ruleset.id}/",
+        f"/api/processes/{process_ruleset.route.host_country.code}/",
+    ]:
+        response = admin_user_client.get(url)
+        assert response.status_code == 200
+        etag = response["ETag"]
+        data = response.json()["data"]
+
+        response = admin_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        process_ruleset.duration_max_days = (process_ruleset.duration_max_days or 0) + 1
+        process_ruleset.save()
+        response = admin_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert response.json()["data"] != data
+
+
+def test_process_ruleset_list_compression(
+    admin_user_client: DjangoTestClient,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    greece_eu_eea_swiss_national_registration_rule_set: ProcessRuleSet,
+):
+    url = f"/api/processes/{greece_local_hire_article_17_rule_set.route.host_country.code}/"
+    response = admin_user_client.get(url)
+    assert not response.has_header("Content-Encoding")
+    content = response.content
+    etag = response["ETag"]
+
+    for accept_encoding, decompress in [
+        ("gzip, deflate, br", brotli.decompress),
+        ("gzip;q=1.0, br;q=0", gzip.decompress),
+    ]:
+        response = admin_user_client.get(url, HTTP_ACCEPT_ENCODING=accept_encoding)
+        assert response.status_code == 200
+        assert decompress(response.content) == content
+        assert response["ETag"] == f"W/{etag}"
+        assert "Accept-Encoding" in response["Vary"]
+
+        response = admin_user_client.get(
+            url, HTTP_ACCEPT_ENCODING=accept_encoding, HTTP_IF_NONE_MATCH=f"W/{etag}"
+        )
+        assert response.status_code == 304
@@ -1,4 +1,4 @@
-from immigration.api.models import _prefetch_process_steps_for_host_country_code
+from immigration.snapshot import _prefetch_process_steps_for_host_country_code
 from immigration.models import ProcessStep
 
 
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ImmigrationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'immigration'
+
+    def ready(self):
+        from immigration import signal_receivers  # noqa
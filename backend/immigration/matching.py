@@ -0,0 +1,389 @@
+"""
+Matching of Moves against ProcessRuleSets, and construction of Processes.
+
+The ProcessRuleSets for a host country, and the ProcessSteps they use, are
+compiled, once per snapshot of the data (see immigration.snapshot), into arrays
+holding one row per ProcessRuleSet (or ProcessStep) for each condition
+(nationalities, home countries, contract/payroll location, duration, minimum
+salary). A batch of Moves is compiled in the same way, and
+evaluating the batch is then a handful of vectorized comparisons between the two
+sets of arrays, with no database queries. The compiled matchers are cached
+in-process until the data version changes.
+
+A condition that a Move has insufficient data to evaluate (e.g. no
+nationalities, or no target dates) does not exclude a ProcessRuleSet, and does
+not exclude a ProcessStep; this is the same convention as the rule evaluation
+code in the UI.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.db.models import Model
+
+from immigration.models import Location, Move, Process, ProcessRuleSet, ProcessStep
+from immigration.snapshot import HostCountrySnapshot, get_snapshot
+
+# Integer codes for the Location enum, as stored in the compiled arrays. 0 means
+# "no location condition" (for a ProcessRuleSet or ProcessStep), or "unknown"
+# (for a Move).
+LOCATION_CODES = {
+    None: 0,
+    Location.HOME_COUNTRY: 1,
+    Location.HOST_COUNTRY: 2,
+}
+
+
+class _Conditions:
+    """
+    Conditions on a Move, compiled to arrays with one row per condition set.
+    """
+
+    def __init__(
+        self,
+        country_id2column: Dict[int, int],
+        nationality_ids: List[Iterable[int]],
+        home_country_ids: List[Iterable[int]],
+        contract_locations: List[Optional[str]],
+        payroll_locations: List[Optional[str]],
+        duration_min_days: List[Optional[int]],
+        duration_max_days: List[Optional[int]],
+        minimum_salaries: List[Optional[Tuple[float, str]]],
+    ):
+        self.nationalities = _make_country_matrix(country_id2column, nationality_ids)
+        self.home_countries = _make_country_matrix(country_id2column, home_country_ids)
+        # Blank nationalities/home countries means "available to all".
+        self.any_nationality = ~self.nationalities.any(axis=1)
+        self.any_home_country = ~self.home_countries.any(axis=1)
+        self.contract_location = _make_location_array(contract_locations)
+        self.payroll_location = _make_location_array(payroll_locations)
+        # Durations are inclusive bounds; blank bounds are infinite.
+        self.duration_min_days = np.array(
+            [-np.inf if d is None else d for d in duration_min_days], dtype=float
+        )
+        self.duration_max_days = np.array(
+            [np.inf if d is None else d for d in duration_max_days], dtype=float
+        )
+        self.minimum_salary = np.array(
+            [-np.inf if s is None else s[0] for s in minimum_salaries], dtype=float
+        )
+        self.minimum_salary_currency = np.array(
+            ["" if s is None else s[1] for s in minimum_salaries], dtype=object
+        )
+
+    def __len__(self) -> int:
+        return len(self.contract_location)
+
+    def get_masks(self, moves: "_CompiledMoves") -> np.ndarray:
+        """
+        Return boolean matrix (moves x conditions) indicating which conditions
+        each move satisfies.
+        """
+        masks = np.ones((len(moves), len(self)), dtype=bool)
+        masks &= (
+            ~moves.has_nationalities[:, None]
+            | self.any_nationality[None, :]
+            | (moves.nationalities @ self.nationalities.T)
+        )
+        masks &= (
+            ~moves.has_home_country[:, None]
+            | self.any_home_country[None, :]
+            | (moves.home_countries @ self.home_countries.T)
+        )
+        for move_locations, locations in [
+            (moves.contract_location, self.contract_location),
+            (moves.payroll_location, self.payroll_location),
+        ]:
+            masks &= (
+                (move_locations[:, None] == 0)
+                | (locations[None, :] == 0)
+                | (move_locations[:, None] == locations[None, :])
+            )
+        duration_days = moves.duration_days[:, None]
+        masks &= np.isnan(duration_days) | (
+            (self.duration_min_days[None, :] <= duration_days)
+            & (duration_days <= self.duration_max_days[None, :])
+        )
+        # Salaries in different currencies cannot be compared, so those
+        # conditions are not applied.
+        salary = moves.salary[:, None]
+        masks &= (
+            np.isnan(salary)
+            | (self.minimum_salary[None, :] <= salary)
+            | (self.minimum_salary_currency[None, :] != moves.salary_currency[:, None])
+        )
+        return masks
+
+
+class _CompiledMoves:
+    """
+    A batch of Moves, compiled to arrays with one row per Move.
+    """
+
+    def __init__(self, moves: Sequence[Move], country_id2column: Dict[int, int]):
+        # A country that is not mentioned by any condition has no column; it
+        # satisfies only conditions which do not restrict countries.
+        self.nationalities = _make_country_matrix(
+            country_id2column,
+            [[c.id for c in move.nationalities or []] for move in moves],
+        )
+        self.has_nationalities = np.array(
+            [bool(move.nationalities) for move in moves], dtype=bool
+        )
+        self.home_countries = _make_country_matrix(
+            country_id2column,
+            [[move.home_country.id] if move.home_country else [] for move in moves],
+        )
+        self.has_home_country = np.array(
+            [bool(move.home_country) for move in moves], dtype=bool
+        )
+        self.contract_location = _make_location_array(
+            [move.contract_location for move in moves]
+        )
+        self.payroll_location = _make_location_array(
+            [move.payroll_location for move in moves]
+        )
+        durations = [get_duration_days(move) for move in moves]
+        self.duration_days = np.array(
+            [np.nan if d is None else d for d in durations], dtype=float
+        )
+        salaries = [move.salary for move in moves]
+        self.salary = np.array(
+            [np.nan if s is None else float(s.amount) for s in salaries], dtype=float
+        )
+        self.salary_currency = np.array(
+            [None if s is None else s.currency.code for s in salaries], dtype=object
+        )
+
+    def __len__(self) -> int:
+        return len(self.salary)
+
+
+class ProcessRuleSetMatcher:
+    """
+    The ProcessRuleSets of one host country, compiled for fast matching.
+    """
+
+    def __init__(
+        self,
+        process_rulesets: Sequence[ProcessRuleSet],
+        nationality_ids: Dict[int, Iterable[int]],
+        home_country_ids: Dict[int, Iterable[int]],
+        process_ruleset_step_ids: Dict[int, List[int]],
+        process_steps: Dict[int, ProcessStep],
+        step_nationality_ids: Dict[int, Iterable[int]],
+        step_home_country_ids: Dict[int, Iterable[int]],
+    ):
+        """
+        `process_ruleset_step_ids` maps ProcessRuleSet id to the ids of its
+        ProcessSteps, in order, and `process_steps` maps those ids to
+        ProcessSteps. The remaining dicts map ProcessRuleSet (or ProcessStep)
+        id to Country ids.
+        """
+        # The data version of the snapshot compiled, if any.
+        self.version: Optional[int] = None
+        self.process_ruleset_ids = np.array(
+            [prs.id for prs in process_rulesets], dtype=np.int64
+        )
+        self.routes = [prs.route for prs in process_rulesets]
+        self.process_steps = list(process_steps.values())
+        step_id2row = {step.id: i for i, step in enumerate(self.process_steps)}
+        # For each ProcessRuleSet, the rows of its steps in self.process_steps.
+        self.step_rows = [
+            [step_id2row[id] for id in process_ruleset_step_ids.get(prs.id, [])]
+            for prs in process_rulesets
+        ]
+
+        country_ids = sorted(
+            {
+                id
+                for id2country_ids in [
+                    nationality_ids,
+                    home_country_ids,
+                    step_nationality_ids,
+                    step_home_country_ids,
+                ]
+                for ids in id2country_ids.values()
+                for id in ids
+            }
+        )
+        self.country_id2column = {id: i for i, id in enumerate(country_ids)}
+
+        self.conditions = _Conditions(
+            self.country_id2column,
+            nationality_ids=[
+                nationality_ids.get(prs.id, []) for prs in process_rulesets
+            ],
+            home_country_ids=[
+                home_country_ids.get(prs.id, []) for prs in process_rulesets
+            ],
+            contract_locations=[prs.contract_location for prs in process_rulesets],
+            payroll_locations=[prs.payroll_location for prs in process_rulesets],
+            duration_min_days=[prs.duration_min_days for prs in process_rulesets],
+            duration_max_days=[prs.duration_max_days for prs in process_rulesets],
+            minimum_salaries=[
+                (float(prs.minimum_salary.amount), prs.minimum_salary.currency.code)
+                if prs.minimum_salary is not None
+                else None
+                for prs in process_rulesets
+            ],
+        )
+        # A step's duration conditions are inclusive bounds, as for ProcessRuleSets:
+        # the step is required if the duration is at least
+        # required_only_if_duration_greater_than and at most
+        # required_only_if_duration_less_than.
+        steps = self.process_steps
+        self.step_conditions = _Conditions(
+            self.country_id2column,
+            nationality_ids=[step_nationality_ids.get(s.id, []) for s in steps],
+            home_country_ids=[step_home_country_ids.get(s.id, []) for s in steps],
+            contract_locations=[s.required_only_if_contract_location for s in steps],
+            payroll_locations=[s.required_only_if_payroll_location for s in steps],
+            duration_min_days=[s.required_only_if_duration_greater_than for s in steps],
+            duration_max_days=[s.required_only_if_duration_less_than for s in steps],
+            minimum_salaries=[None for s in steps],
+        )
+
+    def __len__(self) -> int:
+        return len(self.process_ruleset_ids)
+
+    @classmethod
+    def compile(cls, snapshot: HostCountrySnapshot) -> "ProcessRuleSetMatcher":
+        """
+        Compile all ProcessRuleSets in the snapshot, and their steps.
+        """
+        process_rulesets = snapshot.process_rulesets
+        process_ruleset_step_ids = {
+            prs.id: [sr.process_step_id for sr in prs.step_rulesets]
+            for prs in process_rulesets
+        }
+        process_steps = {
+            id: snapshot.process_steps[id]
+            for step_ids in process_ruleset_step_ids.values()
+            for id in step_ids
+        }
+        matcher = cls(
+            process_rulesets,
+            _get_country_ids(process_rulesets, "nationalities"),
+            _get_country_ids(process_rulesets, "home_countries"),
+            process_ruleset_step_ids,
+            process_steps,
+            _get_country_ids(process_steps.values(), "required_only_if_nationalities"),
+            _get_country_ids(process_steps.values(), "required_only_if_home_country"),
+        )
+        matcher.version = snapshot.version
+        return matcher
+
+    def get_masks(self, moves: Sequence[Move]) -> np.ndarray:
+        """
+        Return boolean matrix (moves x ProcessRuleSets) indicating which
+        ProcessRuleSets match each move.
+        """
+        return self.conditions.get_masks(_CompiledMoves(moves, self.country_id2column))
+
+    def get_mask(self, move: Move) -> np.ndarray:
+        """
+        Return boolean array indicating which ProcessRuleSets match the move.
+        """
+        return self.get_masks([move])[0]
+
+    def match(self, move: Move) -> List[int]:
+        """
+        Return ids of ProcessRuleSets that match the move.
+        """
+        return self.process_ruleset_ids[self.get_mask(move)].tolist()
+
+    def get_processes(self, moves: Sequence[Move]) -> List[List[Process]]:
+        """
+        Return, for each move, a Process for each matching ProcessRuleSet.
+
+        The steps of each Process are those steps of the ProcessRuleSet which
+        are required for the move.
+        """
+        compiled_moves = _CompiledMoves(moves, self.country_id2column)
+        masks = self.conditions.get_masks(compiled_moves)
+        step_masks = self.step_conditions.get_masks(compiled_moves)
+        return [
+            [
+                Process(
+                    route=self.routes[i],
+                    steps=[
+                        self.process_steps[j] for j in self.step_rows[i] if step_mask[j]
+                    ],
+                )
+                for i in np.flatnonzero(mask)
+            ]
+            for mask, step_mask in zip(masks, step_masks)
+        ]
+
+
+def _make_country_matrix(
+    country_id2column: Dict[int, int], country_ids: List[Iterable[int]]
+) -> np.ndarray:
+    matrix = np.zeros((len(country_ids), len(country_id2column)), dtype=bool)
+    for i, ids in enumerate(country_ids):
+        columns = [country_id2column[id] for id in ids if id in country_id2column]
+        matrix[i, columns] = True
+    return matrix
+
+
+def _make_location_array(locations: Iterable[Optional[str]]) -> np.ndarray:
+    return np.array(
+        [LOCATION_CODES[Location(loc) if loc else None] for loc in locations],
+        dtype=np.int8,
+    )
+
+
+def get_duration_days(move: Move) -> Optional[int]:
+    if move.target_entry_date and move.target_exit_date:
+        return (move.target_exit_date - move.target_entry_date).days
+    else:
+        return None
+
+
+def _get_country_ids(objs: Iterable[Model], attr: str) -> Dict[int, List[int]]:
+    # The related countries are prefetched in the snapshot.
+    return {obj.id: [c.id for c in getattr(obj, attr).all()] for obj in objs}
+
+
+_matchers: Dict[str, ProcessRuleSetMatcher] = {}
+
+
+def get_matcher(host_country_code: str) -> ProcessRuleSetMatcher:
+    """
+    Return the compiled matcher for the host country, compiling it if the data
+    has changed since it was last compiled.
+    """
+    snapshot = get_snapshot(host_country_code)
+    matcher = _matchers.get(host_country_code)
+    if not matcher or matcher.version != snapshot.version:
+        matcher = _matchers[host_country_code] = ProcessRuleSetMatcher.compile(snapshot)
+    return matcher
+
+
+def match(move: Move) -> List[int]:
+    """
+    Return ids of ProcessRuleSets for the move's host country that match the move.
+    """
+    return get_matcher(move.host_country.code).match(move)
+
+
+def get_processes(moves: Sequence[Move]) -> List[List[Process]]:
+    """
+    Return, for each move, the Processes available for the move.
+
+    Moves are evaluated in one batch per host country, so that, once the
+    matchers are compiled, no database queries are made regardless of the
+    number of moves.
+    """
+    host_country_code2indexes: Dict[str, List[int]] = defaultdict(list)
+    for i, move in enumerate(moves):
+        host_country_code2indexes[move.host_country.code].append(i)
+    processes: List[List[Process]] = [[] for _ in moves]
+    for host_country_code, indexes in host_country_code2indexes.items():
+        matcher = get_matcher(host_country_code)
+        for i, move_processes in zip(
+            indexes, matcher.get_processes([moves[i] for i in indexes])
+        ):
+            processes[i] = move_processes
+    return processes
@@ -74,9 +74,10 @@ class Move:
     target_exit_date: Optional[date] = None
     activity: Optional[Activity] = None
     nationalities: Optional[List[Country]] = None
+    home_country: Optional[Country] = None
     contract_location: Optional[Location] = None
     payroll_location: Optional[Location] = None
-    salary = Money("50000")
+    salary: Optional[Money] = None
 
     def __str__(self):
         contract_location = (
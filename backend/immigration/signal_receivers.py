@@ -0,0 +1,32 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from app.models import Bloc, Country
+from immigration.models import ProcessRuleSet, ProcessRuleSetStep, ProcessStep, Route
+from immigration.snapshot import bump_data_version
+
+
+# Blocs and Countries are used in serialized ProcessRuleSet data
+# (nationalities_description), via the bloc decomposer.
+@receiver(post_save, sender=Bloc)
+@receiver(post_delete, sender=Bloc)
+@receiver(m2m_changed, sender=Bloc.countries.through)
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=ProcessRuleSet)
+@receiver(post_delete, sender=ProcessRuleSet)
+@receiver(m2m_changed, sender=ProcessRuleSet.nationalities.through)
+@receiver(m2m_changed, sender=ProcessRuleSet.home_countries.through)
+@receiver(m2m_changed, sender=ProcessRuleSetStep)
+@receiver(post_save, sender=ProcessRuleSetStep)
+@receiver(post_delete, sender=ProcessRuleSetStep)
+@receiver(post_save, sender=ProcessStep)
+@receiver(post_delete, sender=ProcessStep)
+@receiver(m2m_changed, sender=ProcessStep.depends_on.through)
+@receiver(m2m_changed, sender=ProcessStep.required_only_if_nationalities.through)
+@receiver(m2m_changed, sender=ProcessStep.required_only_if_home_country.through)
+def bump_immigration_data_version(sender, **kwargs):
+    # Note that QuerySet.update() and bulk operations do not send these signals.
+    bump_data_version()
@@ -0,0 +1,290 @@
+"""
+Versioned, in-process snapshots of the immigration data for a host country.
+
+Immigration data (Routes, ProcessRuleSets, ProcessSteps and their dependencies
+and Countries) changes only when it is edited by admins, but is read on every
+load of the process list, the Gantt editor etc. So each worker process holds a
+snapshot of the data for each host country, with all related objects
+prefetched, which is used until the data version changes. Snapshots are held
+only for the codes of existing Countries, so that their number is bounded
+whatever country codes are requested. Likewise, each worker process holds a
+decomposer describing sets of countries in terms of Blocs, whose memoized
+descriptions are reused until the data version changes.
+
+The data version is a timestamp held in the "shared" cache, which is shared by
+all worker processes, and whose entries do not expire; it is changed whenever
+immigration data is saved (see immigration.signal_receivers). It is read once
+per request, which is the only cost of using up-to-date snapshots.
+
+Snapshots, and the other data cached here, are read from the primary default
+database, never from a read replica: data read from a lagging replica would be
+cached under the new data version, and served until the version next changes.
+
+The ORM objects in a snapshot are shared by all requests handled by the worker
+process, and must not be modified.
+"""
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import (
+    Collection,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django_tools.middlewares.ThreadLocal import get_current_request
+
+from app.models import Bloc, Country
+from immigration.models import ProcessRuleSet, ProcessStep
+from owldock.utils.set_decomposer import SetDecomposer
+
+DATA_VERSION_CACHE_KEY = "immigration:data_version"
+_REQUEST_DATA_VERSION_ATTR_NAME = "_owldock_immigration_data_version"
+
+
+@dataclass(frozen=True)
+class HostCountrySnapshot:
+    """
+    The immigration data for one host country, at one data version.
+    """
+
+    version: int
+    host_country_code: str
+    # With route, nationalities, home countries and steps prefetched.
+    process_rulesets: Sequence[ProcessRuleSet]
+    # The steps available in the host country, with host country, conditions
+    # and dependencies prefetched.
+    process_steps: Mapping[int, ProcessStep]
+
+    def get_process_rulesets(
+        self, ids: Optional[Collection[int]] = None
+    ) -> List[ProcessRuleSet]:
+        """
+        Return the ProcessRuleSets with the given ids, or all ProcessRuleSets.
+        """
+        if ids is None:
+            return list(self.process_rulesets)
+        id_set = set(ids)
+        return [prs for prs in self.process_rulesets if prs.id in id_set]
+
+
+_snapshots: Dict[str, HostCountrySnapshot] = {}
+_process_ruleset_index: Tuple[Optional[int], Dict[int, str], Dict[UUID, str]] = (
+    None,
+    {},
+    {},
+)
+_country_codes: Tuple[Optional[int], FrozenSet[str]] = (None, frozenset())
+_bloc_decomposer: Tuple[Optional[int], Optional[SetDecomposer]] = (None, None)
+
+
+def get_snapshot(host_country_code: str) -> HostCountrySnapshot:
+    """
+    Return an up-to-date snapshot of the data for the host country.
+    """
+    version = get_data_version()
+    snapshot = _snapshots.get(host_country_code)
+    if not snapshot or snapshot.version != version:
+        snapshot = _make_snapshot(host_country_code, version)
+        if host_country_code in _get_country_codes():
+            _snapshots[host_country_code] = snapshot
+    return snapshot
+
+
+def _get_country_codes() -> FrozenSet[str]:
+    """
+    Return the codes of all Countries.
+    """
+    global _country_codes
+    version = get_data_version()
+    codes_version, codes = _country_codes
+    if codes_version != version:
+        codes = frozenset(
+            Country.objects.using(settings.DEFAULT_DB_NAME).values_list(
+                "code", flat=True
+            )
+        )
+        _country_codes = (version, codes)
+    return codes
+
+
+def get_host_country_code(process_ruleset_id: int) -> Optional[str]:
+    """
+    Return the host country code of the ProcessRuleSet, if it exists.
+    """
+    id2code, _ = _get_process_ruleset_index()
+    return id2code.get(process_ruleset_id)
+
+
+def get_process_rulesets_by_uuid(
+    uuids: Collection[UUID],
+) -> Dict[UUID, ProcessRuleSet]:
+    """
+    Return the ProcessRuleSets with the given UUIDs, from up-to-date snapshots.
+
+    UUIDs of ProcessRuleSets that do not exist are omitted.
+    """
+    _, uuid2code = _get_process_ruleset_index()
+    code2uuids: Dict[str, List[UUID]] = defaultdict(list)
+    for uuid in uuids:
+        if uuid in uuid2code:
+            code2uuids[uuid2code[uuid]].append(uuid)
+    uuid2process_ruleset = {}
+    for host_country_code, code_uuids in code2uuids.items():
+        uuid_set = set(code_uuids)
+        for prs in get_snapshot(host_country_code).process_rulesets:
+            if prs.uuid in uuid_set:
+                uuid2process_ruleset[prs.uuid] = prs
+    return uuid2process_ruleset
+
+
+def get_process_ruleset_uuids(host_country_code: str) -> List[UUID]:
+    """
+    Return the UUIDs of the host country's ProcessRuleSets.
+    """
+    _, uuid2code = _get_process_ruleset_index()
+    return [uuid for uuid, code in uuid2code.items() if code == host_country_code]
+
+
+def _get_process_ruleset_index() -> Tuple[Dict[int, str], Dict[UUID, str]]:
+    """
+    Return the host country codes of all ProcessRuleSets, by id and by UUID.
+    """
+    global _process_ruleset_index
+    version = get_data_version()
+    index_version, id2code, uuid2code = _process_ruleset_index
+    if index_version != version:
+        id2code, uuid2code = {}, {}
+        for id, uuid, code in ProcessRuleSet.objects.using(
+            settings.DEFAULT_DB_NAME
+        ).values_list("id", "uuid", "route__host_country__code"):
+            id2code[id] = uuid2code[uuid] = code
+        _process_ruleset_index = (version, id2code, uuid2code)
+    return id2code, uuid2code
+
+
+def get_bloc_decomposer() -> SetDecomposer:
+    """
+    Return an up-to-date SetDecomposer describing sets of country codes in terms
+    of Blocs.
+    """
+    global _bloc_decomposer
+    version = get_data_version()
+    decomposer_version, decomposer = _bloc_decomposer
+    if decomposer is None or decomposer_version != version:
+        decomposer = Bloc.objects.db_manager(settings.DEFAULT_DB_NAME).make_decomposer()
+        _bloc_decomposer = (version, decomposer)
+    return decomposer
+
+
+def get_data_version() -> int:
+    """
+    Return the data version, reading it from the shared cache once per request.
+    """
+    request = get_current_request()
+    version = getattr(request, _REQUEST_DATA_VERSION_ATTR_NAME, None)
+    if version is None:
+        cache = caches["shared"]
+        version = cache.get(DATA_VERSION_CACHE_KEY)
+        if version is None:
+            # The cache has been cleared: start from a value which has not been
+            # used before.
+            cache.add(DATA_VERSION_CACHE_KEY, time.time_ns())
+            version = cache.get(DATA_VERSION_CACHE_KEY)
+        if request is not None:
+            setattr(request, _REQUEST_DATA_VERSION_ATTR_NAME, version)
+    return version
+
+
+def bump_data_version() -> None:
+    """
+    Invalidate all snapshots, in all processes.
+
+    The version is changed immediately, and again when the current transaction
+    commits, so that no snapshot built from data read before the commit
+    outlives it.
+    """
+    _bump_data_version()
+    transaction.on_commit(_bump_data_version)
+
+
+def _bump_data_version() -> None:
+    # The new version is the current time, rather than the old version plus
+    # one, so that there is no read-modify-write for concurrent bumps (in
+    # different processes) to interleave.
+    version = time.time_ns()
+    caches["shared"].set(DATA_VERSION_CACHE_KEY, version)
+    request = get_current_request()
+    if request is not None:
+        setattr(request, _REQUEST_DATA_VERSION_ATTR_NAME, version)
+
+
+def _make_snapshot(host_country_code: str, version: int) -> HostCountrySnapshot:
+    process_rulesets = list(
+        ProcessRuleSet.objects.using(settings.DEFAULT_DB_NAME)
+        .select_related("route__host_country")
+        .prefetch_related(
+            "processrulesetstep_set",
+            "nationalities",
+            "home_countries",
+        )
+        .filter(route__host_country__code=host_country_code)
+        .order_by("id")
+    )
+    id2step = _prefetch_process_steps_for_host_country_code(host_country_code)
+    for pr in process_rulesets:
+        for sr in pr.step_rulesets:
+            sr.process_step = id2step[sr.process_step_id]
+    return HostCountrySnapshot(
+        version=version,
+        host_country_code=host_country_code,
+        process_rulesets=tuple(process_rulesets),
+        process_steps=id2step,
+    )
+
+
+def _prefetch_process_steps_for_host_country_code(
+    country_code: str,
+) -> Dict[int, ProcessStep]:
+    """
+    Return available ProcessSteps with related objects prefetched.
+    """
+    steps = (
+        ProcessStep.objects.db_manager(settings.DEFAULT_DB_NAME)
+        .get_for_host_country_codes([country_code])
+        .select_related("host_country")
+        .prefetch_related(
+            "required_only_if_home_country",
+            "required_only_if_nationalities",
+        )
+    )
+    id2step = {s.id: s for s in steps}
+
+    # Get dependencies
+    id2depends_on_ids: Dict[int, List[int]] = defaultdict(list)
+    for from_id, to_id in (
+        ProcessStep.depends_on.through.objects.using(settings.DEFAULT_DB_NAME)
+        .filter(from_processstep__in=id2step)
+        .values_list("from_processstep_id", "to_processstep_id")
+    ):
+        id2depends_on_ids[from_id].append(to_id)
+
+    # Attach prefetched dependency steps, but only those that are relevant to
+    # this country. For example, the Entry step is global and thus may depend on
+    # steps in many countries, but we restrict to its dependencies that are
+    # steps available in the current country.
+    for step in steps:
+        step._prefetched_depends_on = [
+            id2step[id] for id in id2depends_on_ids[step.id] if id in id2step
+        ]
+
+    return id2step
@@ -0,0 +1,130 @@
+from datetime import date, timedelta
+
+from djmoney.money import Money
+
+from immigration import matching
+from immigration.models import Location, Move, ProcessRuleSet
+
+
+def test_match_nationalities(
+    greece,
+    brazil,
+    france,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    greece_eu_eea_swiss_national_registration_rule_set: ProcessRuleSet,
+):
+    article_17 = greece_local_hire_article_17_rule_set
+    eu_registration = greece_eu_eea_swiss_national_registration_rule_set
+
+    assert set(matching.match(Move(host_country=greece))) == {
+        article_17.id,
+        eu_registration.id,
+    }
+    assert matching.match(Move(host_country=greece, nationalities=[brazil])) == [
+        article_17.id
+    ]
+    assert matching.match(Move(host_country=greece, nationalities=[france])) == [
+        eu_registration.id
+    ]
+    assert set(
+        matching.match(Move(host_country=greece, nationalities=[brazil, france]))
+    ) == {article_17.id, eu_registration.id}
+
+
+def test_match_locations_duration_and_salary(
+    greece,
+    brazil,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    greece_technical_assignment_article_18_route_rule_set: ProcessRuleSet,
+):
+    article_17 = greece_local_hire_article_17_rule_set
+    article_18 = greece_technical_assignment_article_18_route_rule_set
+
+    def _match(**kwargs):
+        return set(
+            matching.match(Move(host_country=greece, nationalities=[brazil], **kwargs))
+        )
+
+    assert _match() == {article_17.id, article_18.id}
+    assert _match(contract_location=Location.HOST_COUNTRY) == {article_17.id}
+    assert _match(payroll_location=Location.HOME_COUNTRY) == {article_18.id}
+
+    # Article 18 has a maximum duration of 180 days.
+    entry_date = date(2021, 1, 1)
+    assert _match(
+        target_entry_date=entry_date,
+        target_exit_date=entry_date + timedelta(days=180),
+    ) == {article_17.id, article_18.id}
+    assert _match(
+        target_entry_date=entry_date,
+        target_exit_date=entry_date + timedelta(days=181),
+    ) == {article_17.id}
+
+    # Rules concerning an omitted salary are not applied, whatever the currency.
+    for currency in [Money(0).currency.code, "EUR"]:
+        article_17.minimum_salary = Money(60000, currency)
+        article_17.save()
+        assert _match() == {article_17.id, article_18.id}
+    move = Move(host_country=greece, nationalities=[brazil])
+    move.salary = Money(50000, "EUR")
+    assert matching.match(move) == [article_18.id]
+    move.salary = Money(70000, "EUR")
+    assert set(matching.match(move)) == {article_17.id, article_18.id}
+
+
+def test_matcher_is_invalidated_by_saves(
+    greece,
+    brazil,
+    france,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+):
+    move = Move(host_country=greece, nationalities=[france])
+    assert matching.match(move) == []
+    greece_local_hire_article_17_rule_set.nationalities.add(france)
+    assert matching.match(move) == [greece_local_hire_article_17_rule_set.id]
+
+
+def test_get_processes(
+    greece,
+    brazil,
+    france,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    greece_eu_eea_swiss_national_registration_rule_set: ProcessRuleSet,
+    greece_technical_assignment_article_18_route_rule_set: ProcessRuleSet,
+    greece_posted_worker_notification_step,
+    greece_tax_registration_step,
+    greece_eu_registration_certificate_step,
+    django_assert_num_queries,
+):
+    entry_date = date(2021, 1, 1)
+    moves = [
+        Move(
+            host_country=greece,
+            nationalities=[france],
+            payroll_location=payroll_location,
+            target_entry_date=entry_date,
+            target_exit_date=entry_date + timedelta(days=days),
+        )
+        for payroll_location, days in [
+            (Location.HOME_COUNTRY, 30),
+            (Location.HOST_COUNTRY, 90),
+        ]
+    ]
+    [[process_1], [process_2]] = matching.get_processes(moves)
+    route = greece_eu_eea_swiss_national_registration_rule_set.route
+    assert process_1.route == process_2.route == route
+    assert process_1.steps == [greece_posted_worker_notification_step]
+    assert process_2.steps == [
+        greece_tax_registration_step,
+        greece_eu_registration_certificate_step,
+    ]
+
+    # Once compiled, any number of moves are evaluated without queries.
+    moves = [Move(host_country=greece, nationalities=[brazil])] * 1000
+    with django_assert_num_queries(0):
+        processes = matching.get_processes(moves)
+        assert [len(p) for p in processes] == [2] * 1000
+        assert {p.route.processruleset.id for p in processes[0]} == {
+            greece_local_hire_article_17_rule_set.id,
+            greece_technical_assignment_article_18_route_rule_set.id,
+        }
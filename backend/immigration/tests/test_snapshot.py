@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django_tools.middlewares.ThreadLocal import ThreadLocalMiddleware
+
+from immigration import snapshot
+from immigration.api import models as api_models
+from immigration.models import ProcessRuleSet
+
+
+def test_snapshot_is_reused_until_data_changes(
+    greece,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    greece_visa_type_D_application_step,
+    django_assert_num_queries,
+):
+    first = snapshot.get_snapshot(greece.code)
+    assert first.get_process_rulesets() == [greece_local_hire_article_17_rule_set]
+    assert snapshot.get_host_country_code(greece_local_hire_article_17_rule_set.id)
+
+    with django_assert_num_queries(0):
+        assert snapshot.get_snapshot(greece.code) is first
+        orm_process_ruleset = api_models.ProcessRuleSet.get_orm_model(
+            id=greece_local_hire_article_17_rule_set.id
+        )
+        api_models.ProcessRuleSet.from_orm(orm_process_ruleset).dict()
+        api_models.ProcessStepList.from_orm(
+            api_models.ProcessStepList.get_orm_models(greece.code)
+        ).dict()
+
+    greece_visa_type_D_application_step.estimated_max_duration_days = 60
+    greece_visa_type_D_application_step.save()
+    second = snapshot.get_snapshot(greece.code)
+    assert second is not first
+    assert second.version > first.version
+    assert (
+        second.process_steps[
+            greece_visa_type_D_application_step.id
+        ].estimated_max_duration_days
+        == 60
+    )
+
+
+def test_bloc_decomposer_is_reused_until_blocs_change(
+    load_country_fixture, brazil_bloc, france, django_assert_num_queries
+):
+    brazil = brazil_bloc.countries.get()
+    decomposer = snapshot.get_bloc_decomposer()
+    assert decomposer.decompose([brazil.code]) == "Brazil Bloc"
+
+    with django_assert_num_queries(0):
+        assert snapshot.get_bloc_decomposer() is decomposer
+
+    brazil_bloc.countries.add(france)
+    decomposer = snapshot.get_bloc_decomposer()
+    assert decomposer.decompose([brazil.code, france.code]) == "Brazil Bloc"
+    assert decomposer.decompose([brazil.code]) == "Brazil Bloc - 1"
+
+
+def test_data_version_does_not_expire():
+    assert caches["shared"].default_timeout is None
+
+
+def test_snapshots_are_held_only_for_countries(greece, django_assert_num_queries):
+    snapshot.get_snapshot(greece.code)
+    with django_assert_num_queries(0):
+        snapshot.get_snapshot(greece.code)
+
+    assert snapshot.get_snapshot("XX").get_process_rulesets() == []
+    assert "XX" not in snapshot._snapshots
+
+
+def test_data_version_is_read_once_per_request():
+    middleware = ThreadLocalMiddleware(lambda request: HttpResponse())
+    request = RequestFactory().get("/")
+    cache = caches["shared"]
+    middleware.process_request(request)
+    try:
+        with patch.object(cache, "get", wraps=cache.get) as get:
+            version = snapshot.get_data_version()
+            assert snapshot.get_data_version() == version
+            get.assert_called_once()
+            # A change made by the request is seen by it.
+            snapshot.bump_data_version()
+            assert snapshot.get_data_version() > version
+            get.assert_called_once()
+    finally:
+        middleware.process_exception(request, None)
@@ -8,8 +8,6 @@ from django.http import (
 )
 from django.views import View
 
-from owldock.dev.db_utils import print_query_counts
-
 
 class BaseView(View):
     if settings.DEV:
@@ -21,11 +19,4 @@ class BaseView(View):
                 and request.body
             ):
                 print(json.dumps(json.loads(request.body), indent=2, sort_keys=True))
-            with print_query_counts():
-                return super().dispatch(request, *args, **kwargs)
-
-    else:
-
-        def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
-            with print_query_counts():
-                return super().dispatch(request, *args, **kwargs)
+            return super().dispatch(request, *args, **kwargs)
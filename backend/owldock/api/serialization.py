@@ -0,0 +1,137 @@
+"""
+Fast serialization of ORM objects using the pydantic API model definitions.
+
+`serialize(ApiModel, obj)` returns the same data as `ApiModel.from_orm(obj).dict()`
+(for a model with a custom root type, the same data as
+`ApiModel.from_orm(obj).dict()["__root__"]`). It is faster because
+
+- the serializer for each API model is compiled once, from the pydantic field
+  definitions, into a flat list of per-field converters;
+- values read from our own database are trusted: a value whose type is exactly
+  the field type is used as-is, without pydantic validation or the construction
+  of intermediate pydantic model instances.
+
+Values of any other type are passed to pydantic field validation, so the output
+is the same as pydantic's.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from uuid import UUID
+
+import pydantic
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON, ModelField
+
+from owldock.instrumentation import timed
+
+Converter = Callable[[Any], Any]
+
+_MISSING = object()
+
+# Field types, and the exact types of values for them that are used as-is.
+# (Subclasses precede their base classes.)
+_TRUSTED_TYPES = {
+    bool: {bool},
+    datetime: {datetime},
+    date: {date},
+    Decimal: {Decimal},
+    float: {float},
+    int: {int},
+    str: {str},
+    UUID: {UUID},
+}
+
+
+def serialize(model_class: Type[pydantic.BaseModel], obj: Any) -> Any:
+    """
+    Serialize `obj` (an ORM object, or list of ORM objects) as `model_class`.
+    """
+    with timed("serialize"):
+        return _get_model_converter(model_class)(obj)
+
+
+@lru_cache(maxsize=None)
+def _get_model_converter(model_class: Type[pydantic.BaseModel]) -> Converter:
+    if model_class.__custom_root_type__:
+        return _make_field_converter(model_class.__fields__["__root__"])
+
+    getter_dict = model_class.__config__.getter_dict
+    # Compiled on first use, since the converters of nested models may refer
+    # back to this one.
+    fields: Optional[List[Tuple[str, ModelField, Converter]]] = None
+
+    def convert(value: Any) -> Dict[str, Any]:
+        nonlocal fields
+        if fields is None:
+            fields = [
+                (name, field, _make_field_converter(field))
+                for name, field in model_class.__fields__.items()
+            ]
+        if isinstance(value, pydantic.BaseModel):
+            return value.dict()
+        get = value.get if isinstance(value, dict) else getter_dict(value).get
+        data = {}
+        for name, field, convert_field in fields:
+            field_value = get(field.alias, _MISSING)
+            if field_value is _MISSING:
+                if field.required:
+                    # Let pydantic raise the validation error
+                    model_class.validate(value)
+                data[name] = field.get_default()
+            else:
+                data[name] = convert_field(field_value)
+        return data
+
+    return convert
+
+
+def _make_field_converter(field: ModelField) -> Converter:
+    if field.shape == SHAPE_SINGLETON:
+        if isinstance(field.type_, type) and issubclass(
+            field.type_, pydantic.BaseModel
+        ):
+            return _allow_none(_get_model_converter(field.type_))
+        else:
+            return _make_scalar_converter(field)
+    elif field.shape == SHAPE_LIST:
+        [sub_field] = field.sub_fields
+        convert_item = _make_field_converter(sub_field)
+
+        def convert_list(value: Any) -> Any:
+            if hasattr(value, "all"):
+                # A Django manager or QuerySet (see DjangoOrmGetterDict)
+                value = value.all()
+            return [convert_item(v) for v in value]
+
+        return _allow_none(convert_list)
+    else:
+        raise TypeError(f"Field shape is not supported: {field}")
+
+
+def _make_scalar_converter(field: ModelField) -> Converter:
+    trusted_types = next(
+        (
+            types
+            for type_, types in _TRUSTED_TYPES.items()
+            if isinstance(field.type_, type) and issubclass(field.type_, type_)
+        ),
+        set(),
+    )
+
+    def convert(value: Any) -> Any:
+        if value is None or type(value) in trusted_types:
+            return value
+        value, errors = field.validate(value, {}, loc=field.alias)
+        if errors:
+            raise pydantic.ValidationError([errors], pydantic.BaseModel)
+        return value
+
+    return convert
+
+
+def _allow_none(convert: Converter) -> Converter:
+    def convert_or_none(value: Any) -> Any:
+        return None if value is None else convert(value)
+
+    return convert_or_none
@@ -0,0 +1,98 @@
+"""
+Health checks and churn metrics for persistent database connections.
+
+Django closes persistent connections that are older than CONN_MAX_AGE, but
+(before Django 4.1) does not check that a connection it reuses is still usable:
+a connection broken while idle, e.g. by a database restart, fails the first
+query of the next request. Here, as in Django 4.1, a connection to a database
+with CONN_HEALTH_CHECKS that was open when a request started is checked when
+the request first uses it, and closed if it is unusable, so that a new one is
+opened. A request makes no health check of a connection that it does not use.
+"""
+from collections import Counter
+from functools import wraps
+from typing import Dict
+
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_HEALTH_CHECK_PENDING_ATTR_NAME = "_owldock_health_check_pending"
+_HEALTH_CHECK_INSTALLED_ATTR_NAME = "_owldock_health_check_installed"
+
+# Connection events, by (database alias, event): "opened" when a connection is
+# opened, "reused" when a request first uses a usable connection opened before
+# it started, and "unusable" when that connection is unusable.
+_connection_events: Counter = Counter()
+
+
+def get_connection_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Return the number of connection events, by database alias and event.
+
+    A high ratio of "opened" to "reused" means that connections are not
+    persisting (see settings.DATABASE_CONN_MAX_AGE).
+    """
+    stats: Dict[str, Dict[str, int]] = {}
+    for (alias, event), count in _connection_events.items():
+        stats.setdefault(alias, {"opened": 0, "reused": 0, "unusable": 0})[
+            event
+        ] = count
+    return stats
+
+
+@receiver(connection_created)
+def count_connection_opened(sender, connection, **kwargs):
+    _connection_events[connection.alias, "opened"] += 1
+    setattr(connection, _HEALTH_CHECK_PENDING_ATTR_NAME, False)
+    if not getattr(connection, _HEALTH_CHECK_INSTALLED_ATTR_NAME, False):
+        _install_health_check(connection)
+
+
+@receiver(request_started)
+def schedule_health_checks(sender, **kwargs):
+    for connection in connections.all():
+        # A connection in a transaction at the start of a request is in use
+        # (e.g. by a test) and is left alone.
+        if connection.connection is not None and not connection.in_atomic_block:
+            setattr(connection, _HEALTH_CHECK_PENDING_ATTR_NAME, True)
+
+
+def _install_health_check(connection: BaseDatabaseWrapper) -> None:
+    """
+    Make the connection wrapper check its connection, if a check is pending,
+    before it is next used to execute a query or to begin a transaction.
+
+    Not ensure_connection(): Django calls that at the end of every request, to
+    read the autocommit setting of each open connection (see
+    django.db.close_old_connections).
+    """
+    for method_name in ["_cursor", "set_autocommit"]:
+        method = getattr(connection, method_name)
+        setattr(connection, method_name, _with_health_check(connection, method))
+    setattr(connection, _HEALTH_CHECK_INSTALLED_ATTR_NAME, True)
+
+
+def _with_health_check(connection: BaseDatabaseWrapper, method):
+    @wraps(method)
+    def method_with_health_check(*args, **kwargs):
+        if getattr(connection, _HEALTH_CHECK_PENDING_ATTR_NAME, False):
+            setattr(connection, _HEALTH_CHECK_PENDING_ATTR_NAME, False)
+            _check_connection(connection)
+        return method(*args, **kwargs)
+
+    return method_with_health_check
+
+
+def _check_connection(connection: BaseDatabaseWrapper) -> None:
+    if connection.connection is None or connection.in_atomic_block:
+        return
+    if connection.settings_dict.get("CONN_HEALTH_CHECKS") and not (
+        connection.is_usable()
+    ):
+        _connection_events[connection.alias, "unusable"] += 1
+        connection.close()
+    else:
+        _connection_events[connection.alias, "reused"] += 1
@@ -1,46 +1,225 @@
-from typing import Type
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Type
+from uuid import UUID
 
 from django.apps import apps
 from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
 from django.db.models import Model
+from django.http import HttpRequest
+from django_tools.middlewares.ThreadLocal import get_current_request
+
+logger = logging.getLogger(__file__)
+
+_REQUEST_CLIENT_DB_ATTR_NAME = "_owldock_client_db"
+_REQUEST_DEFAULT_DB_REPLICA_ATTR_NAME = "_owldock_default_db_replica"
+_REQUEST_HAS_WRITTEN_ATTR_NAME = "_owldock_has_written_to_default_db"
+
+# Models of these apps are always read from the primary default database.
+# Sessions are read in the request after the one that wrote them (e.g. login),
+# and must not be subject to replication lag.
+_PRIMARY_ONLY_APP_LABELS = {"sessions"}
+# Likewise these models. A ClientDatabase is read (by get_client_db()) in the
+# request after the one that created its Client.
+_PRIMARY_ONLY_MODEL_LABELS = {"app.ClientDatabase"}
+
+_client_db: ContextVar[Optional[str]] = ContextVar("client_db", default=None)
 
 
 def is_client_model(model: Type[Model]) -> bool:
     return model._meta.app_label == settings.CLIENT_DB_NAME
 
 
-class Router:
-    def _route(self, model: Type[Model], **_) -> str:
-        return (
-            settings.CLIENT_DB_NAME
-            if is_client_model(model)
-            else settings.DEFAULT_DB_NAME
+def is_client_db(db: str) -> bool:
+    return db in settings.CLIENT_DB_NAMES
+
+
+def get_client_db_names() -> List[str]:
+    return settings.CLIENT_DB_NAMES
+
+
+def get_current_client_db() -> str:
+    """
+    Return the client database used for client models.
+
+    This is the database of the innermost `using_client_db()` block, if any;
+    otherwise that set for the current request by `set_request_client_db()`;
+    otherwise settings.CLIENT_DB_NAME.
+    """
+    db = _client_db.get()
+    if db is None:
+        request = get_current_request()
+        db = getattr(request, _REQUEST_CLIENT_DB_ATTR_NAME, None)
+    return db or settings.CLIENT_DB_NAME
+
+
+@contextmanager
+def using_client_db(db: str) -> Iterator[None]:
+    """
+    Route queries of client models to client database `db` within this block.
+    """
+    assert is_client_db(db), f"{db} is not a client database"
+    token = _client_db.set(db)
+    try:
+        yield
+    finally:
+        _client_db.reset(token)
+
+
+def set_request_client_db(request: HttpRequest, db: str) -> None:
+    """
+    Route queries of client models made while handling `request` to client
+    database `db`.
+    """
+    assert is_client_db(db), f"{db} is not a client database"
+    setattr(request, _REQUEST_CLIENT_DB_ATTR_NAME, db)
+
+
+def get_client_db(client_uuid: UUID) -> str:
+    """
+    Return the client database holding the data of the Client `client_uuid`,
+    according to its ClientDatabase.
+    """
+    from app.models import ClientDatabase
+
+    db = (
+        ClientDatabase.objects.filter(client_uuid=client_uuid)
+        .values_list("database", flat=True)
+        .first()
+    )
+    if db is None:
+        logger.error("Client %s has no ClientDatabase", client_uuid)
+        return settings.CLIENT_DB_NAME
+    return db
+
+
+def find_client_db(model: Type[Model], uuid: UUID, client_uuid_lookup: str) -> str:
+    """
+    Return the client database holding the instance `uuid` of client model
+    `model`.
+
+    The UUID of the instance's client (its `client_uuid_lookup` field) is found
+    by querying each client database, once per process; the database is then
+    looked up by get_client_db(). If there is no such instance, the current
+    client database is returned.
+    """
+    if len(settings.CLIENT_DB_NAMES) == 1:
+        return get_current_client_db()
+    cache = caches["default"]
+    cache_key = f"owldock:client_uuid:{model._meta.label}:{uuid}"
+    client_uuid = cache.get(cache_key)
+    if client_uuid is None:
+        for db in settings.CLIENT_DB_NAMES:
+            client_uuid = (
+                model.objects.using(db)  # type: ignore
+                .filter(uuid=uuid)
+                .values_list(client_uuid_lookup, flat=True)
+                .first()
+            )
+            if client_uuid is not None:
+                break
+        else:
+            return get_current_client_db()
+        # An instance never changes client, although a client may change database.
+        cache.set(cache_key, client_uuid, None)
+    return get_client_db(client_uuid)
+
+
+def get_default_db_for_read() -> str:
+    """
+    Return the database from which default database models are read.
+
+    During a request, this is a read replica of the default database, if any
+    are configured (settings.DEFAULT_DB_REPLICA_NAMES), chosen once per request.
+    However, once the request has written to the default database, it reads
+    from the default database for the rest of the request, so that it sees its
+    own writes. Outside a request, and in a transaction on the default database,
+    this is always the default database.
+    """
+    request = get_current_request()
+    if (
+        not settings.DEFAULT_DB_REPLICA_NAMES
+        or request is None
+        or getattr(request, _REQUEST_HAS_WRITTEN_ATTR_NAME, False)
+        or connections[settings.DEFAULT_DB_NAME].in_atomic_block
+    ):
+        return settings.DEFAULT_DB_NAME
+    if not hasattr(request, _REQUEST_DEFAULT_DB_REPLICA_ATTR_NAME):
+        setattr(
+            request,
+            _REQUEST_DEFAULT_DB_REPLICA_ATTR_NAME,
+            random.choice(settings.DEFAULT_DB_REPLICA_NAMES),
         )
+    return getattr(request, _REQUEST_DEFAULT_DB_REPLICA_ATTR_NAME)
+
 
-    db_for_read = _route
-    db_for_write = _route
+def _pin_to_default_db() -> None:
+    request = get_current_request()
+    if request is not None:
+        setattr(request, _REQUEST_HAS_WRITTEN_ATTR_NAME, True)
+
+
+class Router:
+    def _route_client_model(self, model: Type[Model], **hints) -> str:
+        # An instance is saved to, and its related objects are fetched from, the
+        # client database that it was fetched from.
+        instance = hints.get("instance")
+        if instance is not None and is_client_db(instance._state.db or ""):
+            return instance._state.db
+        return get_current_client_db()
+
+    def db_for_read(self, model: Type[Model], **hints) -> str:
+        if is_client_model(model):
+            return self._route_client_model(model, **hints)
+        elif (
+            model._meta.app_label in _PRIMARY_ONLY_APP_LABELS
+            or model._meta.label in _PRIMARY_ONLY_MODEL_LABELS
+        ):
+            return settings.DEFAULT_DB_NAME
+        else:
+            # Related objects of an instance read from the primary (e.g. when
+            # prefetching for a snapshot; see immigration.snapshot) are read
+            # from the primary.
+            instance = hints.get("instance")
+            if instance is not None and instance._state.db == settings.DEFAULT_DB_NAME:
+                return settings.DEFAULT_DB_NAME
+            return get_default_db_for_read()
+
+    def db_for_write(self, model: Type[Model], **hints) -> str:
+        if is_client_model(model):
+            return self._route_client_model(model, **hints)
+        else:
+            _pin_to_default_db()
+            return settings.DEFAULT_DB_NAME
 
     def allow_relation(self, obj1: Model, obj2: Model, **_) -> bool:
         """
         A relationship between two tables is allowed only if the two tables are
         in the same database.
+
+        Replicas of the default database count as the default database.
         """
-        # TODO: Isn't this the behavior that Django gives by default?
-        return (
-            self.db_for_read(type(obj1))
-            == self.db_for_write(type(obj1))
-            == self.db_for_read(type(obj2))
-            == self.db_for_write(type(obj2))
-        )
+        return self._get_primary_db(obj1) == self._get_primary_db(obj2)
+
+    def _get_primary_db(self, obj: Model) -> str:
+        if is_client_model(type(obj)):
+            return self._route_client_model(type(obj), instance=obj)
+        else:
+            return settings.DEFAULT_DB_NAME
 
     def allow_migrate(self, db: str, app_label: str, **_) -> bool:
         """
         A migration operation may execute iff either of the following are true:
-        - It's migrating a client model in the client db
+        - It's migrating a client model in a client db
         - It's migrating a non-client model in the default db
         """
-        assert set(settings.DATABASES) == {"client", "default"}
         assert db in settings.DATABASES
         assert app_label in {m._meta.app_label for m in apps.get_models()}
 
-        return (app_label == "client") == (db == "client")
+        if db in settings.DEFAULT_DB_REPLICA_NAMES:
+            return False
+        return (app_label == "client") == is_client_db(db)
@@ -3,12 +3,15 @@ import re
 import sys
 import sqlparse
 from contextlib import contextmanager, ExitStack
+from typing import Dict
 
 from django.db import connections, router
 from django.db.models import QuerySet
 from django.db.models.deletion import Collector
 from django.test.utils import CaptureQueriesContext
 
+from owldock.database_connections import get_connection_stats
+
 
 @contextmanager
 def assert_max_queries(expected: int):
@@ -43,9 +46,11 @@ def _print_query_info(counts_only):
             cxn.alias: stack.enter_context(CaptureQueriesContext(cxn))  # type: ignore
             for cxn in connections.all()
         }
+        stats0 = get_connection_stats()
         t0 = datetime.now()
         yield
         t1 = datetime.now()
+        stats1 = get_connection_stats()
 
         print("Query counts:" if counts_only else "Queries:")
         for alias, capturer in capturers.items():
@@ -55,10 +60,18 @@ def _print_query_info(counts_only):
                     print(sqlparse.format(sql, reindent=True))
                     print(query["time"])
                     print()
-            print(f"    {alias}: {len(capturer.captured_queries)}")
+            n_opened = _n_opened(stats1, alias) - _n_opened(stats0, alias)
+            print(
+                f"    {alias}: {len(capturer.captured_queries)}"
+                + (f" ({n_opened} connections opened)" if n_opened else "")
+            )
         print(f"Time: {(t1 - t0).total_seconds():.2f}")
 
 
+def _n_opened(connection_stats: Dict[str, Dict[str, int]], alias: str) -> int:
+    return connection_stats.get(alias, {}).get("opened", 0)
+
+
 def objects_to_be_deleted(queryset: QuerySet):
     collector = Collector(using=router.db_for_write(queryset.model))
     collector.collect(queryset)
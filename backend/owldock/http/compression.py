@@ -0,0 +1,75 @@
+"""
+Brotli and gzip compression of HTTP response content.
+"""
+import gzip
+import zlib
+from typing import Dict, Iterable, Iterator, Optional
+
+import brotli
+from django.http import HttpRequest
+
+# In order of preference
+ENCODINGS = ["br", "gzip"]
+
+# Content smaller than this is not worth compressing.
+MIN_SIZE = 1024
+
+# Content compressed for every response is compressed quickly; content
+# compressed once and cached is compressed well.
+_BROTLI_QUALITY = {False: 4, True: 9}
+_GZIP_LEVEL = {False: 6, True: 9}
+
+
+def get_accepted_encoding(request: HttpRequest) -> Optional[str]:
+    """
+    Return the preferred encoding accepted by the client, if any.
+    """
+    qualities: Dict[str, float] = {}
+    for coding in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        name, _, params = coding.partition(";")
+        quality = 1.0
+        param_name, _, value = params.partition("=")
+        if param_name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+    for encoding in ENCODINGS:
+        if qualities.get(encoding, qualities.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(content: bytes, encoding: str, cached: bool = False) -> bytes:
+    """
+    Compress `content` using `encoding`.
+
+    If `cached` is True, compression is slower and better, since the compressed
+    content is to be reused.
+    """
+    if encoding == "br":
+        return brotli.compress(content, quality=_BROTLI_QUALITY[cached])
+    elif encoding == "gzip":
+        return gzip.compress(content, compresslevel=_GZIP_LEVEL[cached], mtime=0)
+    else:
+        raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def compress_sequence(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """
+    Compress the concatenation of `chunks` using `encoding`, a chunk at a time.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=_BROTLI_QUALITY[False])
+        process, finish = compressor.process, compressor.finish
+    elif encoding == "gzip":
+        compressobj = zlib.compressobj(_GZIP_LEVEL[False], zlib.DEFLATED, 16 + 15)
+        process, finish = compressobj.compress, compressobj.flush
+    else:
+        raise ValueError(f"Unsupported encoding: {encoding}")
+    for chunk in chunks:
+        compressed = process(chunk)
+        if compressed:
+            yield compressed
+    yield finish()
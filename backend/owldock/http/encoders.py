@@ -0,0 +1,87 @@
+"""
+JSON encoders for owldock HTTP responses.
+
+settings.OWLDOCK_JSON_ENCODER selects the encoder:
+
+- "stdlib": the json module with DjangoJSONEncoder. This is the fallback; its
+  output is byte-identical to that of Django's JsonResponse.
+- "orjson": orjson, if it is installed; otherwise "stdlib" is used. The output
+  is compact (no whitespace) but otherwise the same: date, time, datetime,
+  Decimal and UUID values are serialized as DjangoJSONEncoder serializes them.
+
+Both encoders serialize Money as its amount, as DjangoOrmGetterDict does.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from djmoney.money import Money
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OwldockJSONEncoder(DjangoJSONEncoder):
+    def default(self, o: Any) -> Any:
+        if isinstance(o, Money):
+            return super().default(o.amount)
+        return super().default(o)
+
+
+class JsonEncoder(ABC):
+    name: str
+    # The separators used by dumps()
+    item_separator: bytes
+    key_separator: bytes
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        pass
+
+
+class StdlibEncoder(JsonEncoder):
+    name = "stdlib"
+    item_separator = b", "
+    key_separator = b": "
+
+    def __init__(self):
+        self._encoder = OwldockJSONEncoder()
+
+    def dumps(self, value: Any) -> bytes:
+        return self._encoder.encode(value).encode()
+
+
+class OrjsonEncoder(JsonEncoder):
+    name = "orjson"
+    item_separator = b","
+    key_separator = b":"
+
+    def __init__(self):
+        assert orjson, "orjson is not installed"
+        self._default = OwldockJSONEncoder().default
+        # Datetimes are passed to the default function in order that they are
+        # formatted as DjangoJSONEncoder formats them.
+        self._option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=self._default, option=self._option)
+
+
+_ENCODER_CLASSES = {cls.name: cls for cls in [StdlibEncoder, OrjsonEncoder]}
+_encoders: Dict[str, JsonEncoder] = {}
+
+
+def get_encoder(name: Optional[str] = None) -> JsonEncoder:
+    """
+    Return the JSON encoder selected by settings (or named `name`).
+    """
+    if name is None:
+        name = getattr(settings, "OWLDOCK_JSON_ENCODER", StdlibEncoder.name)
+    if name == OrjsonEncoder.name and not orjson:
+        name = StdlibEncoder.name
+    if name not in _encoders:
+        _encoders[name] = _ENCODER_CLASSES[name]()
+    return _encoders[name]
@@ -1,10 +1,41 @@
-from typing import List
+import hashlib
+import logging
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Iterator, List, Optional
 
-from django.http import JsonResponse
+from django.core.cache import cache
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.utils.cache import get_conditional_response, patch_vary_headers
 from django_tools.middlewares.ThreadLocal import get_current_request
 
+from owldock.http.compression import (
+    ENCODINGS,
+    MIN_SIZE,
+    compress,
+    get_accepted_encoding,
+)
+from owldock.http.encoders import JsonEncoder, get_encoder
+from owldock.instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
 _ERROR_MESSAGES_ATTR_NAME = "_error_messages_to_be_sent_with_response"
 _NON_ERROR_MESSAGES_ATTR_NAME = "_non_error_messages_to_be_sent_with_response"
+# Sent, as an error, at the end of a streamed response whose data could not be
+# generated in full.
+STREAMING_ERROR = "The response data is incomplete: an error occurred while sending it"
+
+# The request whose streaming response is being generated. Streaming content is
+# generated after the response has left the middleware, by which time the
+# current request (get_current_request()) has been unset.
+_streaming_request: ContextVar[Optional[HttpRequest]] = ContextVar(
+    "streaming_request", default=None
+)
 
 
 def add_error(error: str) -> None:
@@ -15,8 +46,12 @@ def add_message(message: str) -> None:
     _extend_messages(_NON_ERROR_MESSAGES_ATTR_NAME, [message])
 
 
+def _get_request() -> Optional[HttpRequest]:
+    return _streaming_request.get() or get_current_request()
+
+
 def _extend_messages(attr_name: str, messages: List[str]) -> None:
-    request = get_current_request()
+    request = _get_request()
     if not request:
         # During tests etc
         return
@@ -26,7 +61,7 @@ def _extend_messages(attr_name: str, messages: List[str]) -> None:
 
 
 def _get_messages(attr_name: str) -> List[str]:
-    request = get_current_request()
+    request = _get_request()
     return getattr(request, attr_name, [])
 
 
@@ -47,4 +82,218 @@ class OwldockJsonResponse(JsonResponse):
             "errors": errors,
             "messages": messages,
         }
-        super().__init__(payload, **kwargs)
+        kwargs.setdefault("content_type", "application/json")
+        with timed("encode"):
+            content = get_encoder().dumps(payload)
+        # Bypass JsonResponse.__init__, in order to use the configured encoder.
+        super(JsonResponse, self).__init__(content=content, **kwargs)
+
+
+class OwldockStreamingJsonResponse(StreamingHttpResponse):
+    """
+    An OwldockJsonResponse whose content is serialized as it is sent.
+
+    Any list in `data` may be given as an iterator (e.g. a generator yielding
+    one serialized row at a time); its items are serialized as the iterator
+    yields them, so the payload is never held in memory in full. Errors and
+    messages are sent after the data, so they include those added while the
+    data was generated. The content is the same as that of an
+    OwldockJsonResponse with the same data.
+
+    The status and headers have been sent by the time the data is generated,
+    so an exception raised while generating an item of a list (or encoding it)
+    is logged, and the list ends early, followed by STREAMING_ERROR in the
+    errors. Data should therefore be fetched before the response is returned:
+    only its encoding should be streamed.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, data, errors=None, messages=None, **kwargs):
+        _extend_messages(_ERROR_MESSAGES_ATTR_NAME, errors or [])
+        _extend_messages(_NON_ERROR_MESSAGES_ATTR_NAME, messages or [])
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(
+            _generate_with_request(_get_request(), self._generate_content(data)),
+            **kwargs,
+        )
+
+    def _generate_content(self, data: Any) -> Iterator[bytes]:
+        encoder = get_encoder()
+        buffer: List[bytes] = []
+        size = 0
+        for chunk in _iter_json(
+            {
+                "data": data,
+                # Evaluated after the data has been generated.
+                "errors": _iter_lazy(_get_messages, _ERROR_MESSAGES_ATTR_NAME),
+                "messages": _iter_lazy(_get_messages, _NON_ERROR_MESSAGES_ATTR_NAME),
+            },
+            encoder,
+        ):
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= self.chunk_size:
+                yield b"".join(buffer)
+                buffer, size = [], 0
+        yield b"".join(buffer)
+
+
+def _iter_json(value: Any, encoder: JsonEncoder) -> Iterator[bytes]:
+    """
+    Yield the JSON serialization of `value` in pieces, consuming iterators lazily.
+
+    The concatenated pieces are the same as `encoder.dumps(value)`, with
+    iterators serialized as lists, and _EncodedJson values as the JSON they hold.
+    An iterator's items are each serialized in full before any of it is yielded,
+    so that a list that fails is ended after its last complete item (see
+    OwldockStreamingJsonResponse).
+    """
+    if isinstance(value, _EncodedJson):
+        yield value.json
+    elif isinstance(value, Iterator):
+        yield b"["
+        for i, item_json in enumerate(_iter_json_items(value, encoder)):
+            if i:
+                yield encoder.item_separator
+            yield item_json
+        yield b"]"
+    elif isinstance(value, dict) and all(isinstance(k, str) for k in value):
+        yield b"{"
+        for i, (key, item) in enumerate(value.items()):
+            if i:
+                yield encoder.item_separator
+            yield encoder.dumps(key)
+            yield encoder.key_separator
+            yield from _iter_json(item, encoder)
+        yield b"}"
+    else:
+        yield encoder.dumps(value)
+
+
+def _iter_json_items(items: Iterator[Any], encoder: JsonEncoder) -> Iterator[bytes]:
+    """
+    Yield the JSON serialization of each item, ending early, with an error, if an
+    item cannot be generated or serialized.
+    """
+    while True:
+        try:
+            item = next(items)
+            item_json = b"".join(_iter_json(item, encoder))
+        except StopIteration:
+            return
+        except Exception:
+            logger.exception("Error generating streamed JSON")
+            add_error(STREAMING_ERROR)
+            return
+        yield item_json
+
+
+class _EncodedJson:
+    """
+    A value that has already been serialized as JSON.
+    """
+
+    def __init__(self, json: bytes):
+        self.json = json
+
+
+def _iter_lazy(get_items: Callable[..., Iterable[Any]], *args: Any) -> Iterator[Any]:
+    yield from get_items(*args)
+
+
+def _generate_with_request(
+    request: Optional[HttpRequest], chunks: Iterator[bytes]
+) -> Iterator[bytes]:
+    """
+    Generate the chunks with `request` as the request whose messages are sent
+    with the response (see _streaming_request).
+    """
+    while True:
+        token = _streaming_request.set(request)
+        try:
+            with timed("encode"):
+                chunk = next(chunks, None)
+        finally:
+            _streaming_request.reset(token)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def cached_json_response(
+    request: HttpRequest, key: str, get_data: Callable[[], Any]
+) -> HttpResponse:
+    """
+    Return an OwldockJsonResponse for data that is cached as JSON.
+
+    The cache key must identify the version of the data (`get_data()` is called
+    only when there is no cached JSON for the key). The response has a strong
+    ETag, and is 304 Not Modified if the client already has the data, unless
+    there are messages to be sent with the response.
+
+    The response content without messages is also cached compressed, and sent
+    compressed if the client accepts it; the ETag is then weak.
+    """
+    encoder = get_encoder()
+    key = f"{key}:{encoder.name}"
+    entry = cache.get(key)
+    if entry is None:
+        data = get_data()
+        with timed("encode"):
+            data_json = encoder.dumps(data)
+        etag = f'"{hashlib.sha1(data_json).hexdigest()}"'
+        content = _make_envelope(data_json, [], [], encoder)
+        encoding2content = (
+            {e: compress(content, e, cached=True) for e in ENCODINGS}
+            if len(content) >= MIN_SIZE
+            else {}
+        )
+        entry = (etag, data_json, encoding2content)
+        cache.set(key, entry, timeout=None)
+    etag, data_json, encoding2content = entry
+
+    errors = _get_messages(_ERROR_MESSAGES_ATTR_NAME)
+    messages = _get_messages(_NON_ERROR_MESSAGES_ATTR_NAME)
+    if errors or messages:
+        return HttpResponse(
+            _make_envelope(data_json, errors, messages, encoder),
+            content_type="application/json",
+        )
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        not_modified["ETag"] = etag
+        return not_modified
+    encoding = get_accepted_encoding(request)
+    if encoding in encoding2content:
+        response = HttpResponse(
+            encoding2content[encoding], content_type="application/json"
+        )
+        response["Content-Encoding"] = encoding
+        response["ETag"] = f"W/{etag}"
+        patch_vary_headers(response, ("Accept-Encoding",))
+    else:
+        response = HttpResponse(
+            _make_envelope(data_json, [], [], encoder), content_type="application/json"
+        )
+        response["ETag"] = etag
+    return response
+
+
+def _make_envelope(
+    data_json: bytes, errors: List[str], messages: List[str], encoder: JsonEncoder
+) -> bytes:
+    """
+    Return the serialization of the OwldockJsonResponse payload.
+    """
+    return b"".join(
+        _iter_json(
+            {
+                "data": _EncodedJson(data_json),
+                "errors": errors,
+                "messages": messages,
+            },
+            encoder,
+        )
+    )
@@ -0,0 +1,290 @@
+"""
+Low-overhead instrumentation of requests.
+
+For each request, the queries made and the time spent in them are recorded per
+database, along with the time spent serializing ORM objects (see
+owldock.api.serialization) and encoding JSON (see owldock.http.json). Times are
+exclusive: a query made while serializing counts as query time, not
+serialization time. When the response has been sent (including streamed
+content), these are logged as the structured fields of one log record, and
+observed in histograms (see get_metrics()).
+
+Queries are recorded by a database execute wrapper, so this requires neither
+debug cursors nor retention of SQL. The SQL of each query is captured, and
+logged, only for a sample of requests (settings.OWLDOCK_SQL_CAPTURE_SAMPLE_RATE).
+"""
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from owldock.database_connections import get_connection_stats
+from owldock.query_budgets import (
+    QueryBudgetExceeded,
+    get_budget_violations,
+    get_call_site,
+    get_query_budget,
+    get_query_shape,
+)
+
+logger = logging.getLogger(__file__)
+
+# Histogram bucket upper bounds: seconds, and numbers of queries.
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_local = threading.local()
+
+
+class RequestMetrics:
+    """
+    The queries made, and the time spent, while handling a request.
+    """
+
+    def __init__(self, capture_sql: bool = False, check_query_budget: bool = False):
+        self.started_at = time.perf_counter()
+        self.query_counts: Counter = Counter()
+        # The number of queries of each shape, and the call site of the first
+        # repetition of each, if the request is to be checked against its query
+        # budget (see owldock.query_budgets)
+        self.query_shape_counts: Optional[Counter] = (
+            Counter() if check_query_budget else None
+        )
+        self.query_call_sites: Dict[str, str] = {}
+        # Exclusive time by phase: "db:<alias>", "serialize" or "encode"
+        self.durations: Dict[str, float] = defaultdict(float)
+        self.queries: Optional[List[Dict[str, Any]]] = [] if capture_sql else None
+        # Fields of the log record, e.g. the method, path and status code
+        self.fields: Dict[str, Any] = {}
+        # The phases entered and not exited: [name, time the phase last resumed]
+        self._phases: List[List[Any]] = []
+
+    def enter(self, name: str) -> None:
+        now = time.perf_counter()
+        if self._phases:
+            parent = self._phases[-1]
+            self.durations[parent[0]] += now - parent[1]
+        self._phases.append([name, now])
+
+    def exit(self) -> float:
+        """
+        Exit the innermost phase, returning the time spent in it since it was
+        last resumed.
+        """
+        now = time.perf_counter()
+        name, resumed_at = self._phases.pop()
+        self.durations[name] += now - resumed_at
+        if self._phases:
+            self._phases[-1][1] = now
+        return now - resumed_at
+
+    def as_log_fields(self) -> Dict[str, Any]:
+        fields = {
+            **self.fields,
+            "duration_ms": _ms(time.perf_counter() - self.started_at),
+            "queries": dict(self.query_counts),
+            "db_ms": {
+                name.split(":", 1)[1]: _ms(duration)
+                for name, duration in self.durations.items()
+                if name.startswith("db:")
+            },
+            "serialize_ms": _ms(self.durations.get("serialize", 0.0)),
+            "encode_ms": _ms(self.durations.get("encode", 0.0)),
+        }
+        if self.queries is not None:
+            fields["sql"] = self.queries
+        return fields
+
+
+class Histogram:
+    """
+    Counts of observed values, by bucket (upper bound), with their sum.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect_left(self.buckets, value)] += 1
+            self._sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the cumulative count of observations <= each bucket upper bound
+        ("+Inf" for all observations), as exported by Prometheus.
+        """
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        cumulative: List[Tuple[str, int]] = []
+        n = 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], counts):
+            n += count
+            cumulative.append((bound, n))
+        return {"buckets": dict(cumulative), "count": n, "sum": total}
+
+
+_histograms: Dict[str, Histogram] = {}
+_histograms_lock = threading.Lock()
+_counters: Counter = Counter()
+_counters_lock = threading.Lock()
+
+
+def get_histogram(name: str, buckets: Sequence[float] = TIME_BUCKETS) -> Histogram:
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(name, Histogram(buckets))
+    return histogram
+
+
+def increment(name: str) -> None:
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def get_metrics() -> Dict[str, Any]:
+    """
+    Return the histograms and counters of request metrics, and the database
+    connection statistics, of this process.
+    """
+    return {
+        "histograms": {name: h.snapshot() for name, h in sorted(_histograms.items())},
+        "counters": dict(_counters),
+        "connections": get_connection_stats(),
+    }
+
+
+def start_request() -> RequestMetrics:
+    """
+    Start recording the metrics of a request handled by this thread.
+
+    They are recorded until the response has been sent.
+    """
+    metrics = RequestMetrics(
+        capture_sql=random.random() < settings.OWLDOCK_SQL_CAPTURE_SAMPLE_RATE,
+        check_query_budget=(
+            random.random() < settings.OWLDOCK_QUERY_BUDGET_SAMPLE_RATE
+        ),
+    )
+    _local.metrics = metrics
+    return metrics
+
+
+def get_current_metrics() -> Optional[RequestMetrics]:
+    return getattr(_local, "metrics", None)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """
+    Record the time spent in this block against phase `name` of the current
+    request, if any.
+    """
+    metrics = get_current_metrics()
+    if metrics is None:
+        yield
+        return
+    metrics.enter(name)
+    try:
+        yield
+    finally:
+        metrics.exit()
+
+
+def check_query_budget(metrics: RequestMetrics) -> None:
+    """
+    Check the queries of a request against the budget of its endpoint, if the
+    request was sampled to be checked.
+
+    Raise QueryBudgetExceeded if it is exceeded and budgets are enforced;
+    otherwise log a warning.
+    """
+    if metrics.query_shape_counts is None:
+        return
+    url_name = metrics.fields.get("url_name")
+    violations = get_budget_violations(
+        get_query_budget(url_name),
+        sum(metrics.query_counts.values()),
+        metrics.query_shape_counts,
+        metrics.query_call_sites,
+    )
+    if not violations:
+        return
+    message = (
+        f"Query budget of {url_name or metrics.fields.get('path')} exceeded:\n"
+        + ("\n".join(violations))
+    )
+    if settings.OWLDOCK_QUERY_BUDGETS_ENFORCED:
+        raise QueryBudgetExceeded(message)
+    increment(f"query_budget_exceeded.{url_name}")
+    logger.warning(message)
+
+
+@receiver(request_finished)
+def finish_request(sender, **kwargs):
+    metrics = get_current_metrics()
+    if metrics is None:
+        return
+    _local.metrics = None
+    fields = metrics.as_log_fields()
+    get_histogram("request.duration").observe(fields["duration_ms"] / 1000)
+    for alias, count in metrics.query_counts.items():
+        get_histogram(f"request.queries.{alias}", COUNT_BUCKETS).observe(count)
+    for alias, duration_ms in fields["db_ms"].items():
+        get_histogram(f"request.db_time.{alias}").observe(duration_ms / 1000)
+    get_histogram("request.serialize_time").observe(fields["serialize_ms"] / 1000)
+    get_histogram("request.encode_time").observe(fields["encode_ms"] / 1000)
+    logger.info(
+        "%s %s %s %sms %s queries",
+        fields.get("method"),
+        fields.get("path"),
+        fields.get("status"),
+        fields["duration_ms"],
+        sum(metrics.query_counts.values()),
+        extra={"owldock_request": fields},
+    )
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = get_current_metrics()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    alias = context["connection"].alias
+    metrics.enter(f"db:{alias}")
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = metrics.exit()
+        metrics.query_counts[alias] += 1
+        if metrics.query_shape_counts is not None:
+            shape = get_query_shape(sql)
+            if shape is not None:
+                shape = f"{alias}: {shape}"
+                metrics.query_shape_counts[shape] += 1
+                if metrics.query_shape_counts[shape] == 2:
+                    metrics.query_call_sites[shape] = get_call_site()
+        if metrics.queries is not None:
+            metrics.queries.append({"db": alias, "sql": sql, "ms": _ms(duration)})
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
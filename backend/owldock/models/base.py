@@ -3,6 +3,8 @@ import uuid
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
 
+from owldock.models.fields import validate_pseudo_foreign_keys
+
 
 class BaseModel(models.Model):
     """
@@ -26,7 +28,7 @@ class BaseModel(models.Model):
         super().save(*args, **kwargs)
 
     def validate(self, *args, **kwargs):
-        pass
+        validate_pseudo_foreign_keys([self])
 
     @property
     def content_type(self):
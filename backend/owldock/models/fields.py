@@ -2,10 +2,21 @@
 https://docs.djangoproject.com/en/3.1/howto/custom-model-fields/
 
 """
-from typing import Type, Union
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type, Union
 
 from django.apps import apps
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import connections, models, router
+from django.db.models.constants import LOOKUP_SEP
+from django_tools.middlewares.ThreadLocal import get_current_request
+
+_IDENTITY_MAP_ATTR_NAME = "_owldock_pseudo_related_identity_map"
+_KNOWN_TO_EXIST_ATTR_NAME = "_owldock_pseudo_related_known_to_exist"
+_MISSING = object()
+
+IdentityMap = Dict[Tuple[Type[models.Model], Any], models.Model]
+KnownToExist = Set[Tuple[Type[models.Model], str, Any]]
 
 
 class _ForwardManyToOneDescriptor:
@@ -45,9 +56,62 @@ class _ForwardManyToOneDescriptor:
         - ``instance`` is the ``child`` instance
         - ``cls`` is the ``Child`` class (we don't need it)
         """
-        return self.field.to.objects.get(
-            **{self.field.to_field: getattr(instance, self.field.name)}
+        if instance is None:
+            return self
+        related = self.get_cached_value(instance)
+        if related is _MISSING:
+            value = getattr(instance, self.field.name)
+            if value is None:
+                return None
+            identity_map = _get_identity_map()
+            key = (self.field.to, value)
+            if identity_map is not None and key in identity_map:
+                related = identity_map[key]
+            else:
+                related = self.field.to.objects.get(**{self.field.to_field: value})
+                if identity_map is not None:
+                    identity_map[key] = related
+            self.set_cached_value(instance, related)
+        return related
+
+    def __set__(self, instance, value):
+        """
+        Set the related instance through the forward relation.
+
+        With the example above, when setting ``child.parent = parent``, the
+        pseudo foreign key ``child.parent_uuid`` is set to ``parent.uuid``.
+        """
+        setattr(
+            instance,
+            self.field.name,
+            None if value is None else getattr(value, self.field.to_field),
         )
+        self.set_cached_value(instance, value)
+
+    @property
+    def cache_name(self) -> str:
+        return self.field.related_accessor_name
+
+    def get_cached_value(self, instance):
+        """
+        Return the cached related instance, or _MISSING.
+
+        A cached related instance is discarded if the pseudo foreign key value
+        has changed since it was cached. A cached None is valid while the pseudo
+        foreign key value is None.
+        """
+        related = instance._state.fields_cache.get(self.cache_name, _MISSING)
+        if related is _MISSING:
+            return _MISSING
+        value = getattr(instance, self.field.name)
+        if related is None:
+            return None if value is None else _MISSING
+        if getattr(related, self.field.to_field) != value:
+            return _MISSING
+        return related
+
+    def set_cached_value(self, instance, related) -> None:
+        instance._state.fields_cache[self.cache_name] = related
 
 
 class UUIDPseudoForeignKeyField(models.UUIDField):
@@ -71,6 +135,9 @@ class UUIDPseudoForeignKeyField(models.UUIDField):
     # object. This property, when accessed, will attempt to execute
     # Parent.objects.get(uuid=self.parent_uuid)
     #
+    # Also, BaseModel.save() checks that the Parent exists (see
+    # validate_pseudo_foreign_keys()).
+    #
     # Nothing else is intended to change.
 
     forward_related_accessor_class = _ForwardManyToOneDescriptor
@@ -84,9 +151,17 @@ class UUIDPseudoForeignKeyField(models.UUIDField):
         **kwargs,
     ):
         super().__init__(*args, **kwargs)
-        self.to = apps.get_model(to) if isinstance(to, str) else to
+        self._to = to
         self.to_field = to_field
 
+    @property
+    def to(self) -> Type[models.Model]:
+        # A model named by a string is looked up when first used, so that it
+        # may be in an app whose models are not yet loaded.
+        if isinstance(self._to, str):
+            self._to = apps.get_model(self._to)
+        return self._to
+
     def deconstruct(self):
         # https://docs.djangoproject.com/en/3.1/howto/custom-model-fields/#field-deconstruction
         name, path, args, kwargs = super().deconstruct()
@@ -99,8 +174,175 @@ class UUIDPseudoForeignKeyField(models.UUIDField):
         super().contribute_to_class(cls, name, **kwargs)
         forward_related_accessor_name, sep, suffix = self.name.rpartition("_uuid")
         assert sep == "_uuid" and not suffix, f"Expected {self.name} to end in '_uuid'"
+        self.related_accessor_name = forward_related_accessor_name
         setattr(
             cls,
             forward_related_accessor_name,
             self.forward_related_accessor_class(self),
         )
+
+
+def prefetch_pseudo_related(
+    instances: Iterable[models.Model], *lookups: str
+) -> List[models.Model]:
+    """
+    Prefetch objects related to `instances` by UUIDPseudoForeignKeyFields.
+
+    `lookups` are like the arguments to `QuerySet.prefetch_related()`, e.g.
+    "applicant__user" or "steps__process_step", except that they may traverse
+    UUIDPseudoForeignKeyFields (which may relate objects in different
+    databases), as well as Django relations (which are prefetched using
+    `prefetch_related_objects()`). Objects related by a UUIDPseudoForeignKeyField
+    are fetched with one query per lookup and cached on the instances, so that
+    accessing the relation makes no query. During a request, objects already
+    fetched by the request are not fetched again (see `_get_identity_map()`).
+
+    Return the instances, as a list.
+    """
+    instances = list(instances)
+    for lookup in lookups:
+        objs: List[models.Model] = instances
+        for name in lookup.split(LOOKUP_SEP):
+            objs = _prefetch_one_level(objs, name)
+    return instances
+
+
+def _prefetch_one_level(objs: List[models.Model], name: str) -> List[models.Model]:
+    """
+    Prefetch relation `name` of `objs`, and return the related objects.
+    """
+    if not objs:
+        return []
+    descriptor = getattr(type(objs[0]), name, None)
+    if not isinstance(descriptor, _ForwardManyToOneDescriptor):
+        models.prefetch_related_objects(objs, name)
+        related: Dict[int, models.Model] = {}
+        for obj in objs:
+            value = getattr(obj, name)
+            if isinstance(value, models.Manager):
+                related.update((id(r), r) for r in value.all())
+            elif value is not None:
+                related[id(value)] = value
+        return list(related.values())
+
+    field = descriptor.field
+    uncached_values = {
+        getattr(obj, field.name)
+        for obj in objs
+        if descriptor.get_cached_value(obj) is _MISSING
+    } - {None}
+    identity_map = _get_identity_map()
+    if identity_map is None:
+        # Outside a request, objects are shared within this lookup only.
+        identity_map = {}
+    values_to_fetch = {v for v in uncached_values if (field.to, v) not in identity_map}
+    if values_to_fetch:
+        for r in field.to.objects.filter(**{f"{field.to_field}__in": values_to_fetch}):
+            identity_map[(field.to, getattr(r, field.to_field))] = r
+    for obj in objs:
+        key = (field.to, getattr(obj, field.name))
+        if key in identity_map and descriptor.get_cached_value(obj) is _MISSING:
+            descriptor.set_cached_value(obj, identity_map[key])
+    related = {}
+    for obj in objs:
+        value = descriptor.get_cached_value(obj)
+        if value is not _MISSING and value is not None:
+            related[id(value)] = value
+    return list(related.values())
+
+
+def _get_identity_map() -> Optional[IdentityMap]:
+    """
+    Return the identity map of objects fetched through pseudo foreign keys
+    during the current request.
+
+    The identity map ensures that, for example, all Cases in a CaseList
+    serialized by a request share one instance of each Country and ProcessStep.
+    Outside a request there is no identity map.
+    """
+    request = get_current_request()
+    if not request:
+        return None
+    if not hasattr(request, _IDENTITY_MAP_ATTR_NAME):
+        setattr(request, _IDENTITY_MAP_ATTR_NAME, {})
+    return getattr(request, _IDENTITY_MAP_ATTR_NAME)
+
+
+def validate_pseudo_foreign_keys(instances: Iterable[models.Model]) -> None:
+    """
+    Check that the objects referred to by the UUIDPseudoForeignKeyFields of
+    `instances` exist, raising ValidationError if not.
+
+    This makes at most one query per target model, however many instances there
+    are, so that a batch of instances can be validated before `bulk_create()`.
+    No query is made for an object that is cached on the instance, or that was
+    found to exist earlier in the current transaction (see
+    `_get_known_to_exist()`).
+    """
+    values_to_check: Dict[Tuple[Type[models.Model], str], Set[Any]] = defaultdict(set)
+    known_to_exist_by_db: Dict[str, KnownToExist] = {}
+    for instance in instances:
+        db = instance._state.db or router.db_for_write(
+            type(instance), instance=instance
+        )
+        if db not in known_to_exist_by_db:
+            known_to_exist_by_db[db] = _get_known_to_exist(db)
+        known_to_exist = known_to_exist_by_db[db]
+        for field in type(instance)._meta.concrete_fields:
+            if not isinstance(field, UUIDPseudoForeignKeyField):
+                continue
+            value = field.to_python(getattr(instance, field.attname))
+            if value is None:
+                raise ValidationError(
+                    f"{type(instance).__name__}.{field.name} must not be null"
+                )
+            key = (field.to, field.to_field, value)
+            if key in known_to_exist:
+                continue
+            descriptor = getattr(type(instance), field.related_accessor_name)
+            if descriptor.get_cached_value(instance) is not _MISSING:
+                known_to_exist.add(key)
+            else:
+                values_to_check[(field.to, field.to_field)].add(value)
+
+    for (model, to_field), values in values_to_check.items():
+        existing_values = set(
+            model.objects.filter(**{f"{to_field}__in": values}).values_list(
+                to_field, flat=True
+            )
+        )
+        missing_values = values - existing_values
+        if missing_values:
+            raise ValidationError(
+                f"{model.__name__} with {to_field} in "
+                f"{sorted(map(str, missing_values))} does not exist"
+            )
+        for known_to_exist in known_to_exist_by_db.values():
+            known_to_exist.update((model, to_field, v) for v in existing_values)
+
+
+def _get_known_to_exist(using: str) -> KnownToExist:
+    """
+    Return the set of objects referred to by pseudo foreign keys that are known
+    to exist, in the current transaction of database `using`.
+
+    Outside a transaction the set is empty. The set is discarded when the
+    transaction commits or rolls back, including rolling back to a savepoint
+    taken before the set was created: the set is valid only as long as a no-op
+    on_commit callback registered with it is pending.
+    """
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        return set()
+    callback, known_to_exist = getattr(
+        connection, _KNOWN_TO_EXIST_ATTR_NAME, (None, set())
+    )
+    if not any(func is callback for _, func in connection.run_on_commit):
+
+        def callback():
+            pass
+
+        known_to_exist = set()
+        connection.on_commit(callback)
+        setattr(connection, _KNOWN_TO_EXIST_ATTR_NAME, (callback, known_to_exist))
+    return known_to_exist
@@ -0,0 +1,131 @@
+"""
+Per-endpoint query budgets, and detection of N+1 queries.
+
+During a sampled request (settings.OWLDOCK_QUERY_BUDGET_SAMPLE_RATE), the shape
+of each query is recorded: its SQL, normalized so that queries differing only
+in their parameters have the same shape (see get_query_shape()). When the
+response has been sent, the queries are checked against the budget of the
+endpoint, looked up by URL name in QUERY_BUDGETS:
+
+- the number of queries must not exceed `max_queries` (if set);
+- no query shape may be repeated more than `max_repeats` times. A shape that is
+  repeated is typically a query made once per object of a list (an N+1 query);
+  the call site of its first repetition is reported.
+
+A request that exceeds its budget is a hard failure (QueryBudgetExceeded) if
+settings.OWLDOCK_QUERY_BUDGETS_ENFORCED (as in tests); otherwise it is logged
+as a warning, and counted in the "query_budget_exceeded" metric.
+"""
+import re
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+# A query shape repeated more than this many times, in an endpoint without a
+# budget, is an N+1 query.
+DEFAULT_MAX_REPEATS = 5
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    # The number of queries a request may make, if limited, plus
+    # max_queries_per_client_db for each client database (for endpoints that
+    # query every client database)
+    max_queries: Optional[int] = None
+    max_queries_per_client_db: int = 0
+    # The number of times a request may make a query of the same shape
+    max_repeats: int = DEFAULT_MAX_REPEATS
+
+    def get_max_queries(self) -> Optional[int]:
+        if self.max_queries is None:
+            return None
+        return (
+            self.max_queries
+            + len(settings.CLIENT_DB_NAMES) * self.max_queries_per_client_db
+        )
+
+
+DEFAULT_QUERY_BUDGET = QueryBudget()
+
+# Budgets by URL name (e.g. "admin:app_country_changelist" for admin views).
+# The budgets include the queries for the session, user and role.
+QUERY_BUDGETS: Dict[str, QueryBudget] = {
+    "client_contact_case": QueryBudget(max_queries=30),
+    "client_contact_list_applicants": QueryBudget(max_queries=10),
+    "client_contact_list_cases": QueryBudget(max_queries=30),
+    "provider_contact_case": QueryBudget(max_queries=25, max_queries_per_client_db=5),
+    "provider_contact_list_applicants": QueryBudget(
+        max_queries=5, max_queries_per_client_db=2
+    ),
+    "provider_contact_list_cases": QueryBudget(
+        max_queries=15, max_queries_per_client_db=10
+    ),
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def get_query_budget(url_name: Optional[str]) -> QueryBudget:
+    return QUERY_BUDGETS.get(url_name or "", DEFAULT_QUERY_BUDGET)
+
+
+_IN_LIST_RE = re.compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SHAPED_STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+_INSTRUMENTATION_MODULES = {"owldock.instrumentation", __name__}
+
+
+def get_query_shape(sql: str) -> Optional[str]:
+    """
+    Return the SQL normalized so that queries differing only in their parameters
+    (including the number of values in an IN list) have the same shape.
+
+    Statements other than SELECT, INSERT, UPDATE and DELETE (e.g. savepoints)
+    have no shape.
+    """
+    if not sql.lstrip()[:6].upper().startswith(_SHAPED_STATEMENTS):
+        return None
+    return _IN_LIST_RE.sub("(%s, ...)", _LITERAL_RE.sub("%s", sql))
+
+
+def get_call_site() -> str:
+    """
+    Return the innermost frame of our code that is not instrumentation, e.g.
+    the line of a view or model method that made the current query.
+    """
+    base_dir = f"{settings.BASE_DIR}/"
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base_dir)
+            and "site-packages" not in filename
+            and frame.f_globals.get("__name__") not in _INSTRUMENTATION_MODULES
+        ):
+            path = filename.replace(base_dir, "", 1)
+            return f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back  # type: ignore
+    return "<unknown>"
+
+
+def get_budget_violations(
+    budget: QueryBudget,
+    n_queries: int,
+    shape_counts: Dict[str, int],
+    call_sites: Dict[str, str],
+) -> List[str]:
+    violations = []
+    max_queries = budget.get_max_queries()
+    if max_queries is not None and n_queries > max_queries:
+        violations.append(f"{n_queries} queries exceeds budget of {max_queries}")
+    for shape, count in shape_counts.items():
+        if count > budget.max_repeats:
+            call_site = call_sites.get(shape, "<unknown>")
+            violations.append(
+                f"query repeated {count} times (N+1?) at {call_site}: {shape}"
+            )
+    return violations
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/3.1/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -50,8 +51,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "app.middleware.instrument_requests.instrument_requests",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "app.middleware.compress_api_responses.compress_api_responses",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -90,11 +93,65 @@ WSGI_APPLICATION = "owldock.wsgi.application"
 DEFAULT_DB_NAME = "default"
 CLIENT_DB_NAME = "client"
 
+# Connections are persistent: each worker thread holds at most one connection
+# to each database, for up to OWLDOCK_DATABASE_CONN_MAX_AGE seconds (0 closes
+# connections at the end of each request). A persistent connection is checked
+# to be usable when a request first uses it (see owldock.database_connections).
+# Both settings may be overridden per database, e.g.
+# OWLDOCK_DATABASE_CONN_MAX_AGE_CLIENT_1 for the database at
+# OWLDOCK_DATABASE_URL_CLIENT_1.
+DATABASE_CONN_MAX_AGE = int(os.environ.get("OWLDOCK_DATABASE_CONN_MAX_AGE", 60))
+DATABASE_CONN_HEALTH_CHECKS = (
+    os.environ.get("OWLDOCK_DATABASE_CONN_HEALTH_CHECKS", "true").lower() == "true"
+)
+
+
+def _parse_database_url(name: str) -> Dict[str, Any]:
+    conn_max_age = os.environ.get(f"OWLDOCK_DATABASE_CONN_MAX_AGE_{name}")
+    conn_health_checks = os.environ.get(f"OWLDOCK_DATABASE_CONN_HEALTH_CHECKS_{name}")
+    return {
+        **dj_database_url.parse(
+            os.environ[f"OWLDOCK_DATABASE_URL_{name}"],
+            conn_max_age=(
+                int(conn_max_age) if conn_max_age is not None else DATABASE_CONN_MAX_AGE
+            ),
+        ),
+        "CONN_HEALTH_CHECKS": (
+            conn_health_checks.lower() == "true"
+            if conn_health_checks is not None
+            else DATABASE_CONN_HEALTH_CHECKS
+        ),
+    }
+
+
 DATABASES = {
-    DEFAULT_DB_NAME: dj_database_url.parse(os.environ["OWLDOCK_DATABASE_URL_MAIN"]),
-    CLIENT_DB_NAME: dj_database_url.parse(os.environ["OWLDOCK_DATABASE_URL_CLIENT_1"]),
+    DEFAULT_DB_NAME: _parse_database_url("MAIN"),
+    CLIENT_DB_NAME: _parse_database_url("CLIENT_1"),
 }
 
+# Client data is sharded across client databases. The first,
+# OWLDOCK_DATABASE_URL_CLIENT_1, is CLIENT_DB_NAME; further databases
+# OWLDOCK_DATABASE_URL_CLIENT_2, ... are named client_2, ... Clients are
+# assigned to databases by app.models.ClientDatabase.
+CLIENT_DB_NAMES = [CLIENT_DB_NAME]
+_n = 2
+while f"OWLDOCK_DATABASE_URL_CLIENT_{_n}" in os.environ:
+    CLIENT_DB_NAMES.append(f"client_{_n}")
+    DATABASES[f"client_{_n}"] = _parse_database_url(f"CLIENT_{_n}")
+    _n += 1
+
+# Read replicas of the default database, OWLDOCK_DATABASE_URL_MAIN_REPLICA_1, ...
+# named default_replica_1, ... (see owldock.database_router).
+DEFAULT_DB_REPLICA_NAMES: List[str] = []
+_n = 1
+while f"OWLDOCK_DATABASE_URL_MAIN_REPLICA_{_n}" in os.environ:
+    DEFAULT_DB_REPLICA_NAMES.append(f"default_replica_{_n}")
+    DATABASES[f"default_replica_{_n}"] = {
+        **_parse_database_url(f"MAIN_REPLICA_{_n}"),
+        "TEST": {"MIRROR": DEFAULT_DB_NAME},
+    }
+    _n += 1
+
 DATABASE_ROUTERS = ["owldock.database_router.Router"]
 
 # Password validation
@@ -145,11 +202,35 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/accounts/login/"
 X_FRAME_OPTIONS = "SAMEORIGIN"
+# "orjson" (if installed) or "stdlib": see owldock.http.encoders
+OWLDOCK_JSON_ENCODER = os.environ.get("OWLDOCK_JSON_ENCODER", "orjson")
+# The fraction of requests for which the SQL of each query is logged: see
+# owldock.instrumentation
+OWLDOCK_SQL_CAPTURE_SAMPLE_RATE = float(
+    os.environ.get("OWLDOCK_SQL_CAPTURE_SAMPLE_RATE", 0.0)
+)
+# The fraction of requests whose queries are checked against the query budget of
+# their endpoint, and whether exceeding it is an error (as in tests) rather
+# than a warning: see owldock.query_budgets
+OWLDOCK_QUERY_BUDGET_SAMPLE_RATE = float(
+    os.environ.get("OWLDOCK_QUERY_BUDGET_SAMPLE_RATE", 0.01)
+)
+OWLDOCK_QUERY_BUDGETS_ENFORCED = False
 
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-    }
+    },
+    # Shared by all worker processes (e.g. holds the immigration data version)
+    "shared": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "OWLDOCK_SHARED_CACHE_DIR",
+            os.path.join(tempfile.gettempdir(), "owldock-shared-cache"),
+        ),
+        # Entries are invalidated explicitly, not by age.
+        "TIMEOUT": None,
+    },
 }
 
 
@@ -1,10 +1,16 @@
 import logging
+import time
 from enum import Enum
-from typing import Optional, Union, TYPE_CHECKING
+from typing import Any, Dict, Optional, Union, TYPE_CHECKING
+from uuid import UUID
 
+from django.contrib.sessions.backends.base import SessionBase
 from django.http import HttpRequest
+from django.utils.functional import cached_property
+from django_tools.middlewares.ThreadLocal import get_current_request
 
 from app.models import User
+from owldock.database_router import get_client_db, get_client_db_names
 
 if TYPE_CHECKING:
     from app.models import ProviderContact
@@ -12,6 +18,11 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__file__)
 
+# How long the role of a user may be cached in their session
+PRINCIPAL_SESSION_CACHE_SECONDS = 5 * 60
+_PRINCIPAL_SESSION_KEY = "_owldock_principal"
+_CLIENT_UUID_SESSION_KEY = "_owldock_client_uuid"
+
 
 class Role(Enum):
     ADMIN = "Admin"
@@ -19,27 +30,91 @@ class Role(Enum):
     PROVIDER_CONTACT = "Provider Contact"
 
 
-class UserRole:
-    def __init__(self, user: User):
-        from client.models import ClientContact
-        from app.models import ProviderContact
+class Principal:
+    """
+    A user, and their role: whether they are a client contact or a provider
+    contact.
+
+    The contacts are resolved lazily, with at most one query per database: the
+    client contact (with its client) from the client DBs and the provider
+    contact (with its provider) from the default DB. If a session is supplied,
+    the role, contact ids, client DB and logo URL are cached in it, so that a
+    later request need only query for the user's contact, in its DB, and only
+    if it is used. The client DBs are searched only the first time a session's
+    client contact is resolved; thereafter its client's DB is looked up.
+    """
 
+    def __init__(self, user: User, session: Optional[SessionBase] = None):
         self.user = user
-        try:
-            self.client_contact: Optional[ClientContact] = ClientContact.objects.get(
-                user_uuid=user.uuid
-            )
-        except ClientContact.DoesNotExist:
-            self.client_contact = None
+        self._session = session
 
-        try:
-            self.provider_contact: Optional[
-                ProviderContact
-            ] = ProviderContact.objects.get(user=user)
-        except ProviderContact.DoesNotExist:
-            self.provider_contact = None
+    @cached_property
+    def _session_data(self) -> Optional[Dict[str, Any]]:
+        if self._session is None:
+            return None
+        data = self._session.get(_PRINCIPAL_SESSION_KEY)
+        if (
+            data
+            and data["user_id"] == self.user.id
+            and data["expires_at"] > time.time()
+        ):
+            return data
+        return None
+
+    @cached_property
+    def client_contact(self) -> "Optional[ClientContact]":
+        from client.models import ClientContact
 
-        self._validate()
+        qs = ClientContact.objects.select_related("client")
+        if self._session_data:
+            if not self._session_data["client_contact_id"]:
+                return None
+            qs = qs.filter(id=self._session_data["client_contact_id"])
+        client_db = self._session_data and self._session_data.get("client_db")
+        if not client_db and self._session_client_uuid:
+            client_db = get_client_db(self._session_client_uuid)
+        for db in [client_db] if client_db else get_client_db_names():
+            client_contact = qs.using(db).filter(user_uuid=self.user.uuid).first()
+            if client_contact:
+                client_contact.user = self.user
+                if (
+                    self._session is not None
+                    and self._session_client_uuid != client_contact.client.uuid
+                ):
+                    # Set only if changed, so as not to save the session.
+                    self._session[_CLIENT_UUID_SESSION_KEY] = {
+                        "user_id": self.user.id,
+                        "client_uuid": str(client_contact.client.uuid),
+                    }
+                return client_contact
+        return None
+
+    @property
+    def _session_client_uuid(self) -> Optional[UUID]:
+        """
+        The UUID of the client of the user, if known from their session.
+
+        This outlives the rest of the cached principal data, since a client
+        contact does not change client: once a client contact has been found,
+        its database is looked up (see get_client_db), rather than searched for.
+        """
+        if self._session is None:
+            return None
+        data = self._session.get(_CLIENT_UUID_SESSION_KEY)
+        if data and data["user_id"] == self.user.id:
+            return UUID(data["client_uuid"])
+        return None
+
+    @cached_property
+    def provider_contact(self) -> "Optional[ProviderContact]":
+        from app.models import ProviderContact
+
+        qs = ProviderContact.objects.select_related("provider", "user")
+        if self._session_data:
+            if not self._session_data["provider_contact_id"]:
+                return None
+            qs = qs.filter(id=self._session_data["provider_contact_id"])
+        return qs.filter(user=self.user).first()
 
     def _validate(self):
         if self.client_contact and self.provider_contact:
@@ -48,32 +123,87 @@ class UserRole:
                 self.user,
             )
 
-    @property
+    @cached_property
     def role(self) -> Optional[Role]:
-        self._validate()
+        if not self.user.is_authenticated:
+            return None
         if self.user.is_superuser:
             return Role.ADMIN
+        if self._session_data:
+            role_name = self._session_data["role"]
+            return Role[role_name] if role_name else None
+        self._validate()
         if self.client_contact:
-            return Role.CLIENT_CONTACT
-        if self.provider_contact:
-            return Role.PROVIDER_CONTACT
+            role = Role.CLIENT_CONTACT
+        elif self.provider_contact:
+            role = Role.PROVIDER_CONTACT
         else:
-            return None
+            role = None
+        if self._session is not None:
+            client_contact = self.client_contact
+            self._session[_PRINCIPAL_SESSION_KEY] = {
+                "user_id": self.user.id,
+                "expires_at": time.time() + PRINCIPAL_SESSION_CACHE_SECONDS,
+                "role": role.name if role else None,
+                "client_contact_id": client_contact.id if client_contact else None,
+                "client_db": client_contact._state.db if client_contact else None,
+                "provider_contact_id": getattr(self.provider_contact, "id", None),
+                "logo_url": self._get_logo_url(role),
+            }
+        return role
+
+    @cached_property
+    def logo_url(self) -> str:
+        if self._session_data:
+            return self._session_data["logo_url"]
+        return self._get_logo_url(self.role)
+
+    def _get_logo_url(self, role: Optional[Role]) -> str:
+        if role == Role.CLIENT_CONTACT:
+            return self.client_contact.client.logo_url  # type: ignore
+        elif role == Role.PROVIDER_CONTACT:
+            return self.provider_contact.provider.logo_url  # type: ignore
+        else:
+            return ""
 
     @property
     def client_or_provider_contact(
         self,
     ) -> "Optional[Union[ClientContact, ProviderContact]]":
-        self._validate()
-        return self.client_contact or self.provider_contact or None
+        if self.role == Role.CLIENT_CONTACT:
+            return self.client_contact
+        elif self.role == Role.PROVIDER_CONTACT:
+            return self.provider_contact
+        else:
+            return None
 
 
-def get_role(user) -> Optional[Role]:
-    return UserRole(user).role
+def get_principal(user: User) -> Principal:
+    """
+    Return the Principal for the user.
 
+    This is the principal of the current request, if the user is its user.
+    """
+    request = get_current_request()
+    if request is not None and getattr(request, "user", None) == user:
+        return get_principal_from_http_request(request)
+    return Principal(user)
 
-def get_role_from_http_request(request: HttpRequest) -> Optional[Role]:
-    cache_attrname = "_owldock_user_role"
+
+def get_principal_from_http_request(request: HttpRequest) -> Principal:
+    cache_attrname = "_owldock_principal"
     if not hasattr(request, cache_attrname):
-        setattr(request, cache_attrname, get_role(request.user))
+        setattr(
+            request,
+            cache_attrname,
+            Principal(request.user, getattr(request, "session", None)),  # type: ignore
+        )
     return getattr(request, cache_attrname)
+
+
+def get_role(user) -> Optional[Role]:
+    return get_principal(user).role
+
+
+def get_role_from_http_request(request: HttpRequest) -> Optional[Role]:
+    return get_principal_from_http_request(request).role
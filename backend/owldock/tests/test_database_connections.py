@@ -0,0 +1,69 @@
+from unittest.mock import patch
+
+import pytest
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+from app.models import Country
+from owldock.database_connections import get_connection_stats
+from owldock.settings import _parse_database_url
+
+
+def test_databases_have_persistent_connections(monkeypatch):
+    monkeypatch.setenv("OWLDOCK_DATABASE_URL_TEST", "postgres://localhost/test")
+    monkeypatch.delenv("OWLDOCK_DATABASE_CONN_MAX_AGE_TEST", raising=False)
+    monkeypatch.delenv("OWLDOCK_DATABASE_CONN_HEALTH_CHECKS_TEST", raising=False)
+    settings_dict = _parse_database_url("TEST")
+    assert settings_dict["CONN_MAX_AGE"] == settings.DATABASE_CONN_MAX_AGE
+    assert settings_dict["CONN_HEALTH_CHECKS"] == settings.DATABASE_CONN_HEALTH_CHECKS
+
+    # Both settings may be overridden per database.
+    monkeypatch.setenv("OWLDOCK_DATABASE_CONN_MAX_AGE_TEST", "7")
+    monkeypatch.setenv("OWLDOCK_DATABASE_CONN_HEALTH_CHECKS_TEST", "false")
+    settings_dict = _parse_database_url("TEST")
+    assert settings_dict["CONN_MAX_AGE"] == 7
+    assert settings_dict["CONN_HEALTH_CHECKS"] is False
+
+
+# Connections in a transaction are not checked, so this test must not run in one.
+@pytest.mark.django_db(transaction=True)
+def test_unusable_connections_are_closed_on_first_use_in_a_request():
+    connection = connections[settings.DEFAULT_DB_NAME]
+    Country.objects.exists()
+    # Django checks a connection at request start only after an error.
+    connection.errors_occurred = False
+    stats = get_connection_stats()[settings.DEFAULT_DB_NAME]
+
+    # A usable connection is checked when first used in a request, and reused.
+    with patch.object(connection, "is_usable", return_value=True) as is_usable:
+        request_started.send(sender=None)
+        # Not by Django, reading its autocommit setting at the end of a request.
+        request_finished.send(sender=None)
+        request_started.send(sender=None)
+        assert get_connection_stats()[settings.DEFAULT_DB_NAME] == stats
+        is_usable.assert_not_called()
+        Country.objects.exists()
+        Country.objects.exists()
+    is_usable.assert_called_once_with()
+    assert get_connection_stats()[settings.DEFAULT_DB_NAME] == {
+        **stats,
+        "reused": stats["reused"] + 1,
+    }
+
+    # An unusable connection is closed, so that a new one is opened.
+    with patch.object(connection, "is_usable", return_value=False), patch.object(
+        connection, "close"
+    ) as close:
+        request_started.send(sender=None)
+        assert get_connection_stats()[settings.DEFAULT_DB_NAME]["unusable"] == (
+            stats["unusable"]
+        )
+        close.assert_not_called()
+        Country.objects.exists()
+    close.assert_called_once_with()
+    assert get_connection_stats()[settings.DEFAULT_DB_NAME] == {
+        **stats,
+        "reused": stats["reused"] + 1,
+        "unusable": stats["unusable"] + 1,
+    }
@@ -1,14 +1,32 @@
-from typing import Type
+import json
+from typing import Iterator, List, Type
 
+import pytest
 from parameterized import parameterized
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ValidationError
 from django.db.models import Model
-from django.db import router
+from django.db import connections, router
+from django.db.transaction import atomic
+from django.http import HttpResponse
+from django.test import Client as DjangoTestClient
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django_tools.middlewares.ThreadLocal import ThreadLocalMiddleware
 
-from app.models import ProviderContact
-from client.models import Applicant, Case
+from app.models import ClientDatabase, Country, ProviderContact
+from app.tests.factories import create_user
+from client.models import Applicant, Case, CaseStep, Client, ClientContact
+from client.models.case_step import State as CaseStepState
+from client.tests.fake_create_case import fake_create_case_and_earmark_steps
+from immigration import snapshot
 from immigration.models import ProcessRuleSet
 
-from owldock.database_router import is_client_model
+from owldock.database_router import get_client_db, is_client_model, using_client_db
+from owldock.tests.constants import TEST_PASSWORD
+
+from client.tests.conftest import *  # noqa
 
 
 @parameterized.expand(
@@ -59,3 +77,193 @@ def test_is_client_model():
     assert is_client_model(Case)
     assert not is_client_model(ProcessRuleSet)
     assert not is_client_model(ProviderContact)
+
+
+@pytest.mark.skipif(
+    len(settings.CLIENT_DB_NAMES) < 2,
+    reason="OWLDOCK_DATABASE_URL_CLIENT_2 is not set",
+)
+def test_client_data_is_sharded(
+    applicant_A: Applicant,
+    client_contact_A: ClientContact,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    provider_contact_A: ProviderContact,
+    django_test_client: DjangoTestClient,
+):
+    db = settings.CLIENT_DB_NAMES[1]
+    assert router.allow_migrate(db, "client")
+    assert not router.allow_migrate(db, "app")
+
+    # Client B's data is in the second client database.
+    with using_client_db(db):
+        client_B = Client.objects.create(
+            name="B", entity_domain_name="b.com", logo_url="https://b.com/logo.png"
+        )
+        client_contact_B = ClientContact.objects.create(
+            client=client_B, user_uuid=create_user().uuid
+        )
+        applicant_B = Applicant.objects.create(
+            employer=client_B,
+            user_uuid=create_user().uuid,
+            home_country_uuid=applicant_A.home_country_uuid,
+        )
+    # Clients are mapped to their database when created.
+    assert ClientDatabase.objects.get(client_uuid=client_B.uuid).database == db
+    assert get_client_db(client_B.uuid) == db
+    assert get_client_db(client_contact_A.client.uuid) == settings.CLIENT_DB_NAME
+
+    case_A, case_B = [
+        fake_create_case_and_earmark_steps(
+            applicant,
+            client_contact,
+            greece_local_hire_article_17_rule_set,
+            provider_contact_A,
+        )
+        for applicant, client_contact in [
+            (applicant_A, client_contact_A),
+            (applicant_B, client_contact_B),
+        ]
+    ]
+    assert case_B._state.db == db
+    assert router.db_for_read(CaseStep, instance=case_B) == db
+    assert (
+        not Case.objects.using(settings.CLIENT_DB_NAME)
+        .filter(uuid=case_B.uuid)
+        .exists()
+    )
+    for case in [case_A, case_B]:
+        case.steps.update(state_name=CaseStepState.OFFERED.name)
+
+    # A client contact's requests query only their client's database, once their
+    # client contact has been found (and cached in the session).
+    assert django_test_client.login(
+        username=client_contact_B.user.username, password=TEST_PASSWORD
+    )
+    _get_case_list(django_test_client, "client-contact")
+    with CaptureQueriesContext(connections[settings.CLIENT_DB_NAME]) as capturer:
+        cases = _get_case_list(django_test_client, "client-contact")
+    assert [c["uuid"] for c in cases] == [str(case_B.uuid)]
+    assert not capturer.captured_queries
+
+    # A provider contact's cases are fetched from all client databases.
+    assert django_test_client.login(
+        username=provider_contact_A.user.username, password=TEST_PASSWORD
+    )
+    cases = _get_case_list(django_test_client, "provider-contact")
+    assert {c["uuid"] for c in cases} == {str(case_A.uuid), str(case_B.uuid)}
+    response = django_test_client.get(f"/api/provider-contact/case/{case_B.uuid}/")
+    assert response.json()["data"]["uuid"] == str(case_B.uuid)
+
+    # Once a case's client is known, its database is looked up rather than
+    # searched for.
+    with CaptureQueriesContext(connections[settings.CLIENT_DB_NAME]) as capturer:
+        response = django_test_client.get(f"/api/provider-contact/case/{case_B.uuid}/")
+    assert response.json()["data"]["uuid"] == str(case_B.uuid)
+    assert not capturer.captured_queries
+
+
+def test_client_database_must_be_a_client_database(client_contact_A: ClientContact):
+    client_database = ClientDatabase.objects.get(
+        client_uuid=client_contact_A.client.uuid
+    )
+    assert client_database.database == settings.CLIENT_DB_NAME
+    client_database.database = settings.DEFAULT_DB_NAME
+    with pytest.raises(ValidationError):
+        client_database.save()
+
+
+@pytest.fixture
+def default_db_replica() -> Iterator[str]:
+    """
+    A second local database, standing in for a read replica of the default
+    database: it has the Country table, but is not replicated to.
+    """
+    db = "default_replica_1"
+    connections.databases[db] = {
+        **connections.databases[settings.DEFAULT_DB_NAME],
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    }
+    try:
+        with connections[db].schema_editor() as schema_editor:
+            schema_editor.create_model(Country)
+        with override_settings(DEFAULT_DB_REPLICA_NAMES=[db]):
+            yield db
+    finally:
+        connections[db].close()
+        del connections[db]
+        del connections.databases[db]
+
+
+# Reads are not routed to replicas in a transaction, so this test must not run
+# in one.
+@pytest.mark.django_db(transaction=True)
+def test_default_db_reads_are_routed_to_replica(default_db_replica: str):
+    assert not router.allow_migrate(default_db_replica, "app")
+    Country.objects.using(default_db_replica).create(name="Replica", code="XR")
+    middleware = ThreadLocalMiddleware(lambda request: HttpResponse())
+
+    def read_from_replica() -> bool:
+        return Country.objects.filter(code="XR").exists()
+
+    # Outside a request, reads are from the primary.
+    assert not read_from_replica()
+
+    request = RequestFactory().get("/")
+    middleware.process_request(request)
+    try:
+        # In a request, reads are from the replica...
+        assert read_from_replica()
+        # ...but not in a transaction...
+        with atomic():
+            assert not read_from_replica()
+        # ...and not from the sessions table.
+        assert router.db_for_read(Session) == settings.DEFAULT_DB_NAME
+        assert read_from_replica()
+
+        # After a write, reads are from the primary for the rest of the request.
+        Country.objects.create(name="Primary", code="XP")
+        assert not read_from_replica()
+        assert Country.objects.filter(code="XP").exists()
+    finally:
+        middleware.process_exception(request, None)
+
+    # A new request reads from the replica again.
+    request = RequestFactory().get("/")
+    middleware.process_request(request)
+    try:
+        assert read_from_replica()
+    finally:
+        middleware.process_exception(request, None)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cached_data_is_not_read_from_replica(
+    default_db_replica: str,
+    greece,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+):
+    # Data read from a lagging replica would be cached until the data version
+    # next changes.
+    Country.objects.using(default_db_replica).create(name="Replica", code="XR")
+    snapshot.bump_data_version()
+    middleware = ThreadLocalMiddleware(lambda request: HttpResponse())
+    request = RequestFactory().get("/")
+    middleware.process_request(request)
+    try:
+        assert Country.objects.filter(code="XR").exists()
+        # The replica has only the Country table: reading anything else from it
+        # would fail.
+        assert snapshot.get_snapshot(greece.code).get_process_rulesets() == [
+            greece_local_hire_article_17_rule_set
+        ]
+        assert "XR" not in snapshot.get_bloc_decomposer().universe
+        assert router.db_for_read(ClientDatabase) == settings.DEFAULT_DB_NAME
+    finally:
+        middleware.process_exception(request, None)
+
+
+def _get_case_list(django_test_client: DjangoTestClient, role: str) -> List[dict]:
+    response = django_test_client.get(f"/api/{role}/list-cases/")
+    assert response.status_code == 200
+    return json.loads(b"".join(response.streaming_content))["data"]
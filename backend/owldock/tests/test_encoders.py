@@ -0,0 +1,46 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from django.core.serializers.json import DjangoJSONEncoder
+from djmoney.money import Money
+
+from owldock.http import OwldockJsonResponse, OwldockStreamingJsonResponse
+from owldock.http.encoders import get_encoder
+
+PAYLOAD = {
+    "uuid": uuid4(),
+    "decimal": Decimal("1.10"),
+    "date": date(2021, 5, 1),
+    "datetime": datetime(2021, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    "list": [1, 2.5, None, True, "ü"],
+    "nested": {"a": [{"b": []}]},
+}
+
+
+def test_stdlib_encoder_is_same_as_django_json_encoder():
+    assert get_encoder("stdlib").dumps(PAYLOAD) == (
+        json.dumps(PAYLOAD, cls=DjangoJSONEncoder).encode()
+    )
+
+
+@pytest.mark.parametrize("name", ["stdlib", "orjson"])
+def test_encoder(name: str, settings):
+    if name == "orjson":
+        pytest.importorskip("orjson")
+    settings.OWLDOCK_JSON_ENCODER = name
+    encoder = get_encoder()
+    assert encoder.name == name
+    expected = json.loads(json.dumps(PAYLOAD, cls=DjangoJSONEncoder))
+    assert json.loads(encoder.dumps(PAYLOAD)) == expected
+    assert json.loads(encoder.dumps({1: Money(10, "EUR")})) == {"1": "10"}
+
+    rows = [PAYLOAD] * 3
+    content = OwldockJsonResponse(rows).content
+    assert json.loads(content)["data"] == [expected] * 3
+    streamed_content = b"".join(
+        OwldockStreamingJsonResponse(iter(rows)).streaming_content
+    )
+    assert streamed_content == content
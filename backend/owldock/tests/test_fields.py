@@ -0,0 +1,111 @@
+from uuid import uuid4
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django_tools.middlewares.ThreadLocal import ThreadLocalMiddleware
+
+from app.models import Country
+from client.models import Applicant, ApplicantNationality
+from owldock.dev.db_utils import assert_max_queries
+from owldock.models.fields import (
+    prefetch_pseudo_related,
+    validate_pseudo_foreign_keys,
+)
+
+from client.tests.conftest import *  # noqa
+
+
+def test_prefetch_pseudo_related(applicant_A: Applicant, applicant_B: Applicant):
+    applicants = list(Applicant.objects.filter(id__in=[applicant_A.id, applicant_B.id]))
+
+    # One query per relation
+    with assert_max_queries(4):
+        prefetch_pseudo_related(
+            applicants,
+            "user",
+            "home_country",
+            "applicantnationality_set__country",
+        )
+
+    with assert_max_queries(0):
+        for a in applicants:
+            assert a.user.uuid == a.user_uuid
+            assert a.home_country.uuid == a.home_country_uuid
+            for an in a.applicantnationality_set.all():
+                assert an.country.uuid == an.country_uuid
+
+    # A cached object is not used once the pseudo foreign key has changed.
+    [applicant, *_] = applicants
+    other_country = Country.objects.exclude(uuid=applicant.home_country_uuid).first()
+    applicant.home_country_uuid = other_country.uuid
+    assert applicant.home_country == other_country
+
+
+def test_pseudo_foreign_key_descriptor_caches_related_object(applicant_A: Applicant):
+    applicant = Applicant.objects.get(id=applicant_A.id)
+    with assert_max_queries(1):
+        home_country = applicant.home_country
+        assert applicant.home_country is home_country
+
+    other_country = Country.objects.exclude(uuid=home_country.uuid).first()
+    applicant.home_country = other_country
+    assert applicant.home_country_uuid == other_country.uuid
+    with assert_max_queries(0):
+        assert applicant.home_country is other_country
+
+    applicant.home_country = None
+    assert applicant.home_country_uuid is None
+    with assert_max_queries(0):
+        assert applicant.home_country is None
+
+    applicant.home_country_uuid = home_country.uuid
+    assert applicant.home_country == home_country
+
+
+def test_identity_map_shares_objects_during_request(
+    applicant_A: Applicant, applicant_B: Applicant
+):
+    applicant_B.home_country_uuid = applicant_A.home_country_uuid
+    applicant_B.save()
+    applicants = list(Applicant.objects.filter(id__in=[applicant_A.id, applicant_B.id]))
+
+    middleware = ThreadLocalMiddleware(lambda request: HttpResponse())
+    request = RequestFactory().get("/")
+    middleware.process_request(request)
+    try:
+        with assert_max_queries(1):
+            assert applicants[0].home_country is applicants[1].home_country
+    finally:
+        middleware.process_response(request, HttpResponse())
+
+    # Outside a request, there is no identity map.
+    applicants = list(Applicant.objects.filter(id__in=[applicant_A.id, applicant_B.id]))
+    assert applicants[0].home_country is not applicants[1].home_country
+
+
+def test_validate_pseudo_foreign_keys(applicant_A: Applicant, applicant_B: Applicant):
+    countries = list(Country.objects.all()[:3])
+    nationalities = [
+        ApplicantNationality(applicant=applicant, country_uuid=country.uuid)
+        for applicant in [applicant_A, applicant_B]
+        for country in countries
+    ]
+
+    # One query per target model
+    with transaction.atomic(using="client"):
+        with assert_max_queries(1):
+            validate_pseudo_foreign_keys(nationalities)
+        # Objects found to exist earlier in the transaction are not queried for.
+        with assert_max_queries(0):
+            validate_pseudo_foreign_keys(nationalities)
+        with assert_max_queries(1):
+            ApplicantNationality.objects.bulk_create(nationalities)
+
+    nationality = ApplicantNationality(applicant=applicant_A, country_uuid=uuid4())
+    with pytest.raises(ValidationError):
+        validate_pseudo_foreign_keys([nationality])
+    with pytest.raises(ValidationError):
+        nationality.save()
@@ -0,0 +1,62 @@
+import logging
+from unittest.mock import patch
+
+from django.conf import settings
+from django.test import Client as DjangoTestClient
+from django.test.utils import override_settings
+
+from client.models import ClientContact
+from owldock.instrumentation import RequestMetrics, get_metrics
+
+from client.tests.conftest import *  # noqa
+from owldock.tests.constants import TEST_PASSWORD
+
+
+def test_request_metrics_times_are_exclusive():
+    with patch(
+        "owldock.instrumentation.time.perf_counter", side_effect=[0, 1, 3, 7, 8]
+    ):
+        metrics = RequestMetrics()
+        metrics.enter("serialize")
+        metrics.enter("db:default")
+        assert metrics.exit() == 4
+        assert metrics.exit() == 1
+    assert metrics.durations == {"serialize": 3, "db:default": 4}
+
+
+def test_requests_are_logged_with_metrics(
+    caplog,
+    client_contact_A: ClientContact,
+    django_test_client: DjangoTestClient,
+):
+    assert django_test_client.login(
+        username=client_contact_A.user.username,
+        password=TEST_PASSWORD,
+    )
+    url = "/api/client-contact/list-applicants/"
+    with caplog.at_level(logging.INFO):
+        response = django_test_client.get(url)
+        assert response.status_code == 200
+        with override_settings(OWLDOCK_SQL_CAPTURE_SAMPLE_RATE=1.0):
+            django_test_client.get(url)
+
+    fields, sampled_fields = [
+        record.owldock_request
+        for record in caplog.records
+        if hasattr(record, "owldock_request")
+    ]
+    assert fields["method"] == "GET"
+    assert fields["path"] == url
+    assert fields["status"] == 200
+    assert fields["queries"][settings.DEFAULT_DB_NAME] > 0
+    assert fields["queries"][settings.CLIENT_DB_NAME] > 0
+    assert set(fields["db_ms"]) == set(fields["queries"])
+    assert "serialize_ms" in fields and "encode_ms" in fields
+    assert "sql" not in fields
+
+    assert len(sampled_fields["sql"]) == sum(sampled_fields["queries"].values())
+    assert {q["db"] for q in sampled_fields["sql"]} == set(sampled_fields["queries"])
+
+    histograms = get_metrics()["histograms"]
+    assert histograms["request.duration"]["count"] >= 2
+    assert histograms[f"request.queries.{settings.CLIENT_DB_NAME}"]["count"] >= 2
@@ -0,0 +1,77 @@
+import json
+from datetime import date
+from decimal import Decimal
+from uuid import uuid4
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django_tools.middlewares.ThreadLocal import ThreadLocalMiddleware
+
+from owldock.http import (
+    STREAMING_ERROR,
+    OwldockJsonResponse,
+    OwldockStreamingJsonResponse,
+    add_error,
+    add_message,
+)
+
+
+def test_streaming_json_response_content_is_same_as_json_response():
+    rows = [{"uuid": uuid4(), "date": date.today(), "amount": Decimal("1.5")}] * 3
+    data = {"rows": rows, "n": 3, "nested": {"empty": [], "none": None}}
+    streamed_data = {
+        "rows": (row for row in rows),
+        "n": 3,
+        "nested": {"empty": iter([]), "none": None},
+    }
+    response = OwldockStreamingJsonResponse(streamed_data)
+    assert response["Content-Type"] == "application/json"
+    assert b"".join(response.streaming_content) == OwldockJsonResponse(data).content
+
+
+def test_streaming_json_response_sends_messages_added_during_streaming():
+    middleware = ThreadLocalMiddleware(lambda request: HttpResponse())
+    request = RequestFactory().get("/")
+
+    def generate_rows():
+        add_message("Generating row")
+        yield 1
+        add_error("Failed to generate row")
+
+    middleware.process_request(request)
+    response = OwldockStreamingJsonResponse(generate_rows(), messages=["Started"])
+    # The response leaves the middleware before its content is generated.
+    middleware.process_response(request, response)
+
+    assert json.loads(b"".join(response.streaming_content)) == {
+        "data": [1],
+        "errors": ["Failed to generate row"],
+        "messages": ["Started", "Generating row"],
+    }
+
+
+def test_streaming_json_response_ends_with_error_if_data_fails():
+    middleware = ThreadLocalMiddleware(lambda request: HttpResponse())
+    request = RequestFactory().get("/")
+
+    def generate_rows():
+        yield {"n": 1}
+        yield {"n": object()}
+        yield {"n": 3}
+
+    def generate_rows_failing():
+        yield 1
+        raise ValueError
+
+    middleware.process_request(request)
+    response = OwldockStreamingJsonResponse(
+        {"rows": generate_rows(), "more_rows": generate_rows_failing()}
+    )
+    middleware.process_response(request, response)
+
+    # A valid document, ending each list at its last complete item.
+    assert json.loads(b"".join(response.streaming_content)) == {
+        "data": {"rows": [{"n": 1}], "more_rows": [1]},
+        "errors": [STREAMING_ERROR, STREAMING_ERROR],
+        "messages": [],
+    }
@@ -0,0 +1,76 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+from django.test import Client as DjangoTestClient
+
+from app.models import Country
+from client.models import ClientContact
+from owldock.instrumentation import (
+    check_query_budget,
+    finish_request,
+    get_metrics,
+    start_request,
+)
+from owldock.query_budgets import QueryBudget, QueryBudgetExceeded, get_query_shape
+
+from client.tests.conftest import *  # noqa
+from owldock.tests.constants import TEST_PASSWORD
+
+
+def test_get_query_shape():
+    assert get_query_shape(
+        'SELECT "a"."id" FROM "a" WHERE "a"."id" IN (%s, %s, %s) LIMIT 21'
+    ) == get_query_shape('SELECT "a"."id" FROM "a" WHERE "a"."id" IN (%s) LIMIT 1')
+    assert get_query_shape("select * from a where b = 'x'") == get_query_shape(
+        "select * from a where b = 'y'"
+    )
+    assert get_query_shape('SAVEPOINT "s1_x1"') is None
+
+
+def test_n_plus_one_queries_are_reported_with_call_site(load_country_fixture):
+    ids = list(Country.objects.values_list("id", flat=True)[:6])
+    metrics = start_request()
+    try:
+        assert metrics.query_shape_counts is not None
+        for id in ids:
+            Country.objects.get(id=id)
+        with pytest.raises(QueryBudgetExceeded) as exc_info:
+            check_query_budget(metrics)
+    finally:
+        finish_request(sender=None)
+    assert (
+        "query repeated 6 times (N+1?) at owldock/tests/test_query_budgets.py"
+        in str(exc_info.value)
+    )
+
+
+def test_exceeded_query_budget_is_a_warning_unless_enforced(
+    caplog,
+    client_contact_A: ClientContact,
+    django_test_client: DjangoTestClient,
+    settings,
+):
+    assert django_test_client.login(
+        username=client_contact_A.user.username,
+        password=TEST_PASSWORD,
+    )
+    url = "/api/client-contact/list-applicants/"
+    url_name = "client_contact_list_applicants"
+    with patch.dict(
+        "owldock.query_budgets.QUERY_BUDGETS", {url_name: QueryBudget(max_queries=1)}
+    ):
+        with pytest.raises(QueryBudgetExceeded):
+            django_test_client.get(url)
+
+        settings.OWLDOCK_QUERY_BUDGETS_ENFORCED = False
+        n_exceeded = get_metrics()["counters"].get(
+            f"query_budget_exceeded.{url_name}", 0
+        )
+        with caplog.at_level(logging.WARNING):
+            response = django_test_client.get(url)
+    assert response.status_code == 200
+    assert f"Query budget of {url_name} exceeded" in caplog.text
+    assert (
+        get_metrics()["counters"][f"query_budget_exceeded.{url_name}"] == n_exceeded + 1
+    )
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+
+from app.models import ProviderContact
+from client.models import ClientContact
+from owldock.dev.db_utils import assert_max_queries
+from owldock.state_machine.role import Principal, Role
+
+from client.tests.conftest import *  # noqa
+
+
+def test_principal_is_cached_in_session(
+    client_contact_A: ClientContact, provider_contact_A: ProviderContact
+):
+    for contact, role, logo_url in [
+        (client_contact_A, Role.CLIENT_CONTACT, client_contact_A.client.logo_url),
+        (
+            provider_contact_A,
+            Role.PROVIDER_CONTACT,
+            provider_contact_A.provider.logo_url,
+        ),
+    ]:
+        user = contact.user
+        session = SessionStore()
+
+        # One query per database
+        principal = Principal(user, session)
+        with assert_max_queries(len(settings.DATABASES)):
+            assert principal.role == role
+            assert principal.logo_url == logo_url
+            assert principal.client_or_provider_contact == contact
+
+        # The role is cached in the session, and only the contact is fetched.
+        principal = Principal(user, session)
+        with assert_max_queries(0):
+            assert principal.role == role
+            assert principal.logo_url == logo_url
+        with assert_max_queries(1):
+            assert principal.client_or_provider_contact == contact
+            assert (principal.client_contact or principal.provider_contact) == contact
+
+        # The session of another user is not used.
+        other_user = (
+            client_contact_A if contact is provider_contact_A else provider_contact_A
+        ).user
+        assert Principal(other_user, session).role != role
@@ -0,0 +1,91 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from app.models import ProviderContact
+from client import api as client_api
+from client.models import Applicant, ClientContact
+from immigration import api as immigration_api
+from immigration.models import ProcessRuleSet
+from owldock.api.serialization import serialize
+from owldock.dev.db_utils import assert_max_queries
+
+# TODO: Move client tests and endpoints into the client module
+from client.tests.conftest import *  # noqa
+from client.tests.fake_create_case import fake_create_case_and_earmark_steps
+
+
+def _assert_same_as_pydantic(api_model, obj):
+    pydantic_data = api_model.from_orm(obj).dict()
+    if api_model.__custom_root_type__:
+        pydantic_data = pydantic_data["__root__"]
+    data = serialize(api_model, obj)
+    assert data == pydantic_data
+    assert json.dumps(data, cls=DjangoJSONEncoder) == json.dumps(
+        pydantic_data, cls=DjangoJSONEncoder
+    )
+
+
+def test_serialize_process_rulesets(
+    greece,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    greece_eu_eea_swiss_national_registration_rule_set: ProcessRuleSet,
+    greece_technical_assignment_article_18_route_rule_set: ProcessRuleSet,
+):
+    api_models = immigration_api.models
+    process_rulesets = api_models.ProcessRuleSetList.get_orm_models(greece.code)
+    assert len(process_rulesets) == 3
+    _assert_same_as_pydantic(api_models.ProcessRuleSetList, process_rulesets)
+    _assert_same_as_pydantic(api_models.ProcessRuleSet, process_rulesets[0])
+    _assert_same_as_pydantic(
+        api_models.ProcessStepList,
+        api_models.ProcessStepList.get_orm_models(greece.code),
+    )
+
+
+def test_serialize_cases(
+    applicant_A: Applicant,
+    client_contact_A: ClientContact,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    provider_contact_A: ProviderContact,
+):
+    fake_create_case_and_earmark_steps(
+        applicant_A,
+        client_contact_A,
+        greece_local_hire_article_17_rule_set,
+        provider_contact_A,
+    )
+    cases = client_api.read.case.get_cases_for_client_or_provider_contact(
+        client_contact_A
+    )
+    assert cases
+    _assert_same_as_pydantic(client_api.models.CaseList, cases)
+    _assert_same_as_pydantic(
+        client_api.models.ApplicantList,
+        client_api.read.applicant.get_orm_models(client_contact_A),
+    )
+
+
+def test_serializing_prefetched_cases_makes_no_queries(
+    applicant_A: Applicant,
+    client_contact_A: ClientContact,
+    greece_local_hire_article_17_rule_set: ProcessRuleSet,
+    provider_contact_A: ProviderContact,
+):
+    # The case endpoints rely on this.
+    fake_create_case_and_earmark_steps(
+        applicant_A,
+        client_contact_A,
+        greece_local_hire_article_17_rule_set,
+        provider_contact_A,
+    )
+    [case] = client_api.read.case.prefetch_cases(
+        client_contact_A.cases(), client_contact_A
+    )
+    cases, _ = client_api.read.case.get_case_page_for_client_or_provider_contact(
+        client_contact_A, page_size=10
+    )
+    assert cases
+    with assert_max_queries(0):
+        serialize(client_api.models.Case, case)
+        serialize(client_api.models.CaseList, cases)
@@ -0,0 +1,34 @@
+import random
+
+from owldock.utils.set_decomposer import SetDecomposer
+
+
+def _make_decomposers(universe):
+    rng = random.Random(0)
+    basis = {f"bloc-{i}": rng.sample(universe, rng.randint(1, 30)) for i in range(20)}
+    return (
+        SetDecomposer(basis, universe, max_distance=1.0),
+        SetDecomposer(basis, universe, max_distance=1.0),
+    )
+
+
+def test_decompose_many_agrees_with_decompose():
+    # The universe size is not a multiple of 8, so that packed bitvectors are
+    # padded.
+    universe = [f"c{i}" for i in range(203)]
+    decomposer, bulk_decomposer = _make_decomposers(universe)
+    rng = random.Random(1)
+    xs = [rng.sample(universe, rng.randint(1, 50)) for _ in range(2000)]
+    xs += [[], universe] + xs[:100]
+    assert bulk_decomposer.decompose_many(xs) == [decomposer.decompose(x) for x in xs]
+    # Memoized
+    assert len(bulk_decomposer._descriptions) == len({frozenset(x) for x in xs})
+    assert bulk_decomposer.decompose_many(xs[:10]) == [
+        decomposer.decompose(x) for x in xs[:10]
+    ]
+
+
+def test_decompose_without_basis():
+    decomposer = SetDecomposer({}, "abc")
+    assert decomposer.decompose("ab") == "2"
+    assert decomposer.decompose_many(["ab", "abc"]) == ["2", "(all)"]
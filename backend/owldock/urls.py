@@ -35,17 +35,24 @@ urlpatterns = [
         "api/client-contact/create-case/",
         login_required(client_contact.CreateCase.as_view()),
     ),
+    path(
+        "api/client-contact/create-cases/",
+        login_required(client_contact.CreateCases.as_view()),
+    ),
     path(
         "api/client-contact/case/<uuid:uuid>/",
         login_required(client_contact.CaseView.as_view()),
+        name="client_contact_case",
     ),
     path(
         "api/client-contact/list-applicants/",
         login_required(client_contact.ApplicantList.as_view()),
+        name="client_contact_list_applicants",
     ),
     path(
         "api/client-contact/list-cases/",
         login_required(client_contact.CaseList.as_view()),
+        name="client_contact_list_cases",
     ),
     path(
         "api/client-contact/earmark-case-step/<uuid:uuid>",
@@ -98,6 +105,7 @@ urlpatterns = [
     path(
         "api/provider-contact/case/<uuid:uuid>/",
         login_required(provider_contact.CaseView.as_view()),
+        name="provider_contact_case",
     ),
     path(
         "api/provider-contact/case-step/<uuid:uuid>/",
@@ -106,10 +114,12 @@ urlpatterns = [
     path(
         "api/provider-contact/list-applicants/",
         login_required(provider_contact.ApplicantList.as_view()),
+        name="provider_contact_list_applicants",
     ),
     path(
         "api/provider-contact/list-cases/",
         login_required(provider_contact.CaseList.as_view()),
+        name="provider_contact_list_cases",
     ),
     path(
         "api/provider-contact/accept-case-step/<uuid:uuid>",
@@ -131,6 +141,10 @@ urlpatterns = [
         login_required(provider_contact.CaseStepUploadFiles.as_view()),
     ),
     path("api/processes/", login_required(processes.ProcessList.as_view())),
+    path(
+        "api/processes-bulk/",
+        login_required(processes.ProcessListBulk.as_view()),
+    ),
     # Admin
     path("admin/doc/", include("django.contrib.admindocs.urls")),
     path("admin/", admin.site.urls),  # TODO: permission
@@ -1,7 +1,11 @@
-from typing import Iterable, Mapping, Sequence, Set
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Set
 
 import numpy as np
 
+# The number of input sets whose distances to the basis sets are computed in one
+# matrix operation, bounding the memory used.
+_CHUNK_SIZE = 10000
+
 
 class SetDecomposer:
     """
@@ -32,6 +36,14 @@ class SetDecomposer:
     >>> sd = SetDecomposer({"ab": "ab", "cd": "cd"}, "abcde", max_distance=0.1)
     >>> sd.decompose("a")
     '1'
+
+    Many sets may be decomposed at once, which is faster than decomposing them
+    one at a time. Decompositions are memoized, so sets that recur are
+    decomposed once.
+
+    >>> sd = SetDecomposer({"ab": "ab", "cd": "cd"}, "abcde", max_distance=1.0)
+    >>> sd.decompose_many(["a", "dce", "", "abcd", "ba", "edcab"])
+    ['ab - 1', 'non-ab', '', 'ab + 2', 'ab', '(all)']
     """
 
     _empty_description = ""
@@ -53,13 +65,17 @@ class SetDecomposer:
         ]
         self.basis = self._make_bitvectors(basis_sets)
         assert self.basis.shape == (len(self.basis_names), len(self.universe))
+        # For computing intersection sizes by matrix product
+        self._basis_matrix = self.basis.T.astype(np.float32)
+        self._basis_sizes = self.basis.sum(axis=1)
         self.max_distance = max_distance
+        self._descriptions: Dict[FrozenSet[str], str] = {}
 
     def _make_bitvectors(self, basis: Sequence[Set[str]]) -> np.ndarray:
         bitvectors = np.zeros((len(basis), len(self.universe)), dtype=bool)
-        for i, x in enumerate(basis):
-            indices = [self.indices[a] for a in set(x)]
-            bitvectors[i, indices] = True
+        rows = [i for i, x in enumerate(basis) for _ in x]
+        columns = [self.indices[a] for x in basis for a in x]
+        bitvectors[rows, columns] = True
         return bitvectors
 
     def decompose(self, x: Iterable[str]) -> str:
@@ -67,7 +83,70 @@ class SetDecomposer:
         Return a string describing input subset x in terms of edit operations on
         basis subsets.
         """
-        x = set(x)
+        x = frozenset(x)
+        if x not in self._descriptions:
+            description = self._get_trivial_description(x)
+            if description is None:
+                v = self._make_bitvectors([x])
+                additions = v & ~self.basis
+                subtractions = ~v & self.basis
+                n_edits = additions.sum(axis=1) + subtractions.sum(axis=1)
+                closest = n_edits.argmin()
+                description = self._make_description(
+                    x,
+                    self.basis_names[closest],
+                    additions[closest].sum(),
+                    subtractions[closest].sum(),
+                )
+            self._descriptions[x] = description
+        return self._descriptions[x]
+
+    def decompose_many(self, xs: Iterable[Iterable[str]]) -> List[str]:
+        """
+        Return a list of strings describing each of the input subsets xs, as
+        decompose() does.
+
+        The Hamming distances between the input sets and the basis sets are
+        computed with one matrix product, for all input sets that have not been
+        decomposed before.
+        """
+        xs = [frozenset(x) for x in xs]
+        todo = []
+        for x in dict.fromkeys(xs):
+            if x not in self._descriptions:
+                description = self._get_trivial_description(x)
+                if description is None:
+                    todo.append(x)
+                else:
+                    self._descriptions[x] = description
+        for start in range(0, len(todo), _CHUNK_SIZE):
+            end = start + _CHUNK_SIZE
+            chunk = todo[start:end]
+            v = self._make_bitvectors(chunk)
+            # (inputs, basis sets): the size of each intersection, from which
+            # the Hamming distance is |x| + |b| - 2|x & b|.
+            intersections = (v.astype(np.float32) @ self._basis_matrix).astype(int)
+            sizes = v.sum(axis=1)[:, np.newaxis]
+            additions = sizes - intersections
+            subtractions = self._basis_sizes[np.newaxis, :] - intersections
+            closest = (additions + subtractions).argmin(axis=1)
+            rows = np.arange(len(chunk))
+            for x, i, n_additions, n_subtractions in zip(
+                chunk,
+                closest.tolist(),
+                additions[rows, closest].tolist(),
+                subtractions[rows, closest].tolist(),
+            ):
+                self._descriptions[x] = self._make_description(
+                    x, self.basis_names[i], n_additions, n_subtractions
+                )
+        return [self._descriptions[x] for x in xs]
+
+    def _get_trivial_description(self, x: FrozenSet[str]) -> Optional[str]:
+        """
+        Return the description of x if it is the empty set or the universe (or
+        if there are no basis sets), otherwise None.
+        """
         if x >= self.universe:
             if x == self.universe:
                 return self._universe_description
@@ -77,26 +156,17 @@ class SetDecomposer:
             )
         elif not x:
             return self._empty_description
-        v = self._make_bitvectors([x])
-        additions = v & ~self.basis
-        subtractions = ~v & self.basis
-        n_edits = additions.sum(axis=1) + subtractions.sum(axis=1)
-        closest = n_edits.argmin()
-        return self._make_description(
-            x,
-            self.basis_names[closest],
-            additions[closest],
-            subtractions[closest],
-        )
+        elif not self.basis_names:
+            return f"{len(x)}"
+        return None
 
     def _make_description(
         self,
         x: Set[str],
         basis_set_name: str,
-        additions: np.ndarray,
-        subtractions: np.ndarray,
+        n_additions: int,
+        n_subtractions: int,
     ) -> str:
-        n_additions, n_subtractions = additions.sum(), subtractions.sum()
         if n_additions + n_subtractions > len(self.universe) * self.max_distance:
             return f"{len(x)}"
         name = basis_set_name